@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del análisis de logs: datetime.strptime frente a parser_logs.
+
+Genera un monitor.log sintético (1 GB por defecto) con el formato de
+SistemaLogs y mide:
+
+  - estadísticas al estilo anterior (split + strptime en cada línea),
+  - el mismo recorrido con parser_logs (cortes fijos, marcas como texto),
+  - la construcción del índice por bloques y las estadísticas desde él,
+  - la exportación de un rango de una hora con el índice.
+
+Uso:
+    python benchmarks/bench_parser_logs.py [--tamano-mb MB] [--directorio DIR]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import indice_logs  # noqa: E402
+from parser_logs import marca_y_nivel  # noqa: E402
+
+NIVELES = ('DEBUG', 'INFO', 'INFO', 'INFO', 'WARNING', 'ERROR')
+
+
+def generar_log(ruta, tamano_mb):
+    """Escribe un log cronológico de unos tamano_mb megabytes; devuelve el nº de líneas"""
+    objetivo = tamano_mb * 1024 * 1024
+    inicio = datetime(2024, 1, 1)
+    escritos = lineas = 0
+    with open(ruta, 'w', encoding='utf-8') as f:
+        while escritos < objetivo:
+            bloque = []
+            for _ in range(10000):
+                marca = (inicio + timedelta(seconds=lineas // 20)).strftime('%Y-%m-%d %H:%M:%S')
+                nivel = NIVELES[lineas % len(NIVELES)]
+                bloque.append(f"{marca} | {nivel:<8} | ALERTA: proceso_{lineas % 97} (PID: {lineas % 40000}) "
+                              f"- CPU: {lineas % 100}.5%, Memoria: {lineas % 4096}MB\n")
+                lineas += 1
+            texto = ''.join(bloque)
+            f.write(texto)
+            escritos += len(texto.encode('utf-8'))
+    return lineas
+
+
+def estadisticas_strptime(ruta):
+    """Recorrido de obtener_estadisticas_logs antes de parser_logs"""
+    por_nivel = {}
+    primero = ultimo = None
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for linea in f:
+            partes = linea.split(' | ')
+            if len(partes) >= 3:
+                timestamp = datetime.strptime(partes[0], '%Y-%m-%d %H:%M:%S')
+                nivel = partes[1].strip()
+                if primero is None or timestamp < primero:
+                    primero = timestamp
+                if ultimo is None or timestamp > ultimo:
+                    ultimo = timestamp
+                por_nivel[nivel] = por_nivel.get(nivel, 0) + 1
+    return por_nivel
+
+
+def estadisticas_parser(ruta):
+    """Mismo recorrido con cortes fijos y comparación de cadenas"""
+    por_nivel = {}
+    primero = ultimo = None
+    with open(ruta, 'rb') as f:
+        for linea in f:
+            marca, nivel = marca_y_nivel(linea)
+            if marca is None:
+                continue
+            if primero is None or marca < primero:
+                primero = marca
+            if ultimo is None or marca > ultimo:
+                ultimo = marca
+            por_nivel[nivel] = por_nivel.get(nivel, 0) + 1
+    return por_nivel
+
+
+def cronometrar(funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamano-mb', type=int, default=1024)
+    parser.add_argument('--directorio', help="Directorio para el log sintético (por defecto, uno temporal)")
+    args = parser.parse_args()
+
+    directorio = args.directorio or tempfile.mkdtemp(prefix='bench_logs_')
+    ruta = os.path.join(directorio, 'monitor.log')
+    try:
+        print(f"Generando log de {args.tamano_mb} MB...")
+        lineas = generar_log(ruta, args.tamano_mb)
+        print(f"{lineas} líneas, {os.path.getsize(ruta) / (1024 * 1024):.0f} MB\n")
+
+        t_strptime, niveles_a = cronometrar(estadisticas_strptime, ruta)
+        t_parser, niveles_b = cronometrar(estadisticas_parser, ruta)
+        assert niveles_a == niveles_b
+
+        if os.path.exists(indice_logs.ruta_indice(ruta)):
+            os.unlink(indice_logs.ruta_indice(ruta))
+        t_indice, _ = cronometrar(indice_logs.estadisticas, [ruta])
+        t_stats, _ = cronometrar(indice_logs.estadisticas, [ruta])
+
+        # Una hora en mitad del log
+        mitad = datetime(2024, 1, 1) + timedelta(seconds=lineas // 40)
+        desde = mitad.strftime('%Y-%m-%d %H:%M:%S')
+        hasta = (mitad + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S')
+        destino = os.path.join(directorio, 'exportado.log')
+        t_exportar, exportadas = cronometrar(indice_logs.exportar, [ruta], destino, desde, hasta)
+
+        print(f"{'operación':<42} | {'tiempo':>10} | {'por línea':>10}")
+        print("-" * 68)
+        for nombre, t in (("estadísticas con split + strptime", t_strptime),
+                          ("estadísticas con parser_logs", t_parser),
+                          ("construcción del índice (una vez)", t_indice)):
+            print(f"{nombre:<42} | {t:>9.2f}s | {t / lineas * 1e6:>8.2f}µs")
+        print(f"{'estadísticas desde el índice':<42} | {t_stats * 1000:>8.1f}ms |")
+        print(f"{f'exportar 1 hora ({exportadas} líneas)':<42} | {t_exportar * 1000:>8.1f}ms |")
+        print(f"\nparser_logs frente a strptime: {t_strptime / t_parser:.1f}x")
+    finally:
+        if not args.directorio:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de recolectores de procesos: psutil frente al lector directo de /proc.
+
+Genera un /proc sintético con N procesos (1k, 5k y 20k por defecto) para que
+ambos recolectores lean exactamente los mismos datos y mide el tiempo medio
+de un barrido en régimen estable (tras un primer barrido de calentamiento).
+
+Uso:
+    python benchmarks/bench_recolectores.py [N ...] [--repeticiones R]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import psutil  # noqa: E402
+
+from muestreo_procesos import RecolectorPsutil  # noqa: E402
+from recolector_proc import RecolectorProc  # noqa: E402
+
+
+def crear_proc_sintetico(directorio, n_procesos):
+    """Crea un árbol tipo /proc con n_procesos entradas"""
+    # Ficheros globales que psutil consulta
+    with open('/proc/stat') as f_origen, open(os.path.join(directorio, 'stat'), 'w') as f:
+        f.write(f_origen.read())
+    shutil.copy('/proc/uptime', os.path.join(directorio, 'uptime'))
+    os.makedirs(os.path.join(directorio, 'self'), exist_ok=True)
+    shutil.copy('/proc/self/stat', os.path.join(directorio, 'self', 'stat'))
+
+    for pid in range(1000, 1000 + n_procesos):
+        base = os.path.join(directorio, str(pid))
+        os.mkdir(base)
+        nombre = f"proceso_{pid % 97}"
+        with open(os.path.join(base, 'stat'), 'w') as f:
+            f.write(
+                f"{pid} ({nombre}) S 1 {pid} {pid} 0 -1 4194304 100 0 0 0 "
+                f"{pid % 500} {pid % 70} 0 0 20 0 1 0 {5000 + pid} 10485760 {pid % 4096} "
+                "18446744073709551615 0 0 0 0 0 0 0 0 0 0 0 0 17 0 0 0 0 0 0\n"
+            )
+        with open(os.path.join(base, 'statm'), 'w') as f:
+            f.write(f"2560 {pid % 4096} 300 5 0 123 0\n")
+        with open(os.path.join(base, 'cmdline'), 'w') as f:
+            f.write(f"/usr/bin/{nombre}\0--opcion\0")
+
+
+def medir(recolector, repeticiones):
+    """Tiempo medio (s) de un barrido tras uno de calentamiento"""
+    recolector.recolectar()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        n = len(recolector.recolectar())
+    return (time.perf_counter() - inicio) / repeticiones, n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('tamanos', nargs='*', type=int, default=[1000, 5000, 20000])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    procfs_original = psutil.PROCFS_PATH
+    print(f"{'procesos':>9} | {'psutil (ms)':>12} | {'/proc (ms)':>11} | {'aceleración':>11}")
+    print("-" * 52)
+    for n_procesos in args.tamanos:
+        directorio = tempfile.mkdtemp(prefix='bench_proc_')
+        try:
+            crear_proc_sintetico(directorio, n_procesos)
+
+            psutil.PROCFS_PATH = directorio
+            t_psutil, n_psutil = medir(RecolectorPsutil(), args.repeticiones)
+            psutil.PROCFS_PATH = procfs_original
+
+            recolector_proc = RecolectorProc(raiz=directorio)
+            t_proc, n_proc = medir(recolector_proc, args.repeticiones)
+            recolector_proc.cerrar()
+
+            if n_psutil != n_proc:
+                print(f"Aviso: psutil vio {n_psutil} procesos y /proc {n_proc}")
+            print(f"{n_procesos:>9} | {t_psutil * 1000:>12.1f} | {t_proc * 1000:>11.1f} | {t_psutil / t_proc:>10.1f}x")
+        finally:
+            psutil.PROCFS_PATH = procfs_original
+            shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
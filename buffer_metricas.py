@@ -0,0 +1,113 @@
+import threading
+from array import array
+
+NAN = float('nan')
+
+
+class BufferMetricas:
+    """Últimas N muestras de CPU y memoria por proceso en buffers circulares compactos.
+
+    Cada proceso ocupa un *slot*; las muestras de todos los slots se guardan en
+    dos arrays planos de ``float32`` (CPU en % y memoria en MB) de tamaño
+    ``slots * capacidad``, donde la columna la marca el contador global de
+    ciclos. Las marcas de tiempo se guardan una sola vez por ciclo. Cuando un
+    proceso termina su slot vuelve a la lista de libres y se reutiliza, y si no
+    quedan libres los arrays se duplican.
+
+    Huella en memoria: 8 bytes por muestra y slot (dos float32), 16 bytes
+    por slot de índices, 8 bytes por columna para las marcas de tiempo y una
+    entrada de diccionario por proceso vivo. Con 5000 procesos y 600 muestras
+    los datos ocupan ~24 MB (hasta ~40 MB porque los slots crecen
+    duplicándose), frente a casi 500 MB con un deque de tuplas por proceso.
+    ``memoria_utilizada()`` devuelve la cifra exacta.
+    """
+
+    def __init__(self, capacidad=600, slots_iniciales=256):
+        self.capacidad = capacidad
+        self.slots = 0
+        self.cpu = array('f')
+        self.memoria = array('f')
+        self.tiempos = array('d', [NAN]) * capacidad  # Marca de tiempo de cada columna
+        self.inicio = array('q')     # Ciclo en el que se asignó cada slot
+        self.pid_slot = array('q')   # PID que ocupa cada slot (-1 si está libre)
+        self.slot_de = {}            # pid -> slot
+        self.libres = []
+        self.ciclo = -1              # Último ciclo escrito
+        self._lock = threading.Lock()
+        self._crecer(slots_iniciales)
+
+    def registrar(self, instantanea):
+        """Suscriptor del muestreador: añade una columna con la instantánea"""
+        with self._lock:
+            self.ciclo += 1
+            columna = self.ciclo % self.capacidad
+            self.tiempos[columna] = instantanea.timestamp
+
+            # Reciclar primero los slots de los procesos que ya no existen, para que
+            # los nuevos de este mismo ciclo los reutilicen en lugar de crecer
+            vistos = {muestra.pid for muestra in instantanea.procesos}
+            for pid in self.slot_de.keys() - vistos:
+                slot = self.slot_de.pop(pid)
+                self.pid_slot[slot] = -1
+                self.libres.append(slot)
+
+            for muestra in instantanea.procesos:
+                slot = self.slot_de.get(muestra.pid)
+                if slot is None:
+                    slot = self._asignar(muestra.pid)
+                posicion = slot * self.capacidad + columna
+                self.cpu[posicion] = muestra.cpu
+                self.memoria[posicion] = muestra.memoria / (1024 * 1024)
+
+    def serie(self, pid):
+        """Devuelve [(timestamp, cpu, memoria_mb), ...] en orden cronológico para un PID"""
+        with self._lock:
+            slot = self.slot_de.get(pid)
+            if slot is None:
+                return []
+            primero = max(self.inicio[slot], self.ciclo - self.capacidad + 1)
+            base = slot * self.capacidad
+            resultado = []
+            for ciclo in range(primero, self.ciclo + 1):
+                columna = ciclo % self.capacidad
+                resultado.append((self.tiempos[columna], self.cpu[base + columna], self.memoria[base + columna]))
+            return resultado
+
+    def ultimo(self, pid):
+        """Última muestra (cpu, memoria_mb) de un PID, o None"""
+        with self._lock:
+            slot = self.slot_de.get(pid)
+            if slot is None or self.ciclo < 0:
+                return None
+            posicion = slot * self.capacidad + self.ciclo % self.capacidad
+            return self.cpu[posicion], self.memoria[posicion]
+
+    def memoria_utilizada(self):
+        """Bytes ocupados por los arrays de datos e índices"""
+        arrays = (self.cpu, self.memoria, self.tiempos, self.inicio, self.pid_slot)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def __len__(self):
+        return len(self.slot_de)
+
+    def _asignar(self, pid):
+        if not self.libres:
+            self._crecer(max(1, self.slots))
+        slot = self.libres.pop()
+        self.slot_de[pid] = slot
+        self.pid_slot[slot] = pid
+        self.inicio[slot] = self.ciclo
+        # Los datos del ocupante anterior quedan fuera del rango válido por self.inicio
+        return slot
+
+    def _crecer(self, nuevos):
+        """Añade slots libres duplicando (o ampliando) los arrays"""
+        relleno = array('f', [NAN]) * (nuevos * self.capacidad)
+        self.cpu.extend(relleno)
+        self.memoria.extend(relleno)
+        self.inicio.extend(array('q', [0]) * nuevos)
+        self.pid_slot.extend(array('q', [-1]) * nuevos)
+        # Los nuevos se añaden al final de la pila para asignar primero los más bajos
+        self.libres.extend(range(self.slots + nuevos - 1, self.slots - 1, -1))
+        self.slots += nuevos
+
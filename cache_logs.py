@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import deque
+
+NIVELES = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+
+class EntradaLog:
+    """Registro del cache de logs: compacto y con la fecha formateada bajo demanda"""
+
+    __slots__ = ('seq', 'instante', 'nivel', 'mensaje')
+
+    def __init__(self, seq, instante, nivel, mensaje):
+        self.seq = seq
+        self.instante = instante
+        self.nivel = nivel
+        self.mensaje = mensaje
+
+    @property
+    def timestamp(self):
+        return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.instante))
+
+    def __getitem__(self, clave):
+        # Compatibilidad con el antiguo formato de diccionario
+        if clave in ('timestamp', 'nivel', 'mensaje'):
+            return getattr(self, clave)
+        raise KeyError(clave)
+
+
+class CacheLogs:
+    """Últimos N registros de log en un buffer circular con vistas por nivel.
+
+    Añadir es O(1): el deque descarta solo el registro más antiguo. Cada nivel
+    tiene además su propio deque, de modo que filtrar por nivel no recorre el
+    cache completo. Los registros llevan un número de secuencia creciente para
+    que el visor pida solo lo nuevo desde su último refresco.
+    """
+
+    def __init__(self, capacidad=1000):
+        self.capacidad = capacidad
+        self._todos = deque(maxlen=capacidad)
+        self._por_nivel = {nivel: deque(maxlen=capacidad) for nivel in NIVELES}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def agregar(self, nivel, mensaje):
+        with self._lock:
+            self._seq += 1
+            entrada = EntradaLog(self._seq, time.time(), nivel, mensaje)
+            self._todos.append(entrada)
+            vista = self._por_nivel.get(nivel)
+            if vista is not None:
+                vista.append(entrada)
+        return entrada
+
+    def entradas(self, nivel=None, desde_seq=0):
+        """Registros (del nivel indicado, o todos) con seq > desde_seq, en orden"""
+        with self._lock:
+            origen = self._todos if nivel is None else self._por_nivel.get(nivel, ())
+            if not origen:
+                return []
+            # Lo que ya salió del cache general tampoco se muestra en las vistas por nivel
+            primero = max(desde_seq, self._todos[0].seq - 1)
+            nuevas = []
+            for entrada in reversed(origen):
+                if entrada.seq <= primero:
+                    break
+                nuevas.append(entrada)
+        nuevas.reverse()
+        return nuevas
+
+    @property
+    def ultimo_seq(self):
+        return self._seq
+
+    def clear(self):
+        with self._lock:
+            self._todos.clear()
+            for vista in self._por_nivel.values():
+                vista.clear()
+
+    def __len__(self):
+        return len(self._todos)
+
+    def __iter__(self):
+        return iter(self.entradas())
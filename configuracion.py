@@ -1,41 +1,96 @@
+import atexit
+import copy
 import json
 import os
+import tempfile
+import threading
 from pathlib import Path
 
+from vigilante_config import firma_archivo
+
+# Segundos que se espera tras el último cambio antes de escribir config.json
+RETARDO_GUARDADO = 1.0
+
 class ConfiguracionManager:
-    def __init__(self):
+    def __init__(self, retardo_guardado=RETARDO_GUARDADO):
         # Crear directorio de configuración en el home del usuario
         self.config_dir = Path.home() / '.config' / 'quien-se-come-recursos'
         self.config_file = self.config_dir / 'config.json'
         self.create_config_dir()
+        
+        # Configuración ya cargada (se comparte entre quienes usan el gestor) y guardado diferido
+        self.configuracion = None
+        self._firma = None  # Firma de config.json tras la última lectura o escritura propia
+        self.retardo_guardado = retardo_guardado
+        self._lock = threading.RLock()
+        self._pendiente = None
+        self._temporizador = None
+        self.logs = None  # SistemaLogs: los guardados diferidos fallan lejos de quien los pidió
         self.configuracion_default = {
             'umbrales': {
                 'cpu_porcentaje': 50,
-                'memoria_mb': 500
+                'memoria_mb': 500,
+                # Umbrales por proceso; gana el primero que coincide. Cada perfil lleva uno de
+                # 'nombre', 'usuario', 'cmdline' o 'cgroup' y 'cpu_porcentaje' y/o 'memoria_mb'
+                'perfiles': []
             },
             'interfaz': {
                 'tema': 'claro',  # 'claro', 'oscuro', 'sistema'
                 'ventana_ancho': 800,
                 'ventana_alto': 600,
                 'mostrar_iconos_procesos': True,
-                'tamaño_fuente': 9
+                'tamaño_fuente': 9,
+                'umbral_lista_virtual': 2000
             },
             'monitoreo': {
                 'intervalo_actualizacion': 3,
                 'mostrar_notificaciones': True,
                 'procesos_excluidos': ['System Idle Process', 'kernel_task'],
-                'auto_minimizar_bandeja': True
+                'auto_minimizar_bandeja': True,
+                'recolector': 'auto',  # 'auto', 'proc' (solo Linux) o 'psutil'
+                'muestras_recientes': 600,  # Muestras por proceso en memoria (tendencias, gráficas)
+                'recarga_automatica_config': True,  # Aplicar en caliente los cambios hechos en config.json
+                'intervalo_adaptativo': True,  # Muestrear más rápido cerca de un umbral y más lento en reposo
+                'intervalo_minimo': 1,  # Segundos entre barridos cerca de un umbral o tras abrir la ventana
+                'intervalo_maximo': 30,  # Segundos entre barridos en reposo con la ventana oculta
+                'carga_reposo_porcentaje': 20,  # CPU total por debajo de la cual el sistema está en reposo
+                'cuota_cpu_muestreo_porcentaje': 5  # Máximo % de un núcleo que puede usar el muestreo
             },
             'alertas': {
                 'sonido_habilitado': True,
                 'nivel_minimo_alerta': 'media',
-                'duracion_notificacion': 5000
+                'duracion_notificacion': 5000,
+                'intervalo_notificacion_proceso': 300,  # Segundos mínimos entre avisos del mismo proceso
+                'duracion_activacion': 10,  # Segundos superando el umbral antes de disparar la alerta
+                'duracion_resolucion': 10,  # Segundos por debajo del umbral de recuperación para resolverla
+                'histeresis_porcentaje': 10,  # El umbral de recuperación es el umbral menos este %
+                'tendencia_memoria': True,  # Avisar de procesos cuya memoria crece hacia el umbral (numpy)
+                'tendencia_ventana_muestras': 100,  # Muestras usadas para estimar el crecimiento
+                'tendencia_horizonte_minutos': 60,  # Avisar si el umbral se alcanzará antes de este plazo
+                'tendencia_crecimiento_minimo_mb_min': 1.0  # Crecimientos menores se ignoran
             },
             'logs': {
                 'habilitar_logs': True,
                 'nivel_log': 'INFO',
                 'dias_retencion': 30,
-                'archivo_log': str(self.config_dir / 'monitor.log')
+                'archivo_log': str(self.config_dir / 'monitor.log'),
+                'rotacion': 'diaria',  # 'diaria' (un segmento por día) o 'ninguna'
+                'tamano_maximo_mb': 0,  # Si > 0, rota también al superar este tamaño
+                'escritura_asincrona': True,  # Escribir desde un hilo propio, por lotes
+                'tamano_cola': 10000,  # Registros pendientes como máximo
+                'politica_descarte': 'descartar_nuevos',  # Con la cola llena: 'descartar_nuevos', 'descartar_antiguos' o 'bloquear'
+                'tamano_lote': 500,
+                'intervalo_vaciado': 1.0,  # Segundos máximos hasta escribir un registro
+                'eventos_estructurados': True  # Alertas, acciones y cambios también en eventos/*.jsonl
+            },
+            'historial': {
+                'habilitar_historial': True,
+                'archivo': str(self.config_dir / 'historial.db'),
+                'intervalo_registro': 15,  # Segundos entre muestras guardadas
+                'memoria_minima_mb': 1,  # No guardar procesos sin memoria ni CPU (hilos del kernel)
+                'retencion_bruto_horas': 24,
+                'retencion_minuto_dias': 7,
+                'retencion_hora_dias': 90
             }
         }
     
@@ -47,15 +102,27 @@ class ConfiguracionManager:
         except Exception as e:
             print(f"Error creando directorio de configuración: {e}")
     
-    def cargar_configuracion(self):
-        """Carga la configuración desde el archivo, usa defaults si no existe"""
+    def cargar_configuracion(self, recargar=False):
+        """Devuelve la configuración, leyendo el archivo solo la primera vez (o si recargar).
+        
+        Usa defaults si no existe. El dict devuelto es el mismo para todos los
+        llamadores, de modo que los cambios de uno los ven los demás.
+        """
+        with self._lock:
+            if self.configuracion is not None and not recargar:
+                return self.configuracion
+            self.configuracion = self._leer_configuracion()
+            return self.configuracion
+    
+    def _leer_configuracion(self):
         try:
             if self.config_file.exists():
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     config_cargada = json.load(f)
+                self._firma = firma_archivo(self.config_file)
                 
                 # Fusionar con defaults para añadir nuevas opciones
-                configuracion = self.configuracion_default.copy()
+                configuracion = copy.deepcopy(self.configuracion_default)
                 self._fusionar_config(configuracion, config_cargada)
                 
                 print("Configuración cargada exitosamente")
@@ -63,23 +130,100 @@ class ConfiguracionManager:
             else:
                 print("Archivo de configuración no encontrado, usando valores por defecto")
                 self.guardar_configuracion(self.configuracion_default)
-                return self.configuracion_default.copy()
+                return copy.deepcopy(self.configuracion_default)
         
         except Exception as e:
             print(f"Error cargando configuración: {e}")
             print("Usando configuración por defecto")
-            return self.configuracion_default.copy()
+            return copy.deepcopy(self.configuracion_default)
     
     def guardar_configuracion(self, configuracion):
-        """Guarda la configuración al archivo"""
+        """Guarda la configuración al archivo de inmediato (descarta un guardado diferido pendiente).
+        
+        Se escribe un temporal en el mismo directorio, se sincroniza con fsync
+        y se renombra sobre config.json: un fallo a mitad deja el archivo
+        anterior intacto, nunca uno truncado.
+        """
+        with self._lock:
+            self._cancelar_temporizador()
+            self._pendiente = None
+            try:
+                self._escribir_atomico(configuracion)
+                print("Configuración guardada exitosamente")
+                return True
+            except Exception as e:
+                print(f"Error guardando configuración: {e}")
+                if self.logs:
+                    self.logs.log_error(f"Error guardando configuración: {e}")
+                return False
+    
+    def _escribir_atomico(self, configuracion):
+        fd, temporal = tempfile.mkstemp(prefix='.config-', suffix='.tmp', dir=self.config_dir)
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
                 json.dump(configuracion, f, indent=4, ensure_ascii=False)
-            print("Configuración guardada exitosamente")
-            return True
-        except Exception as e:
-            print(f"Error guardando configuración: {e}")
-            return False
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, self.config_file)
+            self._firma = firma_archivo(self.config_file)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.unlink(temporal)
+            raise
+    
+    def recargar_si_cambio(self):
+        """Relee config.json si otro proceso o el usuario lo ha modificado.
+        
+        Las secciones que cambian se sustituyen dentro del dict compartido
+        (quien lo tenga ve los valores nuevos) y se devuelven sus nombres. Si
+        el archivo es el que escribió este gestor o no ha cambiado, no se lee.
+        """
+        with self._lock:
+            firma = firma_archivo(self.config_file)
+            if self.configuracion is None or firma is None or firma == self._firma:
+                return []
+            try:
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    config_cargada = json.load(f)
+            except (OSError, ValueError) as e:
+                # Puede estar a medio escribir: se reintenta en el siguiente cambio
+                print(f"Error recargando configuración: {e}")
+                return []
+            self._firma = firma
+            
+            nueva = copy.deepcopy(self.configuracion_default)
+            self._fusionar_config(nueva, config_cargada)
+            cambiadas = [seccion for seccion, valor in nueva.items() if self.configuracion.get(seccion) != valor]
+            for seccion in cambiadas:
+                self.configuracion[seccion] = nueva[seccion]
+            return cambiadas
+    
+    def programar_guardado(self, configuracion):
+        """Guarda la configuración tras retardo_guardado segundos sin nuevos cambios.
+        
+        Varios cambios seguidos (p.ej. desde las ventanas de configuración) se
+        agrupan en una sola escritura con el último estado. Se guarda una copia:
+        el hilo del temporizador no serializa un dict que otro hilo sigue tocando.
+        """
+        with self._lock:
+            self._pendiente = copy.deepcopy(configuracion)
+            self._cancelar_temporizador()
+            self._temporizador = threading.Timer(self.retardo_guardado, self.vaciar_guardado)
+            self._temporizador.daemon = True
+            self._temporizador.start()
+    
+    def vaciar_guardado(self):
+        """Escribe ya el guardado diferido pendiente, si lo hay"""
+        with self._lock:
+            configuracion = self._pendiente
+            if configuracion is None:
+                return True
+            return self.guardar_configuracion(configuracion)
+    
+    def _cancelar_temporizador(self):
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
     
     def _fusionar_config(self, base, nueva):
         """Fusiona configuración nueva con la base, manteniendo estructura"""
@@ -108,7 +252,8 @@ class ConfiguracionManager:
     def resetear_configuracion(self):
         """Resetea la configuración a valores por defecto"""
         try:
-            self.guardar_configuracion(self.configuracion_default)
+            if not self.guardar_configuracion(self.configuracion_default):
+                return False
             print("Configuración reseteada a valores por defecto")
             return True
         except Exception as e:
@@ -141,13 +286,26 @@ class ConfiguracionManager:
             print(f"Error importando configuración: {e}")
             return False
 
+# Gestor compartido por todo el proceso
+_gestor = None
+_lock_gestor = threading.Lock()
+
+def obtener_gestor():
+    """Devuelve el gestor de configuración del proceso, creándolo la primera vez"""
+    global _gestor
+    with _lock_gestor:
+        if _gestor is None:
+            _gestor = ConfiguracionManager()
+            # Que un guardado diferido no se pierda al salir
+            atexit.register(_gestor.vaciar_guardado)
+        return _gestor
+
 # Funciones de conveniencia para usar desde otros módulos
 def cargar_config():
     """Función de conveniencia para cargar configuración"""
-    manager = ConfiguracionManager()
+    manager = obtener_gestor()
     return manager.cargar_configuracion(), manager
 
 def guardar_config(configuracion):
     """Función de conveniencia para guardar configuración"""
-    manager = ConfiguracionManager()
-    return manager.guardar_configuracion(configuracion)
+    return obtener_gestor().guardar_configuracion(configuracion)
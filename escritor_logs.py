@@ -0,0 +1,248 @@
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import date
+
+from indice_logs import IndiceLog
+from retencion_logs import nombre_segmento
+
+# Políticas cuando la cola está llena
+POLITICAS_DESCARTE = ('descartar_nuevos', 'descartar_antiguos', 'bloquear')
+
+
+class ManejadorCola(logging.handlers.QueueHandler):
+    """QueueHandler con cola acotada y política de descarte.
+
+    En el hilo que registra solo se crea el LogRecord y se encola: el formato
+    y la escritura los hace el hilo de ``EscritorLogsLotes``. Si la cola está
+    llena se aplica la política configurada y se cuentan los descartes.
+    """
+
+    def __init__(self, tamano_cola=10000, politica='descartar_nuevos', tamano_lote=500):
+        super().__init__(queue.Queue(maxsize=tamano_cola))
+        self.politica = politica if politica in POLITICAS_DESCARTE else 'descartar_nuevos'
+        self.tamano_lote = tamano_lote
+        self.lote_listo = threading.Event()  # Avisa al escritor de que hay un lote completo
+        self.descartados = 0
+        self._lock_descartes = threading.Lock()  # Registran varios hilos a la vez
+
+    def prepare(self, record):
+        # Los mensajes de SistemaLogs ya son cadenas sin argumentos: no hace
+        # falta formatear aquí, se formatean por lotes en el hilo escritor
+        return record
+
+    def enqueue(self, record):
+        if self.politica == 'bloquear':
+            if self.queue.full():
+                # Que el escritor vacíe la cola ya en lugar de esperar al intervalo
+                self.lote_listo.set()
+            self.queue.put(record)
+        else:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self._descartar(record)
+                return
+        if self.queue.qsize() >= self.tamano_lote and not self.lote_listo.is_set():
+            self.lote_listo.set()
+
+    def _descartar(self, record):
+        """Cola llena con una política de descarte"""
+        with self._lock_descartes:
+            self.descartados += 1
+        self.lote_listo.set()
+        if self.politica == 'descartar_antiguos':
+            try:
+                antiguo = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if not isinstance(antiguo, logging.LogRecord):
+                # Marcador de fin o de vaciado del escritor: nunca se descarta; se
+                # vuelve a encolar (acaba de quedar un hueco) y se pierde el nuevo
+                self.queue.put(antiguo)
+                return
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                pass
+
+
+class ManejadorArchivoLotes(logging.FileHandler):
+    """FileHandler que escribe un lote de registros con una sola escritura.
+
+    Con ``rotacion='diaria'`` el archivo activo se renombra a
+    ``<archivo>.AAAA-MM-DD`` al cambiar de día, y con ``tamano_maximo`` (bytes)
+    también al superar ese tamaño, de modo que la retención se reduce a borrar
+    segmentos completos. ``al_rotar`` se llama (con el lock tomado) tras cada
+    rotación. Con ``indexar`` mantiene además el índice por bloques
+    (``<archivo>.idx``) que usan la exportación y las estadísticas.
+    """
+
+    def __init__(self, filename, rotacion=None, tamano_maximo=0, al_rotar=None, indexar=True, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.rotacion = rotacion
+        self.tamano_maximo = tamano_maximo
+        self.al_rotar = al_rotar
+        self.indexar = indexar
+        self.indice = None  # Se carga en la primera escritura (fuera del hilo que crea el logger)
+        # Día al que pertenece el archivo activo (el de su última escritura si ya existía)
+        try:
+            self._dia = date.fromtimestamp(os.path.getmtime(self.baseFilename))
+        except OSError:
+            self._dia = date.today()
+
+    def emit(self, record):
+        self.emitir_lote([record])
+
+    def emitir_lote(self, registros):
+        try:
+            lineas = [self.format(r) + self.terminator for r in registros]
+            with self.lock:
+                if self.rotacion:
+                    self._rotar_si_toca()
+                if self.stream is None:
+                    self.stream = self._open()
+                    # El archivo pudo cambiar mientras estaba cerrado (recorte de retención)
+                    self.indice = None
+                self.stream.write(''.join(lineas))
+                self.stream.flush()
+                if self.indexar:
+                    self._indexar(registros, lineas)
+        except Exception:
+            self.handleError(registros[-1])
+
+    def _indexar(self, registros, lineas):
+        if self.indice is None:
+            self.indice = IndiceLog(self.baseFilename)
+        codificacion = self.encoding or 'utf-8'
+        # En modo texto cada '\n' se escribe como os.linesep ('\r\n' en Windows)
+        extra = len(os.linesep) - 1
+        for registro, linea in zip(registros, lineas):
+            n = linea.count('\n')
+            self.indice.registrar(
+                getattr(registro, 'asctime', None), registro.levelname,
+                len(linea.encode(codificacion, 'replace')) + n * extra, n
+            )
+
+    def close(self):
+        with self.lock:
+            if self.indice is not None:
+                self.indice.cerrar_bloque()
+        super().close()
+
+    def _rotar_si_toca(self):
+        hoy = date.today()
+        if hoy != self._dia:
+            self.rotar()
+        elif self.tamano_maximo and self.stream is not None and self.stream.tell() >= self.tamano_maximo:
+            self.rotar()
+        self._dia = hoy
+
+    def rotar(self):
+        """Cierra el archivo activo y lo renombra como segmento de su día"""
+        with self.lock:
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+            if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+                segmento = nombre_segmento(self.baseFilename, self._dia)
+                os.replace(self.baseFilename, segmento)
+                if self.indice is not None:
+                    self.indice.rotar(segmento)
+            if self.al_rotar:
+                self.al_rotar()
+
+
+class EscritorLogsLotes:
+    """Hilo que vacía la cola de logs por lotes.
+
+    Escribe cuando hay ``tamano_lote`` registros en cola o cuando pasan
+    ``intervalo_vaciado`` segundos desde el primero pendiente. Mientras
+    acumula no espera en la cola sino en un Event, de modo que encolar no
+    despierta al hilo en cada registro. Los manejadores con ``emitir_lote``
+    reciben el lote entero; el resto, registro a registro respetando su nivel.
+    """
+
+    _FIN = object()
+
+    def __init__(self, manejador_cola, manejadores, intervalo_vaciado=1.0):
+        self.manejador_cola = manejador_cola
+        self.cola = manejador_cola.queue
+        self.manejadores = manejadores
+        self.intervalo_vaciado = intervalo_vaciado
+        self._descartes_informados = 0
+        self._hilo = None
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._bucle, name='EscritorLogs', daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout=5):
+        """Escribe lo pendiente y termina el hilo"""
+        if self._hilo is None:
+            return
+        # put bloqueante: el marcador de fin nunca se descarta
+        self.cola.put(self._FIN)
+        self.manejador_cola.lote_listo.set()
+        self._hilo.join(timeout)
+        self._hilo = None
+        for manejador in self.manejadores:
+            manejador.close()
+
+    def vaciar(self, timeout=5):
+        """Espera a que se escriba todo lo encolado hasta ahora; False si no dio tiempo"""
+        if self._hilo is None or threading.current_thread() is self._hilo:
+            return False
+        # Un Event en la cola marca el punto hasta el que hay que escribir
+        escrito = threading.Event()
+        self.cola.put(escrito)
+        self.manejador_cola.lote_listo.set()
+        return escrito.wait(timeout)
+
+    def _bucle(self):
+        fin = False
+        while not fin:
+            # Sin pendientes se espera en la cola; con el primero se abre el lote
+            lote = [self.cola.get()]
+            self.manejador_cola.lote_listo.wait(self.intervalo_vaciado)
+            self.manejador_cola.lote_listo.clear()
+            while True:
+                try:
+                    lote.append(self.cola.get_nowait())
+                except queue.Empty:
+                    break
+            marcas = [r for r in lote if r is self._FIN or isinstance(r, threading.Event)]
+            if marcas:
+                fin = self._FIN in marcas
+                lote = [r for r in lote if r is not self._FIN and not isinstance(r, threading.Event)]
+            try:
+                self._escribir(lote)
+            finally:
+                for marca in marcas:
+                    if marca is not self._FIN:
+                        marca.set()
+
+    def _escribir(self, lote):
+        descartados = self.manejador_cola.descartados
+        if descartados != self._descartes_informados:
+            aviso = logging.LogRecord(
+                'MonitorRecursos', logging.WARNING, __file__, 0,
+                f"Cola de logs llena: {descartados - self._descartes_informados} registros descartados",
+                None, None
+            )
+            self._descartes_informados = descartados
+            lote.append(aviso)
+        if not lote:
+            return
+
+        for manejador in self.manejadores:
+            if hasattr(manejador, 'emitir_lote'):
+                registros = [r for r in lote if r.levelno >= manejador.level]
+                if registros:
+                    manejador.emitir_lote(registros)
+            else:
+                for registro in lote:
+                    if registro.levelno >= manejador.level:
+                        manejador.handle(registro)
@@ -0,0 +1,118 @@
+# Estados de la alerta de un proceso (los procesos en OK no se guardan)
+OK = 0
+PENDIENTE = 1    # Supera el umbral, aún no durante duracion_activacion
+ACTIVA = 2       # Alerta disparada
+RESOLVIENDO = 3  # Por debajo del umbral de recuperación, aún no durante duracion_resolucion
+
+NOMBRES_ESTADO = {OK: 'ok', PENDIENTE: 'pendiente', ACTIVA: 'activa', RESOLVIENDO: 'resolviendo'}
+
+# Transiciones que devuelve MaquinaAlertas.actualizar()
+DISPARADA = 'disparada'
+RESUELTA = 'resuelta'
+
+
+class EstadoProceso:
+    """Estado de alerta de un proceso (PID + instante de creación)"""
+
+    __slots__ = ('pid', 'creacion', 'nombre', 'estado', 'desde', 'inicio_alerta', 'cpu_max', 'memoria_max')
+
+    def __init__(self, pid, creacion, nombre, desde):
+        self.pid = pid
+        self.creacion = creacion
+        self.nombre = nombre
+        self.estado = PENDIENTE
+        self.desde = desde  # Instante de la última transición
+        self.inicio_alerta = None
+        self.cpu_max = 0.0
+        self.memoria_max = 0
+
+    @property
+    def en_alerta(self):
+        return self.estado in (ACTIVA, RESOLVIENDO)
+
+
+class MaquinaAlertas:
+    """Máquina de estados por proceso: ok -> pendiente -> activa -> resolviendo -> ok.
+
+    Una alerta se dispara cuando el proceso supera su umbral de forma continua
+    durante ``duracion_activacion`` segundos y se resuelve cuando se mantiene
+    ``duracion_resolucion`` segundos por debajo del umbral de recuperación
+    (el umbral reducido en ``histeresis`` %); entre ambos umbrales la alerta
+    sigue como está. Así un proceso que oscila alrededor del límite produce
+    una sola alerta y no una por cruce. Solo se guardan los procesos que no
+    están en OK, en objetos con ``__slots__``, y un PID reutilizado (con otro
+    instante de creación) cuenta como un proceso nuevo.
+    """
+
+    def __init__(self, duracion_activacion=10, duracion_resolucion=10, histeresis=10):
+        self.duracion_activacion = duracion_activacion
+        self.duracion_resolucion = duracion_resolucion
+        self.factor_recuperacion = 1 - histeresis / 100
+        self.estados = {}  # pid -> EstadoProceso
+        self._reutilizados = []  # Estados de PIDs que pasaron a otro proceso en este ciclo
+
+    def __contains__(self, pid):
+        return pid in self.estados
+
+    def actualizar(self, pid, creacion, nombre, cpu, memoria, limite_cpu, limite_memoria, ahora):
+        """Aplica una muestra; devuelve (estado, transición) con transición DISPARADA, RESUELTA o None.
+
+        Si el PID corresponde a otro proceso que el guardado (reutilización),
+        el anterior se da por terminado: su fin se obtiene con ``terminados()``.
+        """
+        supera = cpu > limite_cpu or memoria > limite_memoria
+        estado = self.estados.get(pid)
+        if estado is not None and estado.creacion != creacion:
+            self._reutilizados.append(self.estados.pop(pid))
+            estado = None
+
+        if estado is None:
+            if not supera:
+                return None, None
+            estado = self.estados[pid] = EstadoProceso(pid, creacion, nombre, ahora)
+
+        if estado.en_alerta:
+            estado.cpu_max = max(estado.cpu_max, cpu)
+            estado.memoria_max = max(estado.memoria_max, memoria)
+            recuperado = (cpu <= limite_cpu * self.factor_recuperacion
+                          and memoria <= limite_memoria * self.factor_recuperacion)
+            if not recuperado:
+                estado.estado = ACTIVA
+                return estado, None
+            if estado.estado == ACTIVA:
+                estado.estado = RESOLVIENDO
+                estado.desde = ahora
+            if ahora - estado.desde >= self.duracion_resolucion:
+                del self.estados[pid]
+                return estado, RESUELTA
+            return estado, None
+
+        # PENDIENTE
+        if not supera:
+            del self.estados[pid]
+            return None, None
+        if ahora - estado.desde >= self.duracion_activacion:
+            estado.estado = ACTIVA
+            estado.inicio_alerta = ahora
+            estado.cpu_max = cpu
+            estado.memoria_max = memoria
+            return estado, DISPARADA
+        return estado, None
+
+    def terminados(self, vistos):
+        """Quita los procesos guardados que no están en vistos y devuelve los que estaban en alerta.
+
+        ``vistos`` solo necesita contener los PIDs guardados que siguen vivos.
+        Incluye los procesos cuyo PID se ha reutilizado en el ciclo.
+        """
+        terminados = [e for e in self._reutilizados if e.en_alerta]
+        self._reutilizados = []
+        for pid in [pid for pid in self.estados if pid not in vistos]:
+            estado = self.estados.pop(pid)
+            if estado.en_alerta:
+                terminados.append(estado)
+        return terminados
+
+    def en_alerta(self):
+        """Estados de los procesos con la alerta disparada"""
+        return [e for e in self.estados.values() if e.en_alerta]
@@ -0,0 +1,270 @@
+import copy
+import re
+
+from estado_alertas import DISPARADA, RESUELTA, MaquinaAlertas
+from perfiles_umbrales import PerfilesUmbrales
+from reglas_exclusion import ReglasExclusion
+from tendencias_memoria import TendenciasMemoria, disponible as tendencias_disponibles
+
+# Umbrales por defecto (se cargarán desde configuración)
+DEFAULT_CPU = 50
+DEFAULT_MEM = 500  # MB
+# Fracción de su umbral a partir de la cual un proceso se considera cerca de él
+FRACCION_CERCANIA = 0.9
+
+
+class EvaluadorAlertas:
+    """Aplica umbrales y exclusiones a cada instantánea del muestreador.
+
+    Es común a la interfaz gráfica y al modo daemon, por lo que no depende de
+    Tk, pystray ni plyer.
+    """
+
+    def __init__(self, configuracion, logs, notificar=None):
+        self.configuracion = configuracion
+        self.logs = logs
+        self.notificar = notificar  # callback([info de cada proceso nuevo en alerta])
+
+        config_umbrales = configuracion.get('umbrales', {})
+        self.cpu_umbral = config_umbrales.get('cpu_porcentaje', DEFAULT_CPU)
+        self.mem_umbral_mb = config_umbrales.get('memoria_mb', DEFAULT_MEM)
+
+        self.procesos = []  # (pid, nombre, cpu, memoria_mb) de los procesos en alerta
+        self.alertados = set()
+        self.cerca_de_umbral = False  # Algún proceso cerca de su umbral o con estado de alerta
+        self.maquina = MaquinaAlertas()  # Estado de alerta de cada proceso (duración e histéresis)
+        self.activacion_inmediata = False  # Alertar en el primer barrido (barridos sueltos, --una-vez)
+        self.ultimo_proceso_problematico = None  # Información del último proceso que causó alerta
+
+        # Reglas de exclusión compiladas y la lista de la que salieron (se recompilan si cambia)
+        self.exclusiones = ReglasExclusion([])
+        self._reglas_compiladas = None
+
+        # Umbrales por proceso (umbrales.perfiles), igualmente recompilados al cambiar
+        self.perfiles = PerfilesUmbrales([])
+        self._perfiles_compilados = None
+
+        # Tendencia de memoria por proceso para avisar de posibles fugas (requiere numpy)
+        self.tendencias = None
+        self.tendencias_avisadas = set()  # PIDs ya avisados mientras su memoria siga creciendo
+        self._aviso_sin_numpy = False
+
+    def _actualizar_exclusiones(self):
+        """Recompila las reglas de exclusión si la lista de la configuración ha cambiado"""
+        reglas = self.configuracion.get('monitoreo', {}).get('procesos_excluidos',
+                                                          ['System Idle Process', 'kernel_task'])
+        if reglas == self._reglas_compiladas:
+            return
+        try:
+            exclusiones = ReglasExclusion(reglas)
+        except (TypeError, re.error) as e:
+            self.logs.log_error(f"Reglas de exclusión no válidas ({e}); se mantienen las anteriores")
+        else:
+            # Un patrón no válido se descarta solo; el resto de reglas sigue aplicándose
+            for valor, error in exclusiones.invalidos:
+                self.logs.log_error(f"Regla de exclusión no válida {valor!r} ({error}); se ignora")
+            self.exclusiones = exclusiones
+        self._reglas_compiladas = copy.deepcopy(reglas)
+
+    def _actualizar_perfiles(self):
+        """Recompila los perfiles de umbrales si han cambiado en la configuración"""
+        reglas = self.configuracion.get('umbrales', {}).get('perfiles', [])
+        if reglas == self._perfiles_compilados:
+            return
+        try:
+            perfiles = PerfilesUmbrales(reglas)
+        except (ValueError, TypeError, re.error) as e:
+            self.logs.log_error(f"Perfiles de umbrales no válidos ({e}); se mantienen los anteriores")
+        else:
+            # Un perfil no válido se descarta solo; los demás siguen aplicándose
+            for regla, error in perfiles.invalidos:
+                self.logs.log_error(f"Perfil de umbrales no válido {regla!r} ({error}); se ignora")
+            self.perfiles = perfiles
+        self._perfiles_compilados = copy.deepcopy(reglas)
+
+    def _actualizar_maquina(self):
+        """Aplica a la máquina de estados la duración e histéresis de la configuración"""
+        config_alertas = self.configuracion.get('alertas', {})
+        self.maquina.duracion_activacion = (0 if self.activacion_inmediata
+                                            else config_alertas.get('duracion_activacion', 10))
+        self.maquina.duracion_resolucion = config_alertas.get('duracion_resolucion', 10)
+        self.maquina.factor_recuperacion = 1 - config_alertas.get('histeresis_porcentaje', 10) / 100
+
+    def _actualizar_tendencias(self):
+        """Crea, recrea (si cambia la ventana) o desactiva el seguimiento de tendencias"""
+        config_alertas = self.configuracion.get('alertas', {})
+        if not config_alertas.get('tendencia_memoria', True):
+            self.tendencias = None
+            return
+        if not tendencias_disponibles():
+            if not self._aviso_sin_numpy:
+                self.logs.log_info("Alertas de tendencia de memoria desactivadas: numpy no está instalado")
+                self._aviso_sin_numpy = True
+            return
+        ventana = max(3, int(config_alertas.get('tendencia_ventana_muestras', 100)))
+        if self.tendencias is None or self.tendencias.ventana != ventana:
+            self.tendencias = TendenciasMemoria(ventana)
+            self.tendencias_avisadas = set()
+
+    def _evaluar_tendencias(self, instantanea, excluido, nuevos_info):
+        """Avisa de los procesos cuya memoria, al ritmo actual, superará su umbral dentro del horizonte"""
+        tendencias = self.tendencias
+        tendencias.registrar(instantanea)
+        config_alertas = self.configuracion.get('alertas', {})
+        horizonte = config_alertas.get('tendencia_horizonte_minutos', 60) * 60
+        crecimiento_minimo = config_alertas.get('tendencia_crecimiento_minimo_mb_min', 1.0) / 60
+
+        # Un proceso se vuelve a avisar solo después de dejar de crecer (o si su PID se reutiliza)
+        for pid in [pid for pid in self.tendencias_avisadas
+                    if (tendencias.pendiente(pid) or 0) <= 0]:
+            self.tendencias_avisadas.discard(pid)
+
+        # Filtro vectorizado con el rango de umbrales de memoria (global y perfiles);
+        # el umbral exacto de cada proceso se aplica después
+        limite_minimo = limite_maximo = self.mem_umbral_mb
+        if self.perfiles and self.perfiles.memoria_minima_mb is not None:
+            limite_minimo = min(limite_minimo, self.perfiles.memoria_minima_mb)
+            limite_maximo = max(limite_maximo, self.perfiles.memoria_maxima_mb)
+        candidatos = tendencias.proyecciones(limite_minimo, limite_maximo, horizonte,
+                                             tendencias.ventana // 2)
+        if not candidatos:
+            return
+        muestras = {m.pid: m for m in instantanea.procesos}
+
+        for pid, memoria_mb, pendiente in candidatos:
+            if (pendiente < crecimiento_minimo or pid in self.tendencias_avisadas
+                    or pid in self.maquina):
+                continue
+            muestra = muestras[pid]
+            limite_mb = self.mem_umbral_mb
+            if self.perfiles:
+                perfil = self.perfiles.perfil(pid, muestra.nombre)
+                if perfil is not None and perfil.memoria_mb is not None:
+                    limite_mb = perfil.memoria_mb
+            segundos = (limite_mb - memoria_mb) / pendiente
+            if segundos <= 0 or segundos > horizonte or excluido(pid, muestra.nombre):
+                continue
+
+            self.tendencias_avisadas.add(pid)
+            self.logs.log_tendencia_memoria(muestra.nombre, pid, muestra.memoria // (1024*1024),
+                                            pendiente * 60, segundos / 60, limite_mb)
+            nuevos_info.append({
+                'pid': pid,
+                'nombre': muestra.nombre,
+                'cpu': muestra.cpu,
+                'memoria': muestra.memoria // (1024*1024),
+                'crecimiento_mb_min': pendiente * 60,
+                'minutos_hasta_limite': segundos / 60
+            })
+
+    def evaluar(self, instantanea):
+        """Evalúa una instantánea y devuelve la lista de procesos en alerta"""
+        cpu_max = self.cpu_umbral
+        mem_max = self.mem_umbral_mb * 1024 * 1024
+        ahora = instantanea.timestamp
+        procesos_alerta = []
+        nuevos_info = []
+        vistos = set()  # PIDs con estado guardado presentes en la instantánea
+
+        self._actualizar_exclusiones()
+        self._actualizar_perfiles()
+        self._actualizar_maquina()
+        self._actualizar_tendencias()
+        excluido = self.exclusiones.excluido
+        perfiles = self.perfiles
+        maquina = self.maquina
+
+        # Por debajo del menor umbral (global o de algún perfil) un proceso no puede
+        # entrar en alerta y no hace falta resolver su perfil
+        cpu_min, mem_min = cpu_max, mem_max
+        if perfiles:
+            if perfiles.cpu_minima is not None:
+                cpu_min = min(cpu_min, perfiles.cpu_minima)
+            if perfiles.memoria_minima_mb is not None:
+                mem_min = min(mem_min, perfiles.memoria_minima_mb * 1024 * 1024)
+        # Mientras ningún proceso esté cerca de su umbral también se evalúan los que
+        # pasan de esa fracción del menor umbral; después basta con el umbral
+        cpu_corte = cpu_min * FRACCION_CERCANIA
+        mem_corte = mem_min * FRACCION_CERCANIA
+        cerca = False
+
+        for muestra in instantanea.procesos:
+            cpu = muestra.cpu
+            mem = muestra.memoria
+            nombre = muestra.nombre
+            pid = muestra.pid
+
+            # Descartar valores de CPU anómalos
+            if cpu < 0 or cpu > 100:
+                continue
+
+            # Los procesos con estado (pendiente, en alerta, resolviendo) se evalúan siempre
+            seguido = pid in maquina
+            if not seguido and cpu <= cpu_corte and mem <= mem_corte:
+                continue
+
+            # Umbrales del perfil del proceso, si tiene uno
+            limite_cpu, limite_mem = cpu_max, mem_max
+            if perfiles:
+                perfil = perfiles.perfil(pid, nombre)
+                if perfil is not None:
+                    if perfil.cpu_porcentaje is not None:
+                        limite_cpu = perfil.cpu_porcentaje
+                    if perfil.memoria_mb is not None:
+                        limite_mem = perfil.memoria_mb * 1024 * 1024
+
+            # Las exclusiones solo se consultan para procesos con estado, que superan su
+            # umbral o que se acercan a él
+            if not seguido and cpu <= limite_cpu and mem <= limite_mem:
+                if (not cerca and (cpu > limite_cpu * FRACCION_CERCANIA or mem > limite_mem * FRACCION_CERCANIA)
+                        and not excluido(pid, nombre)):
+                    cerca = True
+                    cpu_corte, mem_corte = cpu_min, mem_min
+                continue
+            if excluido(pid, nombre):
+                continue
+
+            estado, transicion = maquina.actualizar(pid, muestra.creacion, nombre, cpu, mem,
+                                                    limite_cpu, limite_mem, ahora)
+            if estado is None:
+                continue
+            if transicion == RESUELTA:
+                self.logs.log_fin_alerta_proceso(nombre, pid, ahora - estado.inicio_alerta,
+                                                 estado.cpu_max, estado.memoria_max // (1024*1024))
+                continue
+            vistos.add(pid)
+            if not estado.en_alerta:
+                continue
+
+            procesos_alerta.append((pid, nombre, cpu, mem // (1024*1024)))
+            if transicion == DISPARADA:
+                # Almacenar información del último proceso problemático
+                self.ultimo_proceso_problematico = {
+                    'pid': pid,
+                    'nombre': nombre,
+                    'cpu': cpu,
+                    'memoria': mem // (1024*1024)
+                }
+                self.logs.log_alerta_proceso(nombre, pid, cpu, mem // (1024*1024))
+                nuevos_info.append(self.ultimo_proceso_problematico)
+
+        # Alertas de procesos que han terminado (o cuyo PID se ha reutilizado)
+        for estado in maquina.terminados(vistos):
+            self.logs.log_fin_alerta_proceso(estado.nombre, estado.pid, ahora - estado.inicio_alerta,
+                                             estado.cpu_max, estado.memoria_max // (1024*1024))
+
+        if self.tendencias is not None:
+            self._evaluar_tendencias(instantanea, excluido, nuevos_info)
+
+        self.exclusiones.podar()
+        perfiles.podar()
+        self.procesos = procesos_alerta
+        self.alertados = {p[0] for p in procesos_alerta}
+        self.cerca_de_umbral = cerca or bool(maquina.estados)
+
+        # Notificar solo al disparar alertas nuevas y si las notificaciones están habilitadas.
+        # Todas las del ciclo se entregan juntas para que salgan en un único aviso
+        if nuevos_info and self.notificar and self.configuracion.get('monitoreo', {}).get('mostrar_notificaciones', True):
+            self.notificar(nuevos_info)
+
+        return procesos_alerta
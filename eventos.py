@@ -0,0 +1,161 @@
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Tipos de evento
+ALERTA_INICIO = 'alerta_inicio'
+ALERTA_FIN = 'alerta_fin'
+TENDENCIA_MEMORIA = 'tendencia_memoria'
+ACCION_PROCESO = 'accion_proceso'
+CAMBIO_CONFIGURACION = 'cambio_config'
+
+_PREFIJO = 'eventos-'
+_SUFIJO = '.jsonl'
+
+
+def _archivo_del_dia(directorio, dia):
+    return Path(directorio) / f"{_PREFIJO}{dia.isoformat()}{_SUFIJO}"
+
+
+def _dia_de_archivo(ruta):
+    nombre = ruta.name
+    if not (nombre.startswith(_PREFIJO) and nombre.endswith(_SUFIJO)):
+        return None
+    try:
+        return date.fromisoformat(nombre[len(_PREFIJO):-len(_SUFIJO)])
+    except ValueError:
+        return None
+
+
+class RegistroEventos:
+    """Flujo de eventos estructurados (JSON Lines) junto al log de texto.
+
+    Cada evento es un objeto JSON compacto en una línea con ``t`` (epoch),
+    ``tipo`` y los campos propios del tipo, en archivos diarios
+    ``eventos-AAAA-MM-DD.jsonl``. ``registrar()`` solo añade el evento a una
+    lista en memoria; un hilo propio los escribe agrupados cada
+    ``intervalo_vaciado`` segundos o al llegar a ``tamano_lote`` eventos.
+    """
+
+    def __init__(self, directorio, dias_retencion=30, intervalo_vaciado=2.0, tamano_lote=500):
+        self.directorio = Path(directorio)
+        self.dias_retencion = dias_retencion
+        self.intervalo_vaciado = intervalo_vaciado
+        self.tamano_lote = tamano_lote
+        self.directorio.mkdir(parents=True, exist_ok=True)
+
+        self._pendientes = []
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._dia = None
+        self._archivo = None
+        self._hilo = threading.Thread(target=self._bucle, name='RegistroEventos', daemon=True)
+        self._hilo.start()
+
+    def registrar(self, tipo, **campos):
+        """Encola un evento del tipo indicado"""
+        evento = {'t': round(time.time(), 3), 'tipo': tipo}
+        evento.update(campos)
+        with self._lock:
+            self._pendientes.append(evento)
+            lleno = len(self._pendientes) >= self.tamano_lote
+        if lleno:
+            self._despertar.set()
+
+    def cerrar(self):
+        """Escribe lo pendiente y detiene el hilo"""
+        if self._detener.is_set():
+            return
+        self._detener.set()
+        self._despertar.set()
+        self._hilo.join(timeout=5)
+
+    def _bucle(self):
+        while True:
+            detener = self._detener.is_set()
+            self._despertar.wait(self.intervalo_vaciado)
+            self._despertar.clear()
+            with self._lock:
+                lote, self._pendientes = self._pendientes, []
+            if lote:
+                try:
+                    self._escribir(lote)
+                except OSError:
+                    pass
+            if detener:
+                break
+            if self._detener.is_set():
+                # Una vuelta más para escribir lo que llegó mientras se escribía
+                self._despertar.set()
+        if self._archivo:
+            self._archivo.close()
+
+    def _escribir(self, lote):
+        # Agrupar por día para escribir cada archivo con una sola llamada
+        por_dia = {}
+        for evento in lote:
+            dia = date.fromtimestamp(evento['t'])
+            por_dia.setdefault(dia, []).append(json.dumps(evento, ensure_ascii=False, separators=(',', ':')))
+        for dia, lineas in por_dia.items():
+            if dia != self._dia:
+                if self._archivo:
+                    self._archivo.close()
+                self._archivo = open(_archivo_del_dia(self.directorio, dia), 'a', encoding='utf-8')
+                self._dia = dia
+                self._podar()
+            self._archivo.write('\n'.join(lineas) + '\n')
+        self._archivo.flush()
+
+    def _podar(self):
+        """Borra los archivos diarios fuera del periodo de retención"""
+        limite = date.today() - timedelta(days=self.dias_retencion)
+        for ruta in self.directorio.glob(f"{_PREFIJO}*{_SUFIJO}"):
+            dia = _dia_de_archivo(ruta)
+            if dia is not None and dia < limite:
+                try:
+                    ruta.unlink()
+                except OSError:
+                    pass
+
+
+def leer_eventos(directorio, desde=None, hasta=None, tipos=None):
+    """Generador de eventos (dicts) en orden cronológico.
+
+    ``desde``/``hasta`` (datetime o epoch) descartan archivos diarios enteros
+    por su nombre antes de abrirlos; ``tipos`` filtra por tipo de evento.
+    """
+    if isinstance(desde, datetime):
+        desde = desde.timestamp()
+    if isinstance(hasta, datetime):
+        hasta = hasta.timestamp()
+    tipos = set(tipos) if tipos else None
+    dia_desde = date.fromtimestamp(desde) if desde is not None else None
+    dia_hasta = date.fromtimestamp(hasta) if hasta is not None else None
+
+    archivos = []
+    directorio = Path(directorio)
+    if directorio.is_dir():
+        for ruta in directorio.iterdir():
+            dia = _dia_de_archivo(ruta)
+            if dia is None:
+                continue
+            if (dia_desde and dia < dia_desde) or (dia_hasta and dia > dia_hasta):
+                continue
+            archivos.append((dia, ruta))
+
+    for _, ruta in sorted(archivos):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                try:
+                    evento = json.loads(linea)
+                except ValueError:
+                    continue  # Línea a medio escribir
+                if tipos and evento.get('tipo') not in tipos:
+                    continue
+                t = evento.get('t', 0)
+                if (desde is not None and t < desde) or (hasta is not None and t > hasta):
+                    continue
+                yield evento
@@ -0,0 +1,265 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Resoluciones del histórico: (tabla, segundos por cubo)
+RESOLUCIONES = (('muestras', 0), ('muestras_minuto', 60), ('muestras_hora', 3600))
+
+
+class HistorialProcesos:
+    """Histórico de CPU y memoria por proceso almacenado en SQLite.
+
+    Las muestras llegan desde el muestreador y se acumulan en memoria; un
+    hilo propio las inserta por lotes dentro de una única transacción. Cada
+    cierto tiempo las muestras brutas se resumen en cubos de 1 minuto y estos
+    en cubos de 1 hora, y se borra lo que excede la retención de cada nivel,
+    de modo que el tamaño en disco y el coste de escritura quedan acotados
+    aunque la aplicación funcione durante meses.
+    """
+
+    def __init__(self, configuracion_historial, archivo_por_defecto, logs=None):
+        config = configuracion_historial or {}
+        self.archivo = config.get('archivo', str(archivo_por_defecto))
+        self.intervalo_registro = config.get('intervalo_registro', 15)
+        self.memoria_minima = config.get('memoria_minima_mb', 1) * 1024 * 1024
+        self.tamano_lote = config.get('tamano_lote', 2000)
+        self.intervalo_vaciado = config.get('intervalo_vaciado', 30)
+        self.intervalo_compactacion = config.get('intervalo_compactacion', 300)
+        self.retencion = {
+            'muestras': config.get('retencion_bruto_horas', 24) * 3600,
+            'muestras_minuto': config.get('retencion_minuto_dias', 7) * 86400,
+            'muestras_hora': config.get('retencion_hora_dias', 90) * 86400,
+        }
+        self.logs = logs
+
+        Path(self.archivo).parent.mkdir(parents=True, exist_ok=True)
+
+        self._pendientes = []
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._ultimo_registro = 0.0
+        self._hilo = threading.Thread(target=self._bucle_escritura, name='HistorialProcesos', daemon=True)
+        self._hilo.start()
+
+    # --- Entrada de datos (hilo del muestreador) ---
+
+    def registrar(self, instantanea):
+        """Suscriptor del muestreador: encola las muestras de la instantánea"""
+        if instantanea.timestamp - self._ultimo_registro < self.intervalo_registro:
+            return
+        self._ultimo_registro = instantanea.timestamp
+        ts = int(instantanea.timestamp)
+        filas = [(ts, m.pid, m.nombre, m.cpu, m.memoria)
+                 for m in instantanea.procesos if m.memoria >= self.memoria_minima or m.cpu > 0]
+        with self._lock:
+            self._pendientes.extend(filas)
+            lleno = len(self._pendientes) >= self.tamano_lote
+        if lleno:
+            self._despertar.set()
+
+    def cerrar(self):
+        """Vuelca lo pendiente y detiene el hilo de escritura"""
+        self._detener.set()
+        self._despertar.set()
+        self._hilo.join(timeout=10)
+
+    # --- Consultas ---
+
+    def consultar_top(self, momento, limite=10, criterio='memoria'):
+        """Procesos que más consumían en torno a un instante (datetime o epoch).
+
+        Usa la resolución más fina que todavía conserva ese instante. Devuelve
+        una lista de diccionarios ordenada por el criterio ('memoria' o 'cpu').
+        """
+        if hasattr(momento, 'timestamp'):
+            momento = momento.timestamp()
+        momento = int(momento)
+        antiguedad = time.time() - momento
+        columna_orden = 'memoria' if criterio == 'memoria' else 'cpu'
+
+        conexion = self._conectar()
+        try:
+            for tabla, segundos in RESOLUCIONES:
+                if antiguedad > self.retencion[tabla]:
+                    continue
+                if segundos:
+                    desde = momento - momento % segundos
+                    hasta = desde + segundos
+                    consulta = (
+                        f"SELECT m.ts, m.pid, n.nombre, m.cpu_media, m.cpu_max, m.memoria_media, m.memoria_max "
+                        f"FROM {tabla} m JOIN nombres n ON n.id = m.nombre_id "
+                        f"WHERE m.ts >= ? AND m.ts < ? ORDER BY m.{columna_orden}_max DESC LIMIT ?"
+                    )
+                else:
+                    # En las muestras brutas se toma el registro más cercano al instante pedido
+                    fila = conexion.execute(
+                        "SELECT ts FROM muestras WHERE ts <= ? ORDER BY ts DESC LIMIT 1", (momento,)
+                    ).fetchone()
+                    if fila is None:
+                        continue
+                    desde = fila[0]
+                    hasta = desde + 1
+                    consulta = (
+                        "SELECT m.ts, m.pid, n.nombre, m.cpu, m.cpu, m.memoria, m.memoria "
+                        "FROM muestras m JOIN nombres n ON n.id = m.nombre_id "
+                        f"WHERE m.ts >= ? AND m.ts < ? ORDER BY m.{columna_orden} DESC LIMIT ?"
+                    )
+                filas = conexion.execute(consulta, (desde, hasta, limite)).fetchall()
+                if filas:
+                    return [
+                        {'timestamp': ts, 'pid': pid, 'nombre': nombre, 'resolucion': tabla,
+                         'cpu_media': cpu_media, 'cpu_max': cpu_max,
+                         'memoria_media_mb': memoria_media / (1024 * 1024),
+                         'memoria_max_mb': memoria_max / (1024 * 1024)}
+                        for ts, pid, nombre, cpu_media, cpu_max, memoria_media, memoria_max in filas
+                    ]
+            return []
+        finally:
+            conexion.close()
+
+    # --- Hilo de escritura ---
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.archivo, timeout=10)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=NORMAL")
+        return conexion
+
+    def _crear_esquema(self, conexion):
+        # auto_vacuum solo se aplica al crear la base; si ya existe (p.ej. por haber
+        # activado WAL al conectar) hay que reconstruirla una vez con VACUUM
+        conexion.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        if conexion.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            conexion.execute("VACUUM")
+        conexion.executescript("""
+            CREATE TABLE IF NOT EXISTS nombres (
+                id INTEGER PRIMARY KEY,
+                nombre TEXT UNIQUE NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS muestras (
+                ts INTEGER NOT NULL,
+                pid INTEGER NOT NULL,
+                nombre_id INTEGER NOT NULL,
+                cpu REAL NOT NULL,
+                memoria INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_muestras_ts ON muestras (ts);
+            CREATE TABLE IF NOT EXISTS muestras_minuto (
+                ts INTEGER NOT NULL,
+                pid INTEGER NOT NULL,
+                nombre_id INTEGER NOT NULL,
+                cpu_media REAL NOT NULL,
+                cpu_max REAL NOT NULL,
+                memoria_media INTEGER NOT NULL,
+                memoria_max INTEGER NOT NULL,
+                n INTEGER NOT NULL,
+                PRIMARY KEY (ts, pid, nombre_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS muestras_hora (
+                ts INTEGER NOT NULL,
+                pid INTEGER NOT NULL,
+                nombre_id INTEGER NOT NULL,
+                cpu_media REAL NOT NULL,
+                cpu_max REAL NOT NULL,
+                memoria_media INTEGER NOT NULL,
+                memoria_max INTEGER NOT NULL,
+                n INTEGER NOT NULL,
+                PRIMARY KEY (ts, pid, nombre_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS estado (
+                clave TEXT PRIMARY KEY,
+                valor INTEGER NOT NULL
+            );
+        """)
+
+    def _bucle_escritura(self):
+        try:
+            conexion = self._conectar()
+            self._crear_esquema(conexion)
+        except sqlite3.Error as e:
+            if self.logs:
+                self.logs.log_error(f"Error abriendo el histórico de procesos: {e}")
+            return
+
+        ids_nombres = dict(conexion.execute("SELECT nombre, id FROM nombres"))
+        ultima_compactacion = 0.0
+        while True:
+            detener = self._detener.is_set()
+            self._despertar.wait(self.intervalo_vaciado)
+            self._despertar.clear()
+
+            with self._lock:
+                lote, self._pendientes = self._pendientes, []
+            try:
+                if lote:
+                    self._insertar(conexion, lote, ids_nombres)
+                if detener or time.time() - ultima_compactacion >= self.intervalo_compactacion:
+                    self._compactar(conexion)
+                    ultima_compactacion = time.time()
+            except sqlite3.Error as e:
+                if self.logs:
+                    self.logs.log_error(f"Error escribiendo el histórico de procesos: {e}")
+
+            if detener:
+                break
+            if self._detener.is_set():
+                # Una vuelta más para vaciar lo que llegó mientras se escribía
+                self._despertar.set()
+        conexion.close()
+
+    def _insertar(self, conexion, lote, ids_nombres):
+        """Inserta un lote de muestras en una sola transacción"""
+        with conexion:
+            filas = []
+            for ts, pid, nombre, cpu, memoria in lote:
+                nombre_id = ids_nombres.get(nombre)
+                if nombre_id is None:
+                    conexion.execute("INSERT OR IGNORE INTO nombres (nombre) VALUES (?)", (nombre,))
+                    nombre_id = conexion.execute("SELECT id FROM nombres WHERE nombre = ?", (nombre,)).fetchone()[0]
+                    ids_nombres[nombre] = nombre_id
+                filas.append((ts, pid, nombre_id, cpu, memoria))
+            conexion.executemany(
+                "INSERT INTO muestras (ts, pid, nombre_id, cpu, memoria) VALUES (?, ?, ?, ?, ?)", filas
+            )
+
+    def _compactar(self, conexion):
+        """Resume bruto -> minuto -> hora y aplica la retención de cada nivel"""
+        ahora = int(time.time())
+        # Margen para no cerrar un minuto del que aún pueden llegar muestras encoladas
+        limite = ahora - self.intervalo_vaciado - self.intervalo_registro
+        estado = dict(conexion.execute("SELECT clave, valor FROM estado"))
+        with conexion:
+            # Cubos de minuto completos aún no resumidos
+            desde = estado.get('minuto_hasta', 0)
+            hasta = limite - limite % 60
+            if hasta > desde:
+                conexion.execute("""
+                    INSERT OR REPLACE INTO muestras_minuto
+                    SELECT ts - ts % 60, pid, nombre_id, AVG(cpu), MAX(cpu), AVG(memoria), MAX(memoria), COUNT(*)
+                    FROM muestras WHERE ts >= ? AND ts < ?
+                    GROUP BY ts - ts % 60, pid, nombre_id
+                """, (desde, hasta))
+                conexion.execute("INSERT OR REPLACE INTO estado VALUES ('minuto_hasta', ?)", (hasta,))
+
+            # Cubos de hora completos a partir de los minutos
+            desde = estado.get('hora_hasta', 0)
+            minuto_hasta = max(estado.get('minuto_hasta', 0), hasta)
+            hasta = minuto_hasta - minuto_hasta % 3600
+            if hasta > desde:
+                conexion.execute("""
+                    INSERT OR REPLACE INTO muestras_hora
+                    SELECT ts - ts % 3600, pid, nombre_id, SUM(cpu_media * n) / SUM(n), MAX(cpu_max),
+                           SUM(memoria_media * n) / SUM(n), MAX(memoria_max), SUM(n)
+                    FROM muestras_minuto WHERE ts >= ? AND ts < ?
+                    GROUP BY ts - ts % 3600, pid, nombre_id
+                """, (desde, hasta))
+                conexion.execute("INSERT OR REPLACE INTO estado VALUES ('hora_hasta', ?)", (hasta,))
+
+            for tabla, _ in RESOLUCIONES:
+                conexion.execute(f"DELETE FROM {tabla} WHERE ts < ?", (ahora - self.retencion[tabla],))
+
+        # Devolver al sistema las páginas liberadas por el borrado. execute() solo da un
+        # paso del pragma (una página); executescript lo ejecuta hasta el final
+        conexion.executescript("PRAGMA incremental_vacuum;")
@@ -0,0 +1,241 @@
+import json
+import os
+import tempfile
+
+from parser_logs import NIVELES, ORDEN_NIVELES, en_rango, marca_y_nivel
+
+# Tamaño aproximado de cada bloque indexado
+TAMANO_BLOQUE = 256 * 1024
+
+
+def ruta_indice(ruta_log):
+    """Archivo de índice asociado a un log o segmento"""
+    return f"{ruta_log}.idx"
+
+
+def _bloque_vacio(inicio):
+    return {'inicio': inicio, 'fin': inicio, 'primero': None, 'ultimo': None,
+            'lineas': 0, 'niveles': {}}
+
+
+def _acumular(bloque, marca, nivel, nbytes, lineas=1):
+    """Añade un registro al bloque"""
+    bloque['fin'] += nbytes
+    bloque['lineas'] += lineas
+    if marca is not None:
+        if bloque['primero'] is None:
+            bloque['primero'] = marca
+        bloque['ultimo'] = marca
+        bloque['niveles'][nivel] = bloque['niveles'].get(nivel, 0) + 1
+
+
+def escanear(ruta_log, desde=0, hasta=None, tamano_bloque=None):
+    """Lee el log entre dos offsets y devuelve sus bloques (uno si no se indica tamaño)"""
+    bloques = [_bloque_vacio(desde)]
+    try:
+        with open(ruta_log, 'rb') as f:
+            f.seek(desde)
+            for linea in f:
+                if not linea.endswith(b'\n'):
+                    break  # Línea a medio escribir
+                bloque = bloques[-1]
+                if tamano_bloque and bloque['fin'] - bloque['inicio'] >= tamano_bloque:
+                    bloque = _bloque_vacio(bloque['fin'])
+                    bloques.append(bloque)
+                marca, nivel = marca_y_nivel(linea)
+                _acumular(bloque, marca, nivel, len(linea))
+                if hasta is not None and bloque['fin'] >= hasta:
+                    break
+    except OSError:
+        pass
+    return [b for b in bloques if b['fin'] > b['inicio']]
+
+
+def leer_bloques(ruta_log, construir=True):
+    """Bloques del índice de un log, validados contra el tamaño del archivo.
+
+    Si el índice no existe o no corresponde al archivo (p.ej. tras recortarlo)
+    se reconstruye leyendo el log una vez cuando ``construir`` es True (los
+    segmentos rotados ya no cambian), o se devuelve una lista vacía para que
+    el llamador lea el archivo directamente.
+    """
+    try:
+        tamano = os.path.getsize(ruta_log)
+    except OSError:
+        return []
+
+    bloques = []
+    try:
+        with open(ruta_indice(ruta_log), 'r', encoding='utf-8') as f:
+            for linea in f:
+                try:
+                    bloque = json.loads(linea)
+                except ValueError:
+                    break  # Última línea a medio escribir
+                if bloques and bloque['inicio'] != bloques[-1]['fin']:
+                    bloques = None
+                    break
+                bloques.append(bloque)
+    except OSError:
+        bloques = None
+
+    valido = bloques is not None and (not bloques or bloques[0]['inicio'] == 0) \
+        and (not bloques or bloques[-1]['fin'] <= tamano)
+    if valido:
+        return bloques
+    if not construir:
+        return []
+    bloques = escanear(ruta_log, tamano_bloque=TAMANO_BLOQUE)
+    guardar_indice(ruta_log, bloques)
+    return bloques
+
+
+def guardar_indice(ruta_log, bloques):
+    """Escribe el índice completo de forma atómica"""
+    ruta = ruta_indice(ruta_log)
+    try:
+        fd, temporal = tempfile.mkstemp(prefix='.idx-', suffix='.tmp', dir=os.path.dirname(os.path.abspath(ruta)))
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for bloque in bloques:
+                f.write(json.dumps(bloque, separators=(',', ':')) + '\n')
+        os.replace(temporal, ruta)
+    except OSError:
+        pass
+
+
+def bloques_completos(ruta_log, activo=False):
+    """Bloques indexados más un bloque final con lo que aún no está en el índice"""
+    bloques = leer_bloques(ruta_log, construir=not activo)
+    desde = bloques[-1]['fin'] if bloques else 0
+    return bloques + escanear(ruta_log, desde)
+
+
+class IndiceLog:
+    """Índice por bloques del log activo, mantenido a medida que se escribe.
+
+    Cada bloque guarda offsets de inicio y fin, primera y última marca de
+    tiempo, número de líneas y registros por nivel. El bloque en curso se
+    mantiene en memoria y se añade al archivo ``.idx`` al llegar a
+    ``tamano_bloque`` bytes; lo que queda tras el último bloque guardado se
+    lee del propio log cuando hace falta.
+    """
+
+    def __init__(self, ruta_log, tamano_bloque=TAMANO_BLOQUE):
+        self.ruta_log = str(ruta_log)
+        self.tamano_bloque = tamano_bloque
+        self.abierto = None
+        self.sincronizar()
+
+    def sincronizar(self):
+        """Carga el índice del disco y retoma el bloque abierto desde el final del log"""
+        bloques = leer_bloques(self.ruta_log)
+        fin = bloques[-1]['fin'] if bloques else 0
+        cola = escanear(self.ruta_log, fin)
+        self.abierto = cola[0] if cola else _bloque_vacio(fin)
+
+    def registrar(self, marca, nivel, nbytes, lineas=1):
+        """Anota un registro recién escrito"""
+        _acumular(self.abierto, marca, nivel, nbytes, lineas)
+        if self.abierto['fin'] - self.abierto['inicio'] >= self.tamano_bloque:
+            self.cerrar_bloque()
+
+    def cerrar_bloque(self):
+        """Guarda el bloque en curso (si tiene datos) y abre uno nuevo"""
+        if self.abierto['fin'] > self.abierto['inicio']:
+            try:
+                with open(ruta_indice(self.ruta_log), 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(self.abierto, separators=(',', ':')) + '\n')
+            except OSError:
+                pass
+        self.abierto = _bloque_vacio(self.abierto['fin'])
+
+    def rotar(self, ruta_segmento):
+        """Cierra el índice del archivo rotado, lo renombra con él y empieza uno vacío"""
+        self.cerrar_bloque()
+        if os.path.exists(ruta_indice(self.ruta_log)):
+            os.replace(ruta_indice(self.ruta_log), ruta_indice(ruta_segmento))
+        self.abierto = _bloque_vacio(0)
+
+
+def estadisticas(rutas, ruta_activa=None):
+    """Estadísticas agregadas de varios segmentos a partir de sus índices"""
+    stats = {
+        'total_registros': 0,
+        'por_nivel': {nivel: 0 for nivel in NIVELES},
+        'primero': None,
+        'ultimo': None,
+        'tamaño_archivo': 0,
+    }
+    for ruta in rutas:
+        try:
+            stats['tamaño_archivo'] += os.path.getsize(ruta)
+        except OSError:
+            continue
+        for bloque in bloques_completos(ruta, activo=str(ruta) == str(ruta_activa)):
+            stats['total_registros'] += bloque['lineas']
+            for nivel, n in bloque['niveles'].items():
+                if nivel in stats['por_nivel']:
+                    stats['por_nivel'][nivel] += n
+            if bloque['primero'] is not None:
+                if stats['primero'] is None or bloque['primero'] < stats['primero']:
+                    stats['primero'] = bloque['primero']
+                if stats['ultimo'] is None or bloque['ultimo'] > stats['ultimo']:
+                    stats['ultimo'] = bloque['ultimo']
+    return stats
+
+
+def exportar(rutas, destino, desde=None, hasta=None, nivel_minimo=None, ruta_activa=None):
+    """Copia a destino las líneas de los segmentos que cumplen los filtros.
+
+    ``desde``/``hasta`` son marcas 'AAAA-MM-DD HH:MM:SS' y se comparan como
+    cadenas. Los bloques fuera del rango se saltan sin leerlos y los que caen
+    enteros dentro (sin filtro de nivel) se copian byte a byte.
+    Devuelve el número de líneas exportadas.
+    """
+    minimo = ORDEN_NIVELES.get(nivel_minimo, 0) if nivel_minimo else None
+    exportadas = 0
+    with open(destino, 'wb') as salida:
+        for ruta in rutas:
+            bloques = bloques_completos(ruta, activo=str(ruta) == str(ruta_activa))
+            if not bloques:
+                continue
+            with open(ruta, 'rb') as f:
+                for bloque in bloques:
+                    primero, ultimo = bloque['primero'], bloque['ultimo']
+                    if primero is not None:
+                        if (desde and ultimo < desde) or (hasta and primero > hasta):
+                            continue
+                        if minimo is not None and not any(
+                                ORDEN_NIVELES.get(n, 0) >= minimo for n in bloque['niveles']):
+                            continue
+                    f.seek(bloque['inicio'])
+                    if primero is not None and minimo is None \
+                            and (not desde or primero >= desde) and (not hasta or ultimo <= hasta):
+                        _copiar_rango(f, salida, bloque['fin'] - bloque['inicio'])
+                        exportadas += bloque['lineas']
+                        continue
+                    restante = bloque['fin'] - bloque['inicio']
+                    while restante > 0:
+                        linea = f.readline()
+                        if not linea:
+                            break
+                        restante -= len(linea)
+                        marca, nivel = marca_y_nivel(linea)
+                        if marca is not None:
+                            if not en_rango(marca, desde, hasta):
+                                continue
+                            if minimo is not None and ORDEN_NIVELES.get(nivel, 0) < minimo:
+                                continue
+                        # Si no se puede parsear, incluir la línea
+                        salida.write(linea)
+                        exportadas += 1
+    return exportadas
+
+
+def _copiar_rango(origen, destino, n):
+    while n > 0:
+        datos = origen.read(min(n, 1024 * 1024))
+        if not datos:
+            break
+        destino.write(datos)
+        n -= len(datos)
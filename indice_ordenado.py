@@ -0,0 +1,74 @@
+from bisect import bisect_left, insort
+
+
+class IndiceOrdenado:
+    """Conjunto de filas mantenido siempre ordenado por una columna.
+
+    Las filas se indexan por PID (primer valor). En cada instantánea solo se
+    reubican con ``bisect`` las filas nuevas, las que han desaparecido y
+    aquellas cuya clave de ordenación ha cambiado; el resto conserva su
+    posición sin reordenar la lista completa. Si cambia una gran parte de las
+    claves se reconstruye con ``sort``, que sobre datos casi ordenados es
+    prácticamente lineal.
+    """
+
+    # Fracción de claves modificadas a partir de la cual compensa reordenar todo
+    FRACCION_RECONSTRUIR = 0.25
+
+    def __init__(self, clave=None, descendente=False):
+        self.clave = clave  # Función fila -> valor comparable (None: ordenar por PID)
+        self.descendente = descendente
+        self._claves = []      # Lista ordenada de (valor, pid)
+        self._clave_pid = {}   # pid -> (valor, pid) actualmente en self._claves
+        self._filas = {}       # pid -> fila
+
+    def _clave_de(self, fila):
+        if self.clave is None:
+            return (fila[0], fila[0])
+        return (self.clave(fila), fila[0])
+
+    def establecer_orden(self, clave, descendente=False):
+        """Cambia la columna/dirección de ordenación (único punto con ordenación completa)"""
+        self.clave = clave
+        self.descendente = descendente
+        self._reconstruir()
+
+    def actualizar(self, filas):
+        """Fusiona una nueva instantánea de filas en el índice"""
+        nuevas = {fila[0]: fila for fila in filas}
+
+        cambios = []
+        for pid in self._filas:
+            if pid not in nuevas:
+                cambios.append((pid, None))
+        for pid, fila in nuevas.items():
+            anterior = self._clave_pid.get(pid)
+            clave = self._clave_de(fila)
+            if anterior != clave:
+                cambios.append((pid, clave))
+
+        self._filas = nuevas
+        if len(cambios) > len(self._claves) * self.FRACCION_RECONSTRUIR:
+            self._reconstruir()
+            return
+
+        for pid, clave in cambios:
+            anterior = self._clave_pid.pop(pid, None)
+            if anterior is not None:
+                del self._claves[bisect_left(self._claves, anterior)]
+            if clave is not None:
+                insort(self._claves, clave)
+                self._clave_pid[pid] = clave
+
+    def filas(self):
+        """Devuelve las filas en el orden actual"""
+        filas = self._filas
+        claves = reversed(self._claves) if self.descendente else self._claves
+        return [filas[pid] for _, pid in claves]
+
+    def __len__(self):
+        return len(self._claves)
+
+    def _reconstruir(self):
+        self._clave_pid = {pid: self._clave_de(fila) for pid, fila in self._filas.items()}
+        self._claves = sorted(self._clave_pid.values())
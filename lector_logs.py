@@ -0,0 +1,124 @@
+import mmap
+import os
+from contextlib import contextmanager
+
+# Líneas que se cargan en el visor por página y máximo que se mantienen en el widget
+LINEAS_PAGINA = 500
+MAX_LINEAS_VISOR = 10 * LINEAS_PAGINA
+
+
+class LectorLogMapeado:
+    """Lectura paginada de un log en disco a través de mmap.
+
+    Cada operación mapea el archivo en solo lectura, se mueve por él con
+    ``find``/``rfind`` sobre el mapa y devuelve únicamente las líneas pedidas
+    (como bytes, con su offset), de modo que un log de cientos de MB nunca se
+    carga entero en memoria ni se convierte a str. El mapa no se conserva
+    entre operaciones: el archivo puede rotarse o recortarse mientras el
+    visor está abierto (en Windows no podría renombrarse estando mapeado) y
+    cada operación ve su tamaño actual. Solo se consideran las líneas
+    completas; la última, si está a medio escribir, se ignora.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = str(ruta)
+
+    def tamano(self):
+        try:
+            return os.path.getsize(self.ruta)
+        except OSError:
+            return 0
+
+    @contextmanager
+    def _mapa(self):
+        mm = None
+        try:
+            with open(self.ruta, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            pass  # No existe o está vacío
+        try:
+            yield mm
+        finally:
+            if mm is not None:
+                mm.close()
+
+    @staticmethod
+    def _inicio_linea(mm, offset, fin):
+        """Ajusta offset al principio de su línea (dentro de las líneas completas)"""
+        offset = max(0, min(offset, fin))
+        if offset > 0 and mm[offset - 1] != 0x0A:
+            offset = mm.rfind(b'\n', 0, offset) + 1
+        return offset
+
+    def anteriores(self, offset=None, n=LINEAS_PAGINA, aceptar=None):
+        """Hasta n líneas anteriores a offset (None: el final del archivo).
+
+        Devuelve ``(inicio, fin, [(offset, linea), ...])`` en orden
+        cronológico: ``inicio`` es el offset de la última línea examinada,
+        desde el que sigue la página anterior, y ``fin`` el punto de partida.
+        ``aceptar(linea)`` filtra líneas; como mucho se examinan 50 * n para
+        no recorrer todo el archivo buscando un nivel poco frecuente.
+        """
+        with self._mapa() as mm:
+            if mm is None:
+                return 0, 0, []
+            fin = mm.rfind(b'\n') + 1
+            if offset is not None:
+                fin = self._inicio_linea(mm, offset, fin)
+            pos = fin
+            lineas = []
+            examinadas = 0
+            while pos > 0 and len(lineas) < n and examinadas < n * 50:
+                inicio = mm.rfind(b'\n', 0, pos - 1) + 1
+                linea = mm[inicio:pos]
+                examinadas += 1
+                if aceptar is None or aceptar(linea):
+                    lineas.append((inicio, linea))
+                pos = inicio
+            lineas.reverse()
+            return pos, fin, lineas
+
+    def siguientes(self, offset, n=LINEAS_PAGINA, aceptar=None):
+        """Hasta n líneas desde offset hacia el final: ``(fin, [(offset, linea), ...])``"""
+        with self._mapa() as mm:
+            if mm is None:
+                return 0, []
+            fin = mm.rfind(b'\n') + 1
+            pos = self._inicio_linea(mm, offset, fin)
+            lineas = []
+            examinadas = 0
+            while pos < fin and len(lineas) < n and examinadas < n * 50:
+                final = mm.find(b'\n', pos, fin) + 1
+                linea = mm[pos:final]
+                examinadas += 1
+                if aceptar is None or aceptar(linea):
+                    lineas.append((pos, linea))
+                pos = final
+            return pos, lineas
+
+    def buscar(self, texto, offset=None, hacia_atras=True):
+        """Offset de la línea con la siguiente aparición de texto, o None.
+
+        Busca la subcadena (distingue mayúsculas) directamente en el mapa,
+        antes de offset si ``hacia_atras`` o a partir de él si no.
+        """
+        patron = texto.encode('utf-8')
+        if not patron:
+            return None
+        with self._mapa() as mm:
+            if mm is None:
+                return None
+            fin = mm.rfind(b'\n') + 1
+            if hacia_atras:
+                i = mm.rfind(patron, 0, fin if offset is None else min(offset, fin))
+            else:
+                i = mm.find(patron, 0 if offset is None else offset, fin)
+            if i < 0:
+                return None
+            return mm.rfind(b'\n', 0, i) + 1
+
+    def linea(self, offset):
+        """Línea completa que empieza en offset (bytes), o None"""
+        _, lineas = self.siguientes(offset, 1)
+        return lineas[0][1] if lineas else None
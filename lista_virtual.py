@@ -0,0 +1,184 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class ListaVirtual:
+    """Modo de lista virtual (ventana deslizante) para un ttk.Treeview.
+
+    Solo existen como items de Tk las filas visibles más un pequeño
+    sobrebarrido. Los datos viven en una lista en memoria ya ordenada y, al
+    desplazarse, los mismos items se rellenan con las filas de la nueva
+    ventana. La barra de scroll se gestiona manualmente para que represente
+    la lista completa. La selección se guarda por PID, ya que los items se
+    reutilizan para filas distintas.
+    """
+
+    def __init__(self, tree, scrollbar, sobrebarrido=5):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.sobrebarrido = sobrebarrido
+        self.activa = False
+
+        self.filas = []          # Lista completa de filas (el PID es el primer valor)
+        self.indice_pid = {}     # pid -> posición en self.filas
+        self.inicio = 0          # Primera fila visible
+        self.filas_visibles = 20
+        self.slots = []          # Items de Tk reutilizables
+        self.mostrado = []       # Valores mostrados en cada slot
+        self.pid_seleccionado = None
+
+        self.tree.bind("<Configure>", self._on_configure, add="+")
+        self.tree.bind("<<TreeviewSelect>>", self._on_seleccion, add="+")
+        self.tree.bind("<MouseWheel>", self._on_rueda, add="+")
+        self.tree.bind("<Button-4>", self._on_rueda, add="+")
+        self.tree.bind("<Button-5>", self._on_rueda, add="+")
+        for tecla in ("<Up>", "<Down>", "<Prior>", "<Next>", "<Home>", "<End>"):
+            self.tree.bind(tecla, self._on_tecla, add="+")
+
+    def activar(self):
+        """Pasa el Treeview a modo virtual: la barra de scroll pasa a controlarla la lista"""
+        if self.activa:
+            return
+        self.activa = True
+        self.tree.configure(yscrollcommand="")
+        self.scrollbar.configure(command=self._on_scroll)
+        self._calcular_filas_visibles(self.tree.winfo_height())
+
+    def desactivar(self):
+        """Vuelve al modo normal eliminando los items reutilizables"""
+        if not self.activa:
+            return
+        self.activa = False
+        if self.slots:
+            self.tree.delete(*self.slots)
+        self.slots = []
+        self.mostrado = []
+        self.filas = []
+        self.indice_pid = {}
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.configure(command=self.tree.yview)
+
+    def establecer_filas(self, filas):
+        """Sustituye los datos en memoria y repinta la ventana visible"""
+        self.filas = filas
+        self.indice_pid = {fila[0]: i for i, fila in enumerate(filas)}
+        self.renderizar()
+
+    def mostrar_pid(self, pid):
+        """Desplaza la ventana hasta el PID indicado y lo selecciona"""
+        indice = self.indice_pid.get(pid)
+        if indice is None:
+            return False
+        self.pid_seleccionado = pid
+        self._asegurar_visible(indice)
+        self.renderizar()
+        return True
+
+    def renderizar(self):
+        """Rellena los items de Tk con las filas de la ventana actual"""
+        if not self.activa:
+            return
+        total = len(self.filas)
+        self.inicio = max(0, min(self.inicio, total - self.filas_visibles))
+        ventana = self.filas[self.inicio:self.inicio + self.filas_visibles + self.sobrebarrido]
+
+        # Ajustar el número de items al tamaño de la ventana
+        while len(self.slots) < len(ventana):
+            self.slots.append(self.tree.insert('', 'end', values=()))
+            self.mostrado.append(None)
+        if len(self.slots) > len(ventana):
+            self.tree.delete(*self.slots[len(ventana):])
+            del self.slots[len(ventana):]
+            del self.mostrado[len(ventana):]
+
+        seleccion = ()
+        for i, fila in enumerate(ventana):
+            if self.mostrado[i] != fila:
+                self.tree.item(self.slots[i], values=fila)
+                self.mostrado[i] = fila
+            if fila[0] == self.pid_seleccionado:
+                seleccion = (self.slots[i],)
+
+        if tuple(self.tree.selection()) != seleccion:
+            self.tree.selection_set(seleccion)
+        self.tree.yview_moveto(0)
+
+        if total:
+            self.scrollbar.set(self.inicio / total, min(1.0, (self.inicio + self.filas_visibles) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _desplazar(self, filas):
+        self.inicio += filas
+        self.renderizar()
+
+    def _asegurar_visible(self, indice):
+        if indice < self.inicio:
+            self.inicio = indice
+        elif indice >= self.inicio + self.filas_visibles:
+            self.inicio = indice - self.filas_visibles + 1
+
+    def _on_scroll(self, *args):
+        """Comando de la barra de scroll en modo virtual"""
+        if args[0] == 'moveto':
+            self.inicio = int(float(args[1]) * len(self.filas))
+            self.renderizar()
+        elif args[0] == 'scroll':
+            cantidad = int(args[1])
+            if args[2] == 'pages':
+                cantidad *= self.filas_visibles
+            self._desplazar(cantidad)
+
+    def _on_rueda(self, event):
+        if not self.activa:
+            return None
+        if event.num == 4:
+            pasos = -3
+        elif event.num == 5:
+            pasos = 3
+        else:
+            pasos = -3 if event.delta > 0 else 3
+        self._desplazar(pasos)
+        return "break"
+
+    def _on_tecla(self, event):
+        if not self.activa:
+            return None
+        actual = self.indice_pid.get(self.pid_seleccionado, self.inicio)
+        movimientos = {
+            'Up': -1,
+            'Down': 1,
+            'Prior': -self.filas_visibles,
+            'Next': self.filas_visibles,
+            'Home': -len(self.filas),
+            'End': len(self.filas),
+        }
+        nuevo = max(0, min(len(self.filas) - 1, actual + movimientos.get(event.keysym, 0)))
+        if self.filas:
+            self.pid_seleccionado = self.filas[nuevo][0]
+            self._asegurar_visible(nuevo)
+            self.renderizar()
+        return "break"
+
+    def _calcular_filas_visibles(self, alto):
+        try:
+            alto_fila = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        except (ValueError, tk.TclError):
+            alto_fila = 20
+        # Restar aproximadamente la altura de la cabecera
+        self.filas_visibles = max(1, (alto - alto_fila - 5) // alto_fila)
+
+    def _on_configure(self, event):
+        if not self.activa:
+            return
+        self._calcular_filas_visibles(event.height)
+        self.renderizar()
+
+    def _on_seleccion(self, event):
+        if not self.activa:
+            return
+        seleccion = self.tree.selection()
+        if seleccion and seleccion[0] in self.slots:
+            fila = self.mostrado[self.slots.index(seleccion[0])]
+            if fila:
+                self.pid_seleccionado = fila[0]
@@ -0,0 +1,56 @@
+import time
+
+
+class MedidorBloqueosUI:
+    """Mide cuánto tiempo queda bloqueado el bucle de eventos de Tk.
+
+    Programa un latido periódico con ``after`` y registra el retraso con el
+    que llega respecto a lo esperado: cualquier trabajo síncrono en el hilo
+    principal (barridos, inserciones masivas en un Treeview...) aparece como
+    retraso del latido. ``bloqueo_maximo`` es el mayor retraso observado.
+    """
+
+    def __init__(self, widget, intervalo_ms=100):
+        self.widget = widget
+        self.intervalo_ms = intervalo_ms
+        self.bloqueo_maximo = 0.0  # Segundos
+        self.ultimo_bloqueo = 0.0
+        self.latidos = 0
+        self._esperado = None
+        self._job = None
+
+    def iniciar(self):
+        """Arranca el latido periódico"""
+        if self._job is None:
+            self._programar()
+
+    def detener(self):
+        """Detiene el latido"""
+        if self._job is not None:
+            try:
+                self.widget.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def reiniciar(self):
+        """Pone a cero las métricas acumuladas"""
+        self.bloqueo_maximo = 0.0
+        self.ultimo_bloqueo = 0.0
+        self.latidos = 0
+
+    def registrar(self, duracion):
+        """Registra explícitamente la duración de un trabajo hecho en el hilo de Tk"""
+        self.ultimo_bloqueo = duracion
+        if duracion > self.bloqueo_maximo:
+            self.bloqueo_maximo = duracion
+
+    def _programar(self):
+        self._esperado = time.perf_counter() + self.intervalo_ms / 1000
+        self._job = self.widget.after(self.intervalo_ms, self._latido)
+
+    def _latido(self):
+        retraso = max(0.0, time.perf_counter() - self._esperado)
+        self.latidos += 1
+        self.registrar(retraso)
+        self._programar()
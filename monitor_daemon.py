@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🐸 Monitor de Recursos - Modo daemon (sin interfaz gráfica)
+
+Ejecuta la misma vigilancia de umbrales, exclusiones, logs y alertas que la
+aplicación gráfica, leyendo el mismo config.json, pero sin importar tkinter,
+PIL, pystray ni plyer. Pensado para servidores sin DISPLAY.
+
+Uso:
+    python3 monitor_daemon.py [--intervalo SEGUNDOS] [--una-vez]
+    python3 monitor_daemon.py --top "AAAA-MM-DD HH:MM" [--criterio cpu]
+"""
+
+import argparse
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+from configuracion import cargar_config
+from sistema_logs import SistemaLogs
+from muestreo_procesos import MuestreadorProcesos, crear_recolector
+from evaluador_alertas import EvaluadorAlertas
+from historial_procesos import HistorialProcesos
+from notificaciones import NotificadorAsincrono
+from vigilante_config import VigilanteConfig
+from planificador_muestreo import PlanificadorMuestreo
+
+
+class MonitorDaemon:
+    """Monitor de recursos sin interfaz gráfica"""
+
+    def __init__(self, intervalo=None):
+        self.configuracion, self.config_manager = cargar_config()
+
+        self.logs = SistemaLogs(self.configuracion)
+        self.logs.log_info("Iniciando Monitor de Recursos en modo daemon")
+
+        config_monitoreo = self.configuracion.get('monitoreo', {})
+        # Un --intervalo explícito prevalece sobre config.json, también al recargarlo
+        self.intervalo_fijo = intervalo is not None
+        if intervalo is None:
+            intervalo = config_monitoreo.get('intervalo_actualizacion', 3)
+        recolector = crear_recolector(config_monitoreo.get('recolector', 'auto'), self.logs)
+        self.muestreador = MuestreadorProcesos(intervalo, recolector, self.logs)
+
+        self.notificador = NotificadorAsincrono(
+            self.notificar,
+            self.configuracion.get('alertas', {}).get('intervalo_notificacion_proceso', 300),
+            logs=self.logs
+        )
+        self.evaluador = EvaluadorAlertas(self.configuracion, self.logs, self.notificador.notificar)
+        self.muestreador.suscribir(self.evaluador.evaluar)
+        # Sin ventana: más lento en reposo y más rápido cerca de un umbral, salvo con --intervalo
+        if not self.intervalo_fijo:
+            self.muestreador.planificador = PlanificadorMuestreo(
+                self.configuracion, lambda: self.evaluador.cerca_de_umbral, self.logs)
+
+        self.historial = None
+        config_historial = self.configuracion.get('historial', {})
+        if config_historial.get('habilitar_historial', True):
+            self.historial = HistorialProcesos(
+                config_historial, self.config_manager.config_dir / 'historial.db', self.logs
+            )
+            self.muestreador.suscribir(self.historial.registrar)
+
+        # Umbrales, exclusiones e intervalo se pueden cambiar en config.json sin reiniciar
+        self.vigilante_config = None
+        if config_monitoreo.get('recarga_automatica_config', True):
+            self.vigilante_config = VigilanteConfig(self.config_manager.config_file,
+                                                    self.recargar_configuracion, logs=self.logs)
+
+        self.detenido = threading.Event()
+
+    def recargar_configuracion(self):
+        """Aplica las secciones de config.json que han cambiado (hilo del vigilante)"""
+        secciones = self.config_manager.recargar_si_cambio()
+        if not secciones:
+            return
+        if 'umbrales' in secciones:
+            config_umbrales = self.configuracion.get('umbrales', {})
+            self.evaluador.cpu_umbral = config_umbrales.get('cpu_porcentaje', self.evaluador.cpu_umbral)
+            self.evaluador.mem_umbral_mb = config_umbrales.get('memoria_mb', self.evaluador.mem_umbral_mb)
+        if 'monitoreo' in secciones and not self.intervalo_fijo:
+            self.muestreador.establecer_intervalo(
+                self.configuracion['monitoreo'].get('intervalo_actualizacion', self.muestreador.intervalo))
+        if 'logs' in secciones:
+            self.logs.aplicar_configuracion(self.configuracion)
+        self.logs.log_info(f"Configuración recargada desde config.json: {', '.join(secciones)}")
+
+    def notificar(self, titulo, mensaje):
+        """Alerta en modo daemon: salida estándar (recogida por journald/syslog)"""
+        linea = mensaje.replace('\n', ' | ')
+        print(f"ALERTA: {linea}", flush=True)
+
+    def ejecutar(self):
+        """Bucle principal hasta recibir SIGINT/SIGTERM"""
+        signal.signal(signal.SIGTERM, self.detener)
+        signal.signal(signal.SIGINT, self.detener)
+
+        self.muestreador.iniciar()
+        if self.vigilante_config:
+            self.vigilante_config.iniciar()
+        self.logs.log_info("Monitor daemon en ejecución")
+        while not self.detenido.wait(1):
+            pass
+        self.cerrar()
+
+    def ejecutar_una_vez(self):
+        """Realiza un único barrido, evalúa alertas y termina"""
+        # El % de CPU se calcula entre dos lecturas: hacer una previa sin publicar
+        self.muestreador.recolector.recolectar()
+        time.sleep(1)
+        # Con un solo barrido no se puede esperar a duracion_activacion
+        self.evaluador.activacion_inmediata = True
+        self.muestreador.muestrear()
+        self.cerrar()
+        return self.evaluador.procesos
+
+    def consultar_top(self, momento, criterio='memoria'):
+        """Procesos que más consumían en un instante pasado, según el histórico"""
+        if not self.historial:
+            self.cerrar()
+            return None
+        # Lo pendiente de escribir se vuelca al cerrar; la consulta usa lo ya guardado
+        resultado = self.historial.consultar_top(momento, criterio=criterio)
+        self.cerrar()
+        return resultado
+
+    def detener(self, *args):
+        self.detenido.set()
+
+    def cerrar(self):
+        if self.vigilante_config:
+            self.vigilante_config.detener()
+        self.muestreador.detener()
+        self.notificador.detener()
+        if self.historial:
+            self.historial.cerrar()
+        self.logs.log_info("Monitor daemon detenido")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monitor de Recursos en modo daemon (sin interfaz gráfica)")
+    parser.add_argument('--intervalo', type=float, help="Segundos entre barridos (por defecto, el de config.json)")
+    parser.add_argument('--una-vez', action='store_true', help="Realiza un solo barrido, muestra las alertas y sale")
+    parser.add_argument('--top', metavar='FECHA',
+                        help="Muestra los procesos que más consumían en FECHA ('AAAA-MM-DD HH:MM') según el histórico")
+    parser.add_argument('--criterio', choices=['memoria', 'cpu'], default='memoria', help="Orden de --top")
+    args = parser.parse_args(argv)
+
+    momento = None
+    if args.top:
+        try:
+            momento = datetime.strptime(args.top, '%Y-%m-%d %H:%M')
+        except ValueError:
+            parser.error("--top espera una fecha 'AAAA-MM-DD HH:MM'")
+
+    daemon = MonitorDaemon(args.intervalo)
+    if momento is not None:
+        filas = daemon.consultar_top(momento, args.criterio)
+        if filas is None:
+            print("El histórico está desactivado (historial.habilitar_historial)", file=sys.stderr)
+            return 1
+        if not filas:
+            print(f"No hay datos del histórico para {args.top}")
+        for fila in filas:
+            print(f"{fila['pid']:>8}  {fila['nombre']:<30} CPU máx: {fila['cpu_max']:5.1f}%  "
+                  f"Memoria máx: {fila['memoria_max_mb']:.0f} MB  ({fila['resolucion']})")
+        return 0
+    if args.una_vez:
+        for pid, nombre, cpu, mem in daemon.ejecutar_una_vez():
+            print(f"{pid:>8}  {nombre:<30} CPU: {cpu:5.1f}%  Memoria: {mem} MB")
+        return 0
+    daemon.ejecutar()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
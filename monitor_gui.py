@@ -1,11 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import psutil
+import re
 import threading
-import time
 import pystray
 from PIL import Image, ImageDraw
-from plyer import notification
 from ventana_alertas import VentanaAlertas
 from ventana_todos_procesos import VentanaTodosProcesos
 from ventana_about import mostrar_about
@@ -14,10 +13,16 @@ from ventana_about import mostrar_about
 from configuracion import ConfiguracionManager, cargar_config, guardar_config
 from temas import GestorTemas, aplicar_tema_desde_config
 from sistema_logs import SistemaLogs
-
-# Umbrales por defecto (se cargarán desde configuración)
-DEFAULT_CPU = 50
-DEFAULT_MEM = 500  # MB
+from muestreo_procesos import MuestreadorProcesos, crear_recolector
+from reconciliador_arbol import ReconciliadorArbol
+from historial_procesos import HistorialProcesos
+from buffer_metricas import BufferMetricas
+from evaluador_alertas import EvaluadorAlertas, DEFAULT_CPU, DEFAULT_MEM
+from notificaciones import NotificadorAsincrono, mostrar_notificacion_escritorio
+from vigilante_config import VigilanteConfig
+from perfiles_umbrales import perfil_desde_config
+from planificador_muestreo import PlanificadorMuestreo
+from reglas_exclusion import CAMPOS
 
 class MonitorRecursosApp:
     def __init__(self, root):
@@ -28,6 +33,7 @@ class MonitorRecursosApp:
         
         # Inicializar sistema de logs
         self.logs = SistemaLogs(self.configuracion)
+        self.config_manager.logs = self.logs
         self.logs.log_info("Iniciando aplicación Monitor de Recursos")
         
         # Inicializar gestor de temas
@@ -50,31 +56,68 @@ class MonitorRecursosApp:
         
         # Variables de control
         self.processes = []
+        self.last_alerted = set()
+        self.ultimo_proceso_problematico = None  # Información del último proceso que causó alerta
+        # Las notificaciones se envían desde su propio hilo para no frenar el muestreo
+        self.notificador = NotificadorAsincrono(
+            self.show_notification,
+            self.configuracion.get('alertas', {}).get('intervalo_notificacion_proceso', 300),
+            logs=self.logs
+        )
+        self.evaluador = EvaluadorAlertas(self.configuracion, self.logs, self.notificador.notificar)
+        
+        # Motor de muestreo compartido por todas las vistas
+        config_monitoreo = self.configuracion.get('monitoreo', {})
+        self.intervalo_actualizacion = config_monitoreo.get('intervalo_actualizacion', 3)
+        self.auto_minimizar = config_monitoreo.get('auto_minimizar_bandeja', True)
+        recolector = crear_recolector(config_monitoreo.get('recolector', 'auto'), self.logs)
+        # La espera entre barridos se adapta a la carga, a los umbrales y a si la ventana se ve
+        self.planificador = PlanificadorMuestreo(self.configuracion, lambda: self.evaluador.cerca_de_umbral,
+                                                 self.logs)
+        self.muestreador = MuestreadorProcesos(self.intervalo_actualizacion, recolector, self.logs,
+                                               self.planificador)
         
         # Configurar interfaz
         self.setup_menu()
         self.setup_ui()
+        self.root.bind('<Map>', self._ventana_mostrada, add='+')
+        self.root.bind('<Unmap>', self._ventana_ocultada, add='+')
         
         # Aplicar tema después de crear la interfaz
         colores, _ = aplicar_tema_desde_config(self.root, self.configuracion)
         self.colores_tema = colores
         
-        # Configurar monitoreo
+        # Configurar monitoreo: un único barrido por ciclo publicado a todos los suscriptores
         self.running = True
-        config_monitoreo = self.configuracion.get('monitoreo', {})
-        self.intervalo_actualizacion = config_monitoreo.get('intervalo_actualizacion', 3)
-        self.auto_minimizar = config_monitoreo.get('auto_minimizar_bandeja', True)
+        self.muestreador.suscribir(self.evaluar_alertas)
+        self.muestreador.suscribir(self.actualizar_bandeja)
+        self.muestreador.suscribir(self.registrar_muestreo)
+        
+        # Últimas muestras por proceso en memoria para tendencias y gráficas
+        self.buffer_metricas = BufferMetricas(config_monitoreo.get('muestras_recientes', 600))
+        self.muestreador.suscribir(self.buffer_metricas.registrar)
+        
+        # Histórico de CPU y memoria por proceso
+        self.historial = None
+        config_historial = self.configuracion.get('historial', {})
+        if config_historial.get('habilitar_historial', True):
+            self.historial = HistorialProcesos(
+                config_historial, self.config_manager.config_dir / 'historial.db', self.logs
+            )
+            self.muestreador.suscribir(self.historial.registrar)
+        
+        # Cambios en config.json hechos fuera de la aplicación (edición manual, despliegues)
+        self.vigilante_config = None
+        if config_monitoreo.get('recarga_automatica_config', True):
+            self.vigilante_config = VigilanteConfig(self.config_manager.config_file,
+                                                    self.recargar_configuracion, logs=self.logs)
+            self.vigilante_config.iniciar()
         
         # Iniciar hilos
-        self.update_thread = threading.Thread(target=self.update_processes, daemon=True)
-        self.update_thread.start()
+        self.muestreador.iniciar()
         self.icon_thread = threading.Thread(target=self.init_tray_icon, daemon=True)
         self.icon_thread.start()
         
-        # Control de alertas
-        self.last_alerted = set()
-        self.ultimo_proceso_problematico = None  # Información del último proceso que causó alerta
-        
         # Configurar eventos de ventana
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
@@ -149,110 +192,65 @@ class MonitorRecursosApp:
         )
         self.ventana_alertas.frame.pack(fill=tk.BOTH, expand=True)
         self.tree = self.ventana_alertas.tree
+        self.reconciliador_alertas = ReconciliadorArbol(self.tree)
 
         # Pestaña de todos los procesos
         frame_todos = ttk.Frame(self.notebook, padding=0)
         self.notebook.add(frame_todos, text="Todos los procesos")
-        self.ventana_todos = VentanaTodosProcesos(frame_todos)
+        self.ventana_todos = VentanaTodosProcesos(
+            frame_todos,
+            self.muestreador,
+            self.configuracion.get('interfaz', {}).get('umbral_lista_virtual', 2000),
+            logs=self.logs
+        )
         self.ventana_todos.frame.pack(fill=tk.BOTH, expand=True)
-        # Llama a la actualización periódica de la lista de procesos
-        self.ventana_todos.update_all_processes()
+        # Al cambiar de pestaña se muestrea enseguida para no enseñar datos viejos
+        self.notebook.bind('<<NotebookTabChanged>>', lambda e: self.muestreador.acelerar())
         # El menú contextual y refresco ya están gestionados dentro de VentanaTodosProcesos
         # No es necesario referenciar self.tree_all ni crear menú aquí
 
-    def update_processes(self):
-        """Hilo principal de monitoreo de procesos"""
-        self.logs.log_info("Iniciando monitoreo de procesos")
-        
-        while self.running:
-            try:
-                cpu_max = self.cpu_threshold.get()
-                mem_max = self.mem_threshold.get() * 1024 * 1024
-                procesos_alerta = []
-                nuevos_alertados = set()
-                
-                # Obtener lista de procesos excluidos de la configuración
-                procesos_excluidos = self.configuracion.get('monitoreo', {}).get('procesos_excluidos', 
-                                                          ['System Idle Process', 'kernel_task'])
-                
-                for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_info']):
-                    try:
-                        cpu = proc.info['cpu_percent']
-                        mem = proc.info['memory_info'].rss
-                        nombre = proc.info['name'] or 'Proceso sin nombre'
-                        
-                        # Filtrar procesos excluidos y valores de CPU anómalos
-                        if any(nombre.lower() == excluido.lower() for excluido in procesos_excluidos):
-                            continue
-                        if cpu < 0 or cpu > 100:
-                            continue
-                        
-                        # Verificar si supera umbrales
-                        if cpu > cpu_max or mem > mem_max:
-                            procesos_alerta.append((proc.info['pid'], nombre, cpu, mem // (1024*1024)))
-                            nuevos_alertados.add(proc.info['pid'])
-                            
-                            # Almacenar información del último proceso problemático
-                            self.ultimo_proceso_problematico = {
-                                'pid': proc.info['pid'],
-                                'nombre': nombre,
-                                'cpu': cpu,
-                                'memoria': mem // (1024*1024)
-                            }
-                            
-                            # Log de alerta para procesos nuevos
-                            if proc.info['pid'] not in self.last_alerted:
-                                self.logs.log_alerta_proceso(nombre, proc.info['pid'], cpu, mem // (1024*1024))
-                    
-                    except (psutil.NoSuchProcess, psutil.AccessDenied, KeyError) as e:
-                        # Log solo errores importantes, no accesos denegados rutinarios
-                        if not isinstance(e, psutil.AccessDenied):
-                            self.logs.log_debug(f"Error accediendo a proceso: {e}")
-                        continue
-                
-                self.processes = procesos_alerta
-                
-                # Notificar solo si hay nuevos procesos en alerta y las notificaciones están habilitadas
-                nuevos = nuevos_alertados - self.last_alerted
-                if nuevos and self.configuracion.get('monitoreo', {}).get('mostrar_notificaciones', True):
-                    self.show_notification(len(nuevos), self.ultimo_proceso_problematico)
-                    self.logs.log_info(f"Notificación mostrada: {len(nuevos)} nuevos procesos en alerta")
-                
-                self.last_alerted = nuevos_alertados
-                self.root.after(0, self.refresh_tree)
-                
-                # Usar intervalo de actualización de la configuración
-                time.sleep(self.intervalo_actualizacion)
-                
-            except Exception as e:
-                self.logs.log_error(f"Error en monitoreo de procesos: {e}")
-                time.sleep(5)  # Esperar más tiempo en caso de error
+    def evaluar_alertas(self, instantanea):
+        """Evalúa los umbrales sobre cada instantánea publicada por el muestreador"""
+        if not self.running:
+            return
         
-        self.logs.log_info("Monitoreo de procesos detenido")
+        # Los umbrales pueden haberse cambiado desde la pestaña de alertas
+        self.evaluador.cpu_umbral = self.cpu_threshold.get()
+        self.evaluador.mem_umbral_mb = self.mem_threshold.get()
+        self.processes = self.evaluador.evaluar(instantanea)
+        self.last_alerted = self.evaluador.alertados
+        self.ultimo_proceso_problematico = self.evaluador.ultimo_proceso_problematico
+        self.root.after(0, self.refresh_tree)
+
+    def actualizar_bandeja(self, instantanea):
+        """Refleja en el tooltip del icono de bandeja el número de procesos en alerta"""
+        if not hasattr(self, 'tray_icon'):
+            return
+        n = len(self.last_alerted)
+        titulo = "Monitor de Recursos"
+        if n:
+            titulo += f" - {n} proceso(s) en alerta"
+        if self.tray_icon.title != titulo:
+            self.tray_icon.title = titulo
+
+    def registrar_muestreo(self, instantanea):
+        """Registra en el log de depuración el coste de cada barrido"""
+        self.logs.log_debug(
+            f"Barrido #{instantanea.generacion}: {len(instantanea.procesos)} procesos "
+            f"en {instantanea.duracion * 1000:.1f} ms"
+        )
 
-    def show_notification(self, n, proceso_info=None):
-        """Muestra notificación del sistema con información específica del proceso"""
-        try:
-            if proceso_info:
-                mensaje = f"Proceso '{proceso_info['nombre']}' (PID: {proceso_info['pid']}) supera los límites.\nCPU: {proceso_info['cpu']:.1f}% | Memoria: {proceso_info['memoria']} MB\n\nHaz clic para ver detalles."
-                title = "⚠️ Proceso consumiendo recursos"
-            else:
-                mensaje = f"{n} proceso(s) superan los límites de recursos.\n\nHaz clic para ver detalles."
-                title = "⚠️ Procesos consumiendo recursos"
-            
-            # Usar plyer notification con timeout configurado
-            notification.notify(
-                title=title,
-                message=mensaje,
-                timeout=self.configuracion.get('alertas', {}).get('duracion_notificacion', 5000) // 1000,
-                app_name="Monitor de Recursos"
-            )
-            
-            # Nota: plyer no soporta callbacks de clic directamente en todas las plataformas
-            # Como alternativa, podemos mostrar el proceso cuando se restaure la ventana
-            
-        except Exception as e:
-            self.logs.log_error(f"Error mostrando notificación: {e}")
+    def show_notification(self, titulo, mensaje):
+        """Muestra notificación del sistema (se ejecuta en el hilo del notificador)"""
+        # Usar plyer notification con timeout configurado
+        mostrar_notificacion_escritorio(
+            titulo,
+            mensaje + "\n\nHaz clic para ver detalles.",
+            self.configuracion.get('alertas', {}).get('duracion_notificacion', 5000) // 1000
+        )
+        
+        # Nota: plyer no soporta callbacks de clic directamente en todas las plataformas
+        # Como alternativa, podemos mostrar el proceso cuando se restaure la ventana
 
     def create_image(self):
         # Carga el icono de la rana desde img/vitamina.png
@@ -276,6 +274,12 @@ class MonitorRecursosApp:
             self.ventana_todos.stop_updates()
         
         self.running = False
+        if self.vigilante_config:
+            self.vigilante_config.detener()
+        self.muestreador.detener()
+        self.notificador.detener()
+        if self.historial:
+            self.historial.cerrar()
         icon.stop()
         self.root.after(0, self.root.destroy)
 
@@ -294,10 +298,7 @@ class MonitorRecursosApp:
             print(f"Error creando icono de bandeja: {e}")
 
     def refresh_tree(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        for pid, nombre, cpu, mem in self.processes:
-            self.tree.insert('', tk.END, values=(pid, nombre, cpu, mem))
+        self.reconciliador_alertas.aplicar(self.processes)
 
     def get_selected_pid(self):
         sel = self.tree.selection()
@@ -313,7 +314,9 @@ class MonitorRecursosApp:
             return
         try:
             p = psutil.Process(pid)
+            nombre = p.name()
             p.terminate()
+            self.logs.log_evento_proceso("terminado", nombre, pid)
             messagebox.showinfo("Éxito", f"Proceso {pid} terminado.")
         except Exception as e:
             messagebox.showerror("Error", str(e))
@@ -324,11 +327,13 @@ class MonitorRecursosApp:
             return
         try:
             p = psutil.Process(pid)
+            nombre = p.name()
             exe = p.exe()
             args = p.cmdline()
             p.terminate()
             p.wait(timeout=3)
-            psutil.Popen([exe] + args[1:])
+            nuevo = psutil.Popen([exe] + args[1:])
+            self.logs.log_evento_proceso("reiniciado", nombre, pid, f"nuevo PID: {nuevo.pid}")
             messagebox.showinfo("Éxito", f"Proceso {pid} reiniciado.")
         except Exception as e:
             messagebox.showerror("Error", str(e))
@@ -341,9 +346,11 @@ class MonitorRecursosApp:
             p = psutil.Process(pid)
             if p.status() == psutil.STATUS_STOPPED:
                 p.resume()
+                self.logs.log_evento_proceso("reanudado", p.name(), pid)
                 messagebox.showinfo("Proceso", f"Proceso {pid} reanudado.")
             else:
                 p.suspend()
+                self.logs.log_evento_proceso("pausado", p.name(), pid)
                 messagebox.showinfo("Proceso", f"Proceso {pid} pausado.")
         except Exception as e:
             messagebox.showerror("Error", str(e))
@@ -354,6 +361,16 @@ class MonitorRecursosApp:
         self.root.withdraw()  # Oculta la ventana, pero deja el icono en bandeja
         self.root.after(100, self.ensure_taskbar_icon)
 
+    def _ventana_mostrada(self, event):
+        # Los eventos <Map> de los widgets hijos también llegan al binding de la ventana
+        if event.widget is self.root:
+            self.planificador.visible = True
+            self.muestreador.acelerar()
+
+    def _ventana_ocultada(self, event):
+        if event.widget is self.root:
+            self.planificador.visible = False
+
     def ensure_taskbar_icon(self):
         # Vuelve a mostrar el icono en la barra de tareas si está minimizado
         if self.root.state() == 'iconic':
@@ -392,14 +409,27 @@ class MonitorRecursosApp:
         """Cierra completamente la aplicación guardando configuración"""
         self.logs.log_info("Cerrando aplicación...")
         
+        if self.vigilante_config:
+            self.vigilante_config.detener()
+        
         # Guardar configuración actual
         self.guardar_configuracion_actual()
         
         # Detener actualizaciones de la ventana de todos los procesos
         if hasattr(self, 'ventana_todos'):
             self.ventana_todos.stop_updates()
+            bloqueo_ms = self.ventana_todos.medidor_bloqueos.bloqueo_maximo * 1000
+            self.logs.log_info(f"Bloqueo máximo de la interfaz en la sesión: {bloqueo_ms:.0f} ms")
         
         self.running = False
+        self.muestreador.detener()
+        self.notificador.detener()
+        if self.historial:
+            self.historial.cerrar()
+        self.logs.log_info(
+            f"Buffer de métricas: {len(self.buffer_metricas)} procesos, "
+            f"{self.buffer_metricas.memoria_utilizada() / (1024*1024):.1f} MB"
+        )
         try:
             if hasattr(self, 'tray_icon'):
                 self.tray_icon.stop()
@@ -507,10 +537,129 @@ class MonitorRecursosApp:
             self.logs.limpiar_logs_antiguos()
             messagebox.showinfo("Éxito", "Logs antiguos limpiados correctamente")
 
-    def _guardar_config_callback(self, configuracion):
-        """Callback para guardar configuración desde ventanas de configuración"""
+    def recargar_configuracion(self):
+        """Relee config.json tras un cambio externo (se llama desde el hilo del vigilante)"""
+        secciones = self.config_manager.recargar_si_cambio()
+        if secciones:
+            self.root.after(0, self.aplicar_configuracion_recargada, secciones)
+
+    def aplicar_configuracion_recargada(self, secciones):
+        """Aplica en caliente las secciones cambiadas, sin reconstruir la interfaz"""
+        if 'umbrales' in secciones:
+            config_umbrales = self.configuracion.get('umbrales', {})
+            self.cpu_threshold.set(config_umbrales.get('cpu_porcentaje', DEFAULT_CPU))
+            self.mem_threshold.set(config_umbrales.get('memoria_mb', DEFAULT_MEM))
+        if 'monitoreo' in secciones:
+            # procesos_excluidos y mostrar_notificaciones se leen en cada evaluación
+            config_monitoreo = self.configuracion.get('monitoreo', {})
+            intervalo = config_monitoreo.get('intervalo_actualizacion', 3)
+            if intervalo != self.intervalo_actualizacion:
+                self.intervalo_actualizacion = intervalo
+                self.muestreador.establecer_intervalo(intervalo)
+        if 'logs' in secciones:
+            self.logs.aplicar_configuracion(self.configuracion)
+        self.logs.log_info(f"Configuración recargada desde config.json: {', '.join(secciones)}")
+
+    def _guardar_config_callback(self, configuracion, inmediato=False):
+        """Callback para guardar configuración desde ventanas de configuración.
+        
+        Por defecto la escritura se difiere: varios cambios seguidos acaban en
+        un solo guardado (los fallos van al log) y lo pendiente se escribe al
+        salir. Con inmediato se escribe ya y se devuelve si se pudo guardar.
+        """
         self.configuracion = configuracion
-        return self.config_manager.guardar_configuracion(configuracion)
+        self.evaluador.configuracion = configuracion
+        if inmediato:
+            return self.config_manager.guardar_configuracion(configuracion)
+        self.config_manager.programar_guardado(configuracion)
+        return True
+
+    def _crear_seccion_perfiles(self, parent, ventana):
+        """Tabla editable de perfiles de umbrales; devuelve una función con la lista resultante"""
+        perfiles = [dict(p) for p in self.configuracion.get('umbrales', {}).get('perfiles', [])]
+        
+        frame = ttk.LabelFrame(parent, text="Umbrales por proceso (gana el primero que coincide)", padding=5)
+        frame.grid(row=2, column=0, columnspan=3, sticky="ew", pady=(8, 0))
+        frame.columnconfigure(1, weight=1)
+        
+        columnas = ('campo', 'valor', 'cpu', 'memoria')
+        tabla = ttk.Treeview(frame, columns=columnas, show='headings', height=5, selectmode='browse')
+        for columna, titulo, ancho in (('campo', "Campo", 70), ('valor', "Valor", 150),
+                                       ('cpu', "CPU %", 60), ('memoria', "Memoria MB", 80)):
+            tabla.heading(columna, text=titulo)
+            tabla.column(columna, width=ancho, stretch=(columna == 'valor'))
+        tabla.grid(row=0, column=0, columnspan=4, sticky="ew")
+        
+        def campo_de(perfil):
+            return next((campo for campo in CAMPOS if campo in perfil), '')
+        
+        def repintar(seleccion=None):
+            tabla.delete(*tabla.get_children())
+            for i, perfil in enumerate(perfiles):
+                campo = campo_de(perfil)
+                tabla.insert('', tk.END, iid=str(i), values=(
+                    campo, perfil.get(campo, ''),
+                    perfil.get('cpu_porcentaje', "global"), perfil.get('memoria_mb', "global")))
+            if seleccion is not None and 0 <= seleccion < len(perfiles):
+                tabla.selection_set(str(seleccion))
+        
+        # Formulario para añadir un perfil (CPU o memoria vacíos: se usa el umbral global)
+        campo_var = tk.StringVar(value='nombre')
+        valor_var = tk.StringVar()
+        cpu_perfil_var = tk.StringVar()
+        mem_perfil_var = tk.StringVar()
+        ttk.Combobox(frame, textvariable=campo_var, values=list(CAMPOS), state="readonly", width=9).grid(row=1, column=0, sticky=tk.EW, pady=(5, 0))
+        ttk.Entry(frame, textvariable=valor_var).grid(row=1, column=1, sticky=tk.EW, padx=2, pady=(5, 0))
+        ttk.Entry(frame, textvariable=cpu_perfil_var, width=6).grid(row=1, column=2, sticky=tk.EW, padx=2, pady=(5, 0))
+        ttk.Entry(frame, textvariable=mem_perfil_var, width=8).grid(row=1, column=3, sticky=tk.EW, pady=(5, 0))
+        
+        def anadir():
+            perfil = {campo_var.get(): valor_var.get().strip()}
+            try:
+                for clave, var in (('cpu_porcentaje', cpu_perfil_var), ('memoria_mb', mem_perfil_var)):
+                    if var.get().strip():
+                        perfil[clave] = float(var.get())
+            except ValueError:
+                messagebox.showerror("Perfil no válido", "CPU % y memoria MB deben ser números", parent=ventana)
+                return
+            if not perfil[campo_var.get()] or len(perfil) == 1:
+                messagebox.showerror("Perfil no válido", "Indica un valor y al menos un umbral (CPU % o memoria MB)", parent=ventana)
+                return
+            try:
+                perfil_desde_config(perfil)  # Valida el patrón
+            except re.error as e:
+                messagebox.showerror("Perfil no válido", f"Expresión regular no válida: {e}", parent=ventana)
+                return
+            perfiles.append(perfil)
+            valor_var.set("")
+            repintar(len(perfiles) - 1)
+        
+        def seleccionado():
+            seleccion = tabla.selection()
+            return int(seleccion[0]) if seleccion else None
+        
+        def eliminar():
+            i = seleccionado()
+            if i is not None:
+                del perfiles[i]
+                repintar(min(i, len(perfiles) - 1))
+        
+        def mover(desplazamiento):
+            i = seleccionado()
+            j = i + desplazamiento if i is not None else -1
+            if 0 <= j < len(perfiles):
+                perfiles[i], perfiles[j] = perfiles[j], perfiles[i]
+                repintar(j)
+        
+        frame_botones = ttk.Frame(frame)
+        frame_botones.grid(row=2, column=0, columnspan=4, sticky=tk.W, pady=(5, 0))
+        ttk.Button(frame_botones, text="Añadir", command=anadir).pack(side=tk.LEFT)
+        ttk.Button(frame_botones, text="Eliminar", command=eliminar).pack(side=tk.LEFT, padx=5)
+        ttk.Button(frame_botones, text="Subir", command=lambda: mover(-1)).pack(side=tk.LEFT)
+        ttk.Button(frame_botones, text="Bajar", command=lambda: mover(1)).pack(side=tk.LEFT, padx=5)
+        
+        repintar()
+        return lambda: [dict(p) for p in perfiles]
 
     def _crear_ventana_configuracion(self):
         """Crea ventana de configuración general"""
@@ -563,6 +712,9 @@ class MonitorRecursosApp:
         ttk.Scale(frame_umbrales, from_=100, to=2000, variable=mem_var, orient=tk.HORIZONTAL).grid(row=1, column=1, sticky=tk.EW, padx=5)
         ttk.Label(frame_umbrales, textvariable=mem_var).grid(row=1, column=2)
         
+        # Umbrales por proceso (perfiles)
+        obtener_perfiles = self._crear_seccion_perfiles(frame_umbrales, ventana_config)
+        
         # Configuración de monitoreo
         frame_monitoreo = ttk.LabelFrame(scrollable_frame, text="Configuración de Monitoreo", padding=10)
         frame_monitoreo.grid(row=1, column=0, sticky="ew", padx=10, pady=5)
@@ -579,6 +731,10 @@ class MonitorRecursosApp:
         minimizar_var = tk.BooleanVar(value=self.configuracion.get('monitoreo', {}).get('auto_minimizar_bandeja', True))
         ttk.Checkbutton(frame_monitoreo, text="Auto-minimizar a bandeja al cerrar", variable=minimizar_var).grid(row=2, column=0, columnspan=3, sticky=tk.W, pady=2)
         
+        adaptativo_var = tk.BooleanVar(value=self.configuracion.get('monitoreo', {}).get('intervalo_adaptativo', True))
+        ttk.Checkbutton(frame_monitoreo, text="Intervalo adaptativo (más rápido cerca de un umbral, más lento en reposo)",
+                        variable=adaptativo_var).grid(row=3, column=0, columnspan=3, sticky=tk.W, pady=2)
+        
         # Configuración de logs
         frame_logs = ttk.LabelFrame(scrollable_frame, text="Configuración de Logs", padding=10)
         frame_logs.grid(row=2, column=0, sticky="ew", padx=10, pady=5)
@@ -601,31 +757,39 @@ class MonitorRecursosApp:
         frame_botones.grid(row=3, column=0, sticky="ew", padx=10, pady=10)
         
         def guardar_configuracion():
-            # Actualizar configuración
-            self.configuracion['umbrales']['cpu_porcentaje'] = cpu_var.get()
-            self.configuracion['umbrales']['memoria_mb'] = mem_var.get()
-            self.configuracion['monitoreo']['intervalo_actualizacion'] = intervalo_var.get()
-            self.configuracion['monitoreo']['mostrar_notificaciones'] = notif_var.get()
-            self.configuracion['monitoreo']['auto_minimizar_bandeja'] = minimizar_var.get()
-            self.configuracion['logs']['habilitar_logs'] = logs_habilitados_var.get()
-            self.configuracion['logs']['nivel_log'] = nivel_var.get()
-            self.configuracion['logs']['dias_retencion'] = retencion_var.get()
+            # Actualizar configuración, anotando qué valores cambian
+            nuevos_valores = [
+                ('umbrales', 'cpu_porcentaje', cpu_var.get()),
+                ('umbrales', 'memoria_mb', mem_var.get()),
+                ('umbrales', 'perfiles', obtener_perfiles()),
+                ('monitoreo', 'intervalo_actualizacion', intervalo_var.get()),
+                ('monitoreo', 'mostrar_notificaciones', notif_var.get()),
+                ('monitoreo', 'auto_minimizar_bandeja', minimizar_var.get()),
+                ('monitoreo', 'intervalo_adaptativo', adaptativo_var.get()),
+                ('logs', 'habilitar_logs', logs_habilitados_var.get()),
+                ('logs', 'nivel_log', nivel_var.get()),
+                ('logs', 'dias_retencion', retencion_var.get()),
+            ]
+            cambios = []
+            for seccion, clave, valor in nuevos_valores:
+                anterior = self.configuracion[seccion].get(clave)
+                if anterior != valor:
+                    cambios.append((seccion, clave, anterior, valor))
+                self.configuracion[seccion][clave] = valor
             
             # Guardar y aplicar cambios
-            if self._guardar_config_callback(self.configuracion):
+            if self._guardar_config_callback(self.configuracion, inmediato=True):
                 # Aplicar cambios inmediatamente
                 self.cpu_threshold.set(cpu_var.get())
                 self.mem_threshold.set(mem_var.get())
                 self.intervalo_actualizacion = intervalo_var.get()
+                self.muestreador.establecer_intervalo(self.intervalo_actualizacion)
                 
                 # Reconfigurar sistema de logs
-                self.logs.configuracion = self.configuracion
-                self.logs.log_config = self.configuracion.get('logs', {})
-                self.logs.nivel_log = nivel_var.get()
-                self.logs.dias_retencion = retencion_var.get()
-                self.logs.habilitar_logs = logs_habilitados_var.get()
-                self.logs.configurar_logger()
+                self.logs.aplicar_configuracion(self.configuracion)
                 
+                for cambio in cambios:
+                    self.logs.log_cambio_configuracion(*cambio)
                 self.logs.log_info("Configuración actualizada desde ventana de preferencias")
                 messagebox.showinfo("Éxito", "Configuración guardada correctamente")
                 ventana_config.destroy()
@@ -0,0 +1,183 @@
+import threading
+import time
+from typing import NamedTuple
+
+import psutil
+
+
+class MuestraProceso(NamedTuple):
+    """Datos de un proceso en una instantánea"""
+    pid: int
+    nombre: str
+    cpu: float
+    memoria: int  # RSS en bytes
+    creacion: float = 0.0  # Instante de arranque (epoch); junto al PID identifica el proceso
+
+
+class InstantaneaProcesos(NamedTuple):
+    """Resultado de un barrido completo de procesos"""
+    generacion: int
+    timestamp: float
+    procesos: tuple
+    duracion: float  # Segundos empleados en el barrido
+
+
+class RecolectorPsutil:
+    """Recolector de procesos basado en psutil.process_iter"""
+
+    nombre = 'psutil'
+
+    def recolectar(self):
+        """Devuelve una lista de MuestraProceso con todos los procesos accesibles"""
+        muestras = []
+        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_info', 'create_time']):
+            try:
+                info = proc.info
+                memoria_info = info['memory_info']
+                if memoria_info is None or info['cpu_percent'] is None:
+                    continue
+                muestras.append(MuestraProceso(
+                    info['pid'],
+                    info['name'] or 'Proceso sin nombre',
+                    info['cpu_percent'],
+                    memoria_info.rss,
+                    info['create_time'] or 0.0
+                ))
+            except (psutil.NoSuchProcess, psutil.AccessDenied, KeyError):
+                continue
+        return muestras
+
+
+def crear_recolector(tipo='auto', logs=None):
+    """Crea el recolector indicado en la configuración ('auto', 'proc' o 'psutil').
+
+    'auto' usa el lector directo de /proc cuando está disponible (Linux) y
+    psutil en el resto de sistemas.
+    """
+    if tipo in ('auto', 'proc'):
+        from recolector_proc import RecolectorProc
+        if RecolectorProc.disponible():
+            return RecolectorProc()
+        if tipo == 'proc' and logs:
+            logs.log_warning("/proc no disponible, se usará el recolector psutil")
+    return RecolectorPsutil()
+
+
+class MuestreadorProcesos:
+    """Motor de muestreo compartido.
+
+    Realiza un único barrido de procesos por ciclo y publica la instantánea
+    resultante a todos los suscriptores (alertas, pestaña de todos los
+    procesos, bandeja, logs...). El coste del barrido no depende del número
+    de vistas abiertas. Los callbacks se ejecutan en el hilo del muestreador,
+    por lo que las vistas Tk deben trasladar el trabajo a su propio hilo.
+    """
+
+    def __init__(self, intervalo=3, recolector=None, logs=None, planificador=None):
+        self.intervalo = intervalo
+        self.recolector = recolector or RecolectorPsutil()
+        self.logs = logs
+        self.planificador = planificador  # PlanificadorMuestreo; None: intervalo fijo
+
+        self._suscriptores = []
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._despertar = threading.Event()
+        self._hilo = None
+
+        self.generacion = 0
+        self.ultima_instantanea = None
+
+    def suscribir(self, callback):
+        """Registra un callback que recibirá cada InstantaneaProcesos"""
+        with self._lock:
+            if callback not in self._suscriptores:
+                self._suscriptores.append(callback)
+        # Entregar la última instantánea para que la vista no espere al siguiente ciclo
+        instantanea = self.ultima_instantanea
+        if instantanea is not None:
+            self._entregar(callback, instantanea)
+
+    def desuscribir(self, callback):
+        """Elimina un callback previamente registrado"""
+        with self._lock:
+            if callback in self._suscriptores:
+                self._suscriptores.remove(callback)
+
+    def iniciar(self):
+        """Arranca el hilo de muestreo"""
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name='MuestreadorProcesos', daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Detiene el hilo de muestreo"""
+        self._detener.set()
+        self._despertar.set()
+
+    def establecer_intervalo(self, segundos):
+        """Cambia el intervalo entre barridos y aplica el cambio de inmediato"""
+        self.intervalo = segundos
+        self._despertar.set()
+
+    def acelerar(self):
+        """Muestrea ya y a ritmo rápido durante un tiempo (p.ej. al abrir la ventana o una pestaña)"""
+        if self.planificador is not None and self.planificador.acelerar():
+            self._despertar.set()
+
+    def muestrear(self):
+        """Realiza un barrido, lo publica y devuelve la instantánea"""
+        inicio = time.monotonic()
+        procesos = tuple(self.recolector.recolectar())
+        duracion = time.monotonic() - inicio
+
+        self.generacion += 1
+        instantanea = InstantaneaProcesos(self.generacion, time.time(), procesos, duracion)
+        self.ultima_instantanea = instantanea
+
+        with self._lock:
+            suscriptores = list(self._suscriptores)
+        for callback in suscriptores:
+            self._entregar(callback, instantanea)
+        return instantanea
+
+    def _entregar(self, callback, instantanea):
+        """Entrega una instantánea aislando los errores de cada suscriptor"""
+        try:
+            callback(instantanea)
+        except Exception as e:
+            if self.logs:
+                self.logs.log_error(f"Error en suscriptor del muestreador: {e}")
+
+    def _bucle(self):
+        """Bucle del hilo de muestreo"""
+        if self.logs:
+            self.logs.log_info(f"Muestreador de procesos iniciado (recolector: {self.recolector.nombre})")
+
+        while not self._detener.is_set():
+            try:
+                inicio = time.thread_time()
+                self.muestrear()
+                espera = self.intervalo
+                if self.planificador is not None:
+                    # Coste en CPU del ciclo en este hilo: barrido y suscriptores
+                    espera = self.planificador.siguiente_espera(self.intervalo, time.thread_time() - inicio)
+            except Exception as e:
+                if self.logs:
+                    self.logs.log_error(f"Error en muestreo de procesos: {e}")
+                espera = 5  # Esperar más tiempo en caso de error
+                if not isinstance(self.recolector, RecolectorPsutil):
+                    # Recurrir a psutil si el recolector alternativo falla
+                    if self.logs:
+                        self.logs.log_warning(f"Recolector '{self.recolector.nombre}' desactivado, se usará psutil")
+                    self.recolector = RecolectorPsutil()
+
+            self._despertar.wait(espera)
+            self._despertar.clear()
+
+        if hasattr(self.recolector, 'cerrar'):
+            self.recolector.cerrar()
+        if self.logs:
+            self.logs.log_info("Muestreador de procesos detenido")
@@ -0,0 +1,122 @@
+import threading
+import time
+
+
+def formatear_notificacion(procesos, omitidos=0):
+    """Construye (título, mensaje) para un grupo de procesos en alerta"""
+    total = len(procesos) + omitidos
+    if total == 1 and 'minutos_hasta_limite' in procesos[0]:
+        p = procesos[0]
+        titulo = "📈 Posible fuga de memoria"
+        mensaje = (f"La memoria de '{p['nombre']}' (PID: {p['pid']}) crece {p['crecimiento_mb_min']:.1f} MB/min.\n"
+                   f"Memoria: {p['memoria']} MB | Límite en ~{p['minutos_hasta_limite']:.0f} min")
+    elif total == 1:
+        p = procesos[0]
+        titulo = "⚠️ Proceso consumiendo recursos"
+        mensaje = (f"Proceso '{p['nombre']}' (PID: {p['pid']}) supera los límites.\n"
+                   f"CPU: {p['cpu']:.1f}% | Memoria: {p['memoria']} MB")
+    else:
+        titulo = "⚠️ Procesos consumiendo recursos"
+        principales = sorted(procesos, key=lambda p: p['memoria'], reverse=True)[:3]
+        detalle = ", ".join(f"{p['nombre']} ({p['pid']})" for p in principales)
+        if total > len(principales):
+            detalle += f" y {total - len(principales)} más"
+        if any('minutos_hasta_limite' in p for p in procesos):
+            mensaje = f"{total} proceso(s) superan o se acercan a los límites de recursos.\n{detalle}"
+        else:
+            mensaje = f"{total} proceso(s) superan los límites de recursos.\n{detalle}"
+    return titulo, mensaje
+
+
+def mostrar_notificacion_escritorio(titulo, mensaje, timeout=5):
+    """Backend de escritorio basado en plyer (importado solo cuando se usa)"""
+    from plyer import notification
+    notification.notify(
+        title=titulo,
+        message=mensaje,
+        timeout=timeout,
+        app_name="Monitor de Recursos"
+    )
+
+
+class NotificadorAsincrono:
+    """Despacha notificaciones desde un hilo propio.
+
+    ``notificar()`` se llama desde el hilo del muestreador y solo añade los
+    procesos a una lista de pendientes acotada: no espera al backend (D-Bus,
+    plyer...). El hilo de envío agrupa todo lo pendiente en una única
+    notificación, de modo que una ráfaga de procesos nuevos en uno o varios
+    ciclos produce un solo aviso. Además cada proceso se notifica como mucho
+    una vez cada ``intervalo_por_proceso`` segundos, aunque entre y salga de
+    la alerta en ciclos alternos.
+    """
+
+    def __init__(self, mostrar, intervalo_por_proceso=300, max_pendientes=50, logs=None):
+        self.mostrar = mostrar  # callback(titulo, mensaje), puede bloquear
+        self.intervalo_por_proceso = intervalo_por_proceso
+        self.max_pendientes = max_pendientes
+        self.logs = logs
+
+        self._pendientes = []
+        self._omitidos = 0
+        self._ultima_notificacion = {}  # (pid, nombre) -> instante del último aviso
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, name='NotificadorAsincrono', daemon=True)
+        self._hilo.start()
+
+    def notificar(self, procesos):
+        """Encola una lista de dicts {pid, nombre, cpu, memoria} sin bloquear"""
+        ahora = time.monotonic()
+        with self._lock:
+            for info in procesos:
+                # Los avisos de tendencia no retrasan la alerta del mismo proceso
+                clave = (info['pid'], info['nombre'], 'minutos_hasta_limite' in info)
+                ultima = self._ultima_notificacion.get(clave)
+                if ultima is not None and ahora - ultima < self.intervalo_por_proceso:
+                    continue
+                self._ultima_notificacion[clave] = ahora
+                if len(self._pendientes) < self.max_pendientes:
+                    self._pendientes.append(info)
+                else:
+                    self._omitidos += 1
+            hay_pendientes = bool(self._pendientes)
+            self._purgar(ahora)
+        if hay_pendientes:
+            self._despertar.set()
+
+    def detener(self):
+        """Detiene el hilo de envío descartando lo pendiente"""
+        self._detener.set()
+        self._despertar.set()
+
+    def _purgar(self, ahora):
+        """Olvida los procesos cuyo límite de frecuencia ya expiró"""
+        if len(self._ultima_notificacion) > 4 * self.max_pendientes:
+            limite = ahora - self.intervalo_por_proceso
+            self._ultima_notificacion = {
+                clave: t for clave, t in self._ultima_notificacion.items() if t >= limite
+            }
+
+    def _bucle(self):
+        while True:
+            self._despertar.wait()
+            self._despertar.clear()
+            if self._detener.is_set():
+                break
+
+            with self._lock:
+                procesos, self._pendientes = self._pendientes, []
+                omitidos, self._omitidos = self._omitidos, 0
+            if not procesos:
+                continue
+
+            titulo, mensaje = formatear_notificacion(procesos, omitidos)
+            try:
+                self.mostrar(titulo, mensaje)
+                if self.logs:
+                    self.logs.log_info(f"Notificación mostrada: {len(procesos) + omitidos} nuevos procesos en alerta")
+            except Exception as e:
+                if self.logs:
+                    self.logs.log_error(f"Error mostrando notificación: {e}")
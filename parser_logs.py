@@ -0,0 +1,69 @@
+"""
+Análisis rápido de líneas del log con formato fijo
+``AAAA-MM-DD HH:MM:SS | NIVEL    | mensaje``.
+
+Las posiciones de cada campo son fijas, así que basta con cortar la línea:
+la marca de tiempo se mantiene como cadena (las cadenas ISO se ordenan igual
+que las fechas, por lo que los filtros por rango son comparaciones de texto)
+y solo se convierte a datetime con ``fromisoformat`` cuando hace falta.
+Todas las funciones aceptan ``str`` o ``bytes``.
+"""
+
+from datetime import datetime
+
+FORMATO_MARCA = '%Y-%m-%d %H:%M:%S'
+
+NIVELES = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+ORDEN_NIVELES = {nivel: i for i, nivel in enumerate(NIVELES)}
+
+# Posiciones de los campos en una línea
+_FIN_MARCA = 19
+_INICIO_NIVEL = 22
+_FIN_NIVEL = 30
+_INICIO_MENSAJE = 33
+
+
+def _es_linea(linea):
+    """Comprueba la forma de la línea sin validar la fecha carácter a carácter"""
+    if len(linea) < _INICIO_MENSAJE:
+        return False
+    if isinstance(linea, bytes):
+        return linea[19:22] == b' | ' and linea[30:33] == b' | ' and linea[4:5] == b'-' and linea[13:14] == b':'
+    return linea[19:22] == ' | ' and linea[30:33] == ' | ' and linea[4] == '-' and linea[13] == ':'
+
+
+def marca_y_nivel(linea):
+    """(marca, nivel) como str, o (None, None) si la línea no tiene el formato"""
+    if not _es_linea(linea):
+        return None, None
+    if isinstance(linea, bytes):
+        return linea[:_FIN_MARCA].decode('ascii', 'replace'), \
+            linea[_INICIO_NIVEL:_FIN_NIVEL].decode('ascii', 'replace').rstrip()
+    return linea[:_FIN_MARCA], linea[_INICIO_NIVEL:_FIN_NIVEL].rstrip()
+
+
+def marca(linea):
+    """Marca de tiempo de la línea como str, o None"""
+    if not _es_linea(linea):
+        return None
+    if isinstance(linea, bytes):
+        return linea[:_FIN_MARCA].decode('ascii', 'replace')
+    return linea[:_FIN_MARCA]
+
+
+def marca_de_fecha(fecha):
+    """Convierte un datetime en marca comparable con las de las líneas"""
+    return fecha.strftime(FORMATO_MARCA) if fecha is not None else None
+
+
+def fecha_de_marca(marca):
+    """Convierte una marca en datetime (solo cuando se necesita el objeto)"""
+    try:
+        return datetime.fromisoformat(marca)
+    except (TypeError, ValueError):
+        return None
+
+
+def en_rango(marca, desde=None, hasta=None):
+    """Indica si una marca cae en [desde, hasta] (marcas str o None)"""
+    return (desde is None or marca >= desde) and (hasta is None or marca <= hasta)
@@ -0,0 +1,131 @@
+import re
+from typing import NamedTuple, Optional
+
+from reglas_exclusion import CAMPOS, Patrones, leer_atributo
+
+
+class Perfil(NamedTuple):
+    """Umbrales propios de los procesos que cumplen una regla"""
+    campo: str  # 'nombre', 'usuario', 'cmdline' o 'cgroup'
+    valor: str
+    patrones: Patrones
+    cpu_porcentaje: Optional[float]  # None: se usa el umbral global
+    memoria_mb: Optional[float]
+
+
+def _umbral(regla, clave):
+    valor = regla.get(clave)
+    return None if valor is None else float(valor)
+
+
+def perfil_desde_config(regla):
+    """Crea un Perfil a partir de un dict de ``umbrales.perfiles``, o None si no tiene campo.
+
+    Lanza ``ValueError`` o ``TypeError`` si un umbral no es un número y
+    ``re.error`` si el patrón no es válido (el archivo se puede editar a mano).
+    """
+    for campo in CAMPOS:
+        if campo in regla:
+            valor = str(regla[campo])
+            patrones = Patrones([valor])
+            if patrones.invalidos:
+                raise patrones.invalidos[0][1]
+            return Perfil(campo, valor, patrones,
+                          _umbral(regla, 'cpu_porcentaje'), _umbral(regla, 'memoria_mb'))
+    return None
+
+
+class PerfilesUmbrales:
+    """Tabla de perfiles de ``umbrales.perfiles`` con resolución cacheada.
+
+    Los perfiles se aplican por orden: gana el primero que coincide. Los
+    nombres exactos se resuelven con un dict (nombre en minúsculas -> índice)
+    y solo se prueban los patrones de nombre anteriores a ese índice; el
+    resultado se guarda por nombre. Las reglas por usuario, cmdline o cgroup
+    se resuelven por (pid, nombre), leyendo los atributos una vez por proceso
+    y solo si su regla está antes que la encontrada por nombre. Así el coste
+    por ciclo no crece con el número de perfiles. Los perfiles no válidos se
+    descartan y quedan en ``invalidos`` como ``(regla, error)``.
+    """
+
+    def __init__(self, reglas):
+        self.perfiles = []
+        self.invalidos = []
+        for regla in reglas or ():
+            try:
+                perfil = perfil_desde_config(regla)
+            except (ValueError, TypeError, re.error) as e:
+                self.invalidos.append((regla, e))
+                continue
+            if perfil is not None:
+                self.perfiles.append(perfil)
+        self._exactos = {}
+        self._patrones_nombre = []
+        self._atributos = []
+        for i, perfil in enumerate(self.perfiles):
+            if perfil.campo != 'nombre':
+                self._atributos.append(i)
+            elif perfil.patrones.exactos:
+                self._exactos.setdefault(perfil.valor.casefold(), i)
+            else:
+                self._patrones_nombre.append(i)
+
+        # Umbrales más bajos de todos los perfiles (por debajo no hace falta resolver nada)
+        # y umbral de memoria más alto (lo usan los avisos de tendencia)
+        cpus = [p.cpu_porcentaje for p in self.perfiles if p.cpu_porcentaje is not None]
+        memorias = [p.memoria_mb for p in self.perfiles if p.memoria_mb is not None]
+        self.cpu_minima = min(cpus) if cpus else None
+        self.memoria_minima_mb = min(memorias) if memorias else None
+        self.memoria_maxima_mb = max(memorias) if memorias else None
+
+        self._por_nombre = {}
+        self._por_proceso = {}
+        self._consultados = set()
+
+    def __bool__(self):
+        return bool(self.perfiles)
+
+    def __len__(self):
+        return len(self.perfiles)
+
+    def _indice_por_nombre(self, nombre):
+        indice = self._por_nombre.get(nombre)
+        if indice is None:
+            indice = self._exactos.get(nombre.casefold(), len(self.perfiles))
+            for i in self._patrones_nombre:
+                if i >= indice:
+                    break
+                if self.perfiles[i].patrones.coincide(nombre):
+                    indice = i
+                    break
+            self._por_nombre[nombre] = indice
+        return indice
+
+    def perfil(self, pid, nombre):
+        """Perfil que se aplica al proceso, o None si no coincide ninguno"""
+        indice = self._indice_por_nombre(nombre)
+        if self._atributos and self._atributos[0] < indice:
+            clave = (pid, nombre)
+            self._consultados.add(clave)
+            resuelto = self._por_proceso.get(clave)
+            if resuelto is None:
+                valores = {}
+                for i in self._atributos:
+                    if i >= indice:
+                        break
+                    perfil = self.perfiles[i]
+                    if perfil.campo not in valores:
+                        valores[perfil.campo] = leer_atributo(pid, perfil.campo)
+                    if perfil.patrones.coincide(valores[perfil.campo]):
+                        indice = i
+                        break
+                resuelto = self._por_proceso[clave] = indice
+            indice = resuelto
+        return self.perfiles[indice] if indice < len(self.perfiles) else None
+
+    def podar(self):
+        """Olvida los procesos no consultados desde la última poda"""
+        if len(self._por_proceso) > len(self._consultados):
+            self._por_proceso = {clave: self._por_proceso[clave] for clave in self._consultados
+                                 if clave in self._por_proceso}
+        self._consultados = set()
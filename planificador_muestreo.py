@@ -0,0 +1,76 @@
+import time
+
+import psutil
+
+# Segundos a ritmo rápido tras una interacción del usuario (abrir la ventana o una pestaña)
+DURACION_ACELERACION = 30
+# Factor con el que crece la espera en cada ciclo de reposo hasta intervalo_maximo
+FACTOR_REPOSO = 1.5
+
+
+class PlanificadorMuestreo:
+    """Calcula la espera entre barridos del muestreador.
+
+    - Ritmo rápido (``monitoreo.intervalo_minimo``) mientras algún proceso
+      está cerca de su umbral o en alerta, y durante ``DURACION_ACELERACION``
+      segundos después de que el usuario abra la ventana o cambie de pestaña.
+    - En reposo (CPU del sistema por debajo de ``monitoreo.carga_reposo_porcentaje``)
+      y con la ventana oculta, la espera crece poco a poco hasta
+      ``monitoreo.intervalo_maximo``.
+    - En el resto de casos, el intervalo configurado.
+
+    En todos los casos la espera es la necesaria para que el hilo del
+    muestreador (barrido y suscriptores, medido como tiempo de CPU del hilo)
+    no use más de ``monitoreo.cuota_cpu_muestreo_porcentaje`` % de un núcleo.
+    La configuración se lee en cada ciclo, así que los cambios se aplican sin
+    reiniciar.
+    """
+
+    def __init__(self, configuracion, cerca_de_umbral=None, logs=None):
+        self.configuracion = configuracion
+        self.cerca_de_umbral = cerca_de_umbral or (lambda: False)
+        self.logs = logs
+        self.visible = False  # Lo actualiza la interfaz; el daemon no tiene ventana
+        self.espera = None
+        self.motivo = None
+        self.coste = None  # Media móvil del tiempo de CPU por ciclo
+        self._acelerado_hasta = 0.0
+        psutil.cpu_percent(None)  # La primera lectura solo fija la referencia
+
+    def acelerar(self):
+        """Pasa a ritmo rápido un tiempo; devuelve True si no lo estaba ya"""
+        ahora = time.monotonic()
+        nuevo = ahora >= self._acelerado_hasta
+        self._acelerado_hasta = ahora + DURACION_ACELERACION
+        return nuevo
+
+    def siguiente_espera(self, intervalo, coste):
+        """Segundos hasta el próximo barrido, dado el intervalo configurado y el coste del último"""
+        config = self.configuracion.get('monitoreo', {})
+        self.coste = coste if self.coste is None else 0.7 * self.coste + 0.3 * coste
+
+        if not config.get('intervalo_adaptativo', True):
+            espera, motivo = intervalo, 'fijo'
+        elif time.monotonic() < self._acelerado_hasta:
+            espera, motivo = min(intervalo, config.get('intervalo_minimo', 1)), 'interacción'
+        elif self.cerca_de_umbral():
+            espera, motivo = min(intervalo, config.get('intervalo_minimo', 1)), 'cerca del umbral'
+        elif not self.visible and psutil.cpu_percent(None) < config.get('carga_reposo_porcentaje', 20):
+            anterior = self.espera if self.motivo == 'reposo' else intervalo
+            espera = min(max(intervalo, anterior * FACTOR_REPOSO), config.get('intervalo_maximo', 30))
+            motivo = 'reposo'
+        else:
+            espera, motivo = intervalo, 'normal'
+
+        # Límite de uso de CPU: coste / (coste + espera) <= cuota
+        cuota = config.get('cuota_cpu_muestreo_porcentaje', 5) / 100
+        if 0 < cuota < 1:
+            minima = self.coste * (1 - cuota) / cuota
+            if espera < minima:
+                espera, motivo = minima, 'cuota de CPU'
+
+        if motivo != self.motivo and self.logs:
+            self.logs.log_debug(f"Intervalo de muestreo: {espera:.1f}s ({motivo}, barrido {self.coste * 1000:.0f} ms de CPU)")
+        self.espera = espera
+        self.motivo = motivo
+        return espera
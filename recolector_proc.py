@@ -0,0 +1,175 @@
+import os
+import time
+
+try:
+    import resource
+except ImportError:  # No disponible en Windows
+    resource = None
+
+from muestreo_procesos import MuestraProceso
+
+
+class RecolectorProc:
+    """Recolector rápido para Linux que lee /proc directamente.
+
+    Para cada proceso lee ``/proc/<pid>/stat`` y ``/proc/<pid>/statm`` con
+    llamadas ``os.pread`` sobre descriptores que se mantienen abiertos entre
+    ciclos (hasta un máximo para no agotar el límite de descriptores), sin
+    crear objetos intermedios. El % de CPU se calcula a partir de la
+    diferencia de jiffies entre barridos, con la misma semántica que
+    ``psutil.Process.cpu_percent`` (100% = un núcleo completo).
+    """
+
+    nombre = 'proc'
+    TAMANO_LECTURA = 4096
+
+    def __init__(self, raiz='/proc', max_descriptores=None):
+        self.raiz = raiz
+        self.hz = os.sysconf('SC_CLK_TCK')
+        self.tamano_pagina = os.sysconf('SC_PAGE_SIZE')
+        self.arranque = self._leer_arranque()  # Epoch del arranque del sistema (btime)
+        if max_descriptores is None:
+            max_descriptores = self._max_descriptores_por_defecto()
+        self.max_descriptores = max_descriptores
+
+        self._descriptores = {}  # pid -> (fd_stat, fd_statm)
+        self._previos = {}       # pid -> (inicio, ticks_cpu)
+        self._nombres = {}       # (pid, inicio) -> nombre completo
+        self._instante_previo = None
+
+    @staticmethod
+    def disponible(raiz='/proc'):
+        """Indica si el sistema expone un /proc compatible"""
+        return os.path.exists(os.path.join(raiz, 'self', 'stat'))
+
+    def _leer_arranque(self):
+        try:
+            with open(os.path.join(self.raiz, 'stat'), 'rb') as f:
+                for linea in f:
+                    if linea.startswith(b'btime '):
+                        return float(linea.split()[1])
+        except (OSError, ValueError, IndexError):
+            pass
+        return 0.0
+
+    @staticmethod
+    def _max_descriptores_por_defecto():
+        # Reservar como mucho la mitad del límite blando para la caché (dos por proceso)
+        if resource is None:
+            return 0
+        blando, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if blando == resource.RLIM_INFINITY:
+            blando = 65536
+        return max(0, blando // 2 - 64)
+
+    def recolectar(self):
+        """Devuelve una lista de MuestraProceso con todos los procesos legibles"""
+        ahora = time.monotonic()
+        transcurrido = (ahora - self._instante_previo) if self._instante_previo else 0.0
+        self._instante_previo = ahora
+
+        muestras = []
+        previos = {}
+        vivos = set()
+        for entrada in os.listdir(self.raiz):
+            if not entrada.isdigit():
+                continue
+            pid = int(entrada)
+            datos = self._leer(pid)
+            if datos is None:
+                continue
+            stat, statm = datos
+            vivos.add(pid)
+
+            try:
+                # El nombre va entre paréntesis y puede contener espacios
+                abre = stat.index(b'(')
+                cierra = stat.rindex(b')')
+                campos = stat[cierra + 2:].split()
+                ticks = int(campos[11]) + int(campos[12])  # utime + stime
+                inicio = int(campos[19])                   # starttime
+                rss = int(statm.split()[1]) * self.tamano_pagina
+            except (ValueError, IndexError):
+                continue
+
+            nombre = self._nombre(pid, inicio, stat[abre + 1:cierra])
+
+            cpu = 0.0
+            previo = self._previos.get(pid)
+            if previo is not None and previo[0] == inicio and transcurrido > 0:
+                cpu = round((ticks - previo[1]) / self.hz / transcurrido * 100, 1)
+            previos[pid] = (inicio, ticks)
+
+            muestras.append(MuestraProceso(pid, nombre, cpu, rss, self.arranque + inicio / self.hz))
+
+        self._previos = previos
+        self._limpiar(vivos)
+        return muestras
+
+    def _leer(self, pid):
+        """Lee stat y statm de un proceso reutilizando sus descriptores si es posible"""
+        fds = self._descriptores.get(pid)
+        if fds is not None:
+            try:
+                return os.pread(fds[0], self.TAMANO_LECTURA, 0), os.pread(fds[1], self.TAMANO_LECTURA, 0)
+            except OSError:
+                # El proceso terminó (o el PID se reutilizó): reabrir
+                self._cerrar(pid)
+
+        base = os.path.join(self.raiz, str(pid))
+        fd_stat = fd_statm = None
+        try:
+            fd_stat = os.open(os.path.join(base, 'stat'), os.O_RDONLY)
+            fd_statm = os.open(os.path.join(base, 'statm'), os.O_RDONLY)
+            datos = os.pread(fd_stat, self.TAMANO_LECTURA, 0), os.pread(fd_statm, self.TAMANO_LECTURA, 0)
+        except OSError:
+            for fd in (fd_stat, fd_statm):
+                if fd is not None:
+                    os.close(fd)
+            return None
+
+        if len(self._descriptores) * 2 < self.max_descriptores:
+            self._descriptores[pid] = (fd_stat, fd_statm)
+        else:
+            os.close(fd_stat)
+            os.close(fd_statm)
+        return datos
+
+    def _nombre(self, pid, inicio, comm):
+        """Nombre del proceso; como psutil, usa cmdline si comm está truncado"""
+        nombre = comm.decode('utf-8', 'replace')
+        if len(comm) < 15:
+            return nombre or 'Proceso sin nombre'
+        clave = (pid, inicio)
+        completo = self._nombres.get(clave)
+        if completo is None:
+            completo = nombre
+            try:
+                with open(os.path.join(self.raiz, str(pid), 'cmdline'), 'rb') as f:
+                    argv0 = f.read().split(b'\0', 1)[0]
+                base = os.path.basename(argv0.split(b' ', 1)[0]).decode('utf-8', 'replace')
+                if base.startswith(nombre):
+                    completo = base
+            except OSError:
+                pass
+            self._nombres[clave] = completo
+        return completo
+
+    def _limpiar(self, vivos):
+        """Libera descriptores y cachés de procesos que ya no existen"""
+        for pid in [pid for pid in self._descriptores if pid not in vivos]:
+            self._cerrar(pid)
+        if len(self._nombres) > len(vivos) * 2:
+            self._nombres = {clave: nombre for clave, nombre in self._nombres.items() if clave[0] in vivos}
+
+    def _cerrar(self, pid):
+        for fd in self._descriptores.pop(pid, ()):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def cerrar(self):
+        """Cierra todos los descriptores abiertos"""
+        for pid in list(self._descriptores):
+            self._cerrar(pid)
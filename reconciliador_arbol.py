@@ -0,0 +1,118 @@
+from bisect import bisect_left
+
+
+class ReconciliadorArbol:
+    """Sincroniza un ttk.Treeview con una lista de filas aplicando solo las diferencias.
+
+    Mantiene un mapa PID -> item del Treeview y los últimos valores mostrados.
+    En cada actualización inserta solo los PIDs nuevos, elimina los que ya no
+    existen y llama a ``tree.item(..., values=...)`` únicamente en las filas
+    cuyos valores han cambiado. La selección y la posición del scroll se
+    conservan porque los items existentes no se recrean.
+
+    Con ``ordenar=True`` el Treeview refleja además el orden de las filas
+    recibidas: solo se recolocan las filas que no forman parte de la mayor
+    subsecuencia que ya está en el orden correcto.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.items = {}    # pid -> iid
+        self.valores = {}  # pid -> tupla de valores mostrada
+        self.orden = []    # PIDs en el orden en que están en el Treeview
+
+    def aplicar(self, filas, ordenar=False):
+        """Aplica las filas (tuplas cuyo primer valor es el PID).
+
+        Devuelve una tupla (insertadas, actualizadas, eliminadas).
+        """
+        nuevas = {fila[0]: fila for fila in filas}
+
+        # Eliminar en una sola llamada los procesos que han terminado
+        salientes = [pid for pid in self.items if pid not in nuevas]
+        if salientes:
+            self.tree.delete(*[self.items[pid] for pid in salientes])
+            for pid in salientes:
+                del self.items[pid]
+                del self.valores[pid]
+            self.orden = [pid for pid in self.orden if pid in self.items]
+
+        actualizadas = 0
+        entrantes = []
+        for pid, fila in nuevas.items():
+            iid = self.items.get(pid)
+            if iid is None:
+                entrantes.append(pid)
+            elif self.valores[pid] != fila:
+                self.tree.item(iid, values=fila)
+                self.valores[pid] = fila
+                actualizadas += 1
+
+        if ordenar:
+            self._ordenar(list(nuevas), entrantes, nuevas)
+        else:
+            for pid in entrantes:
+                self.items[pid] = self.tree.insert('', 'end', values=nuevas[pid])
+                self.valores[pid] = nuevas[pid]
+                self.orden.append(pid)
+
+        return len(entrantes), actualizadas, len(salientes)
+
+    def _ordenar(self, deseado, entrantes, nuevas):
+        """Inserta las filas nuevas y recoloca las desordenadas con el mínimo de movimientos"""
+        if self.orden == deseado:
+            return
+        posicion = {pid: i for i, pid in enumerate(deseado)}
+
+        # Filas que se quedan donde están: mayor subsecuencia creciente de posiciones deseadas
+        quietos = self._subsecuencia_creciente([posicion[pid] for pid in self.orden])
+        fijos = {self.orden[i] for i in quietos}
+        mover = [pid for pid in self.orden if pid not in fijos]
+        if mover:
+            self.tree.detach(*[self.items[pid] for pid in mover])
+
+        # Al recorrer en orden deseado, todo lo anterior ya está en su sitio
+        pendientes = set(mover)
+        nuevos = set(entrantes)
+        for indice, pid in enumerate(deseado):
+            if pid in nuevos:
+                self.items[pid] = self.tree.insert('', indice, values=nuevas[pid])
+                self.valores[pid] = nuevas[pid]
+            elif pid in pendientes:
+                self.tree.move(self.items[pid], '', indice)
+        self.orden = deseado
+
+    @staticmethod
+    def _subsecuencia_creciente(valores):
+        """Índices de una subsecuencia creciente de longitud máxima (O(n log n))"""
+        colas = []          # Menor valor final de cada longitud
+        indices_colas = []  # Índice en valores de ese final
+        previo = [-1] * len(valores)
+        for i, valor in enumerate(valores):
+            j = bisect_left(colas, valor)
+            if j == len(colas):
+                colas.append(valor)
+                indices_colas.append(i)
+            else:
+                colas[j] = valor
+                indices_colas[j] = i
+            previo[i] = indices_colas[j - 1] if j else -1
+        resultado = []
+        i = indices_colas[-1] if indices_colas else -1
+        while i != -1:
+            resultado.append(i)
+            i = previo[i]
+        resultado.reverse()
+        return resultado
+
+    def item_de(self, pid):
+        """Devuelve el item del Treeview asociado a un PID, o None"""
+        return self.items.get(pid)
+
+    def limpiar(self):
+        """Elimina todas las filas gestionadas"""
+        if self.items:
+            self.tree.delete(*self.items.values())
+        self.items.clear()
+        self.valores.clear()
+        self.orden = []
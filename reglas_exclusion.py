@@ -0,0 +1,179 @@
+import fnmatch
+import re
+
+import psutil
+
+# Atributos, además del nombre, por los que se puede filtrar un proceso
+CAMPOS = ('nombre', 'usuario', 'cmdline', 'cgroup')
+_PREFIJO_REGEX = 're:'
+_COMODINES = set('*?[')
+# Flags globales, referencias a grupos y grupos con nombre: no se pueden unir en una alternativa
+_NO_COMBINABLE = re.compile(r'\(\?[aiLmsux]+\)|\\[1-9]|\(\?P[<=]|\(\?\(')
+
+
+def leer_atributo(pid, campo):
+    """Usuario, línea de comandos o cgroup de un proceso ('' si no se puede leer)"""
+    try:
+        if campo == 'usuario':
+            return psutil.Process(pid).username()
+        if campo == 'cmdline':
+            return ' '.join(psutil.Process(pid).cmdline())
+        if campo == 'cgroup':
+            with open(f'/proc/{pid}/cgroup', 'r', encoding='utf-8', errors='replace') as f:
+                return f.read().strip()
+    except (psutil.Error, OSError):
+        pass
+    return ''
+
+
+class Patrones:
+    """Valores de un campo compilados: nombres exactos y un único regex.
+
+    Los valores exactos se comparan sin distinguir mayúsculas en un
+    ``frozenset``; los que llevan comodines (``*``, ``?``, ``[``) o el prefijo
+    ``re:`` (se busca en cualquier parte del valor) se unen en una sola
+    expresión regular alternativa, de modo que comprobar un valor cuesta una
+    búsqueda en el conjunto y, como mucho, una evaluación del regex, con
+    independencia del número de reglas.
+
+    Cada ``re:`` se compila antes por separado: los que no son válidos se
+    descartan y quedan en ``invalidos`` como ``(valor, error)`` para que quien
+    los use los registre. Los que llevan flags globales (``(?i)``),
+    referencias a grupos o grupos con nombre no se pueden unir a la
+    alternativa sin cambiar su significado y se prueban aparte, uno a uno.
+    """
+
+    __slots__ = ('exactos', 'regex', 'sueltos', 'invalidos')
+
+    def __init__(self, valores):
+        exactos = set()
+        alternativas = []
+        sueltos = []
+        self.invalidos = []
+        for valor in valores:
+            valor = str(valor)
+            if valor.startswith(_PREFIJO_REGEX):
+                patron = valor[len(_PREFIJO_REGEX):]
+                try:
+                    compilado = re.compile(patron, re.IGNORECASE)
+                except re.error as e:
+                    self.invalidos.append((valor, e))
+                    continue
+                if _NO_COMBINABLE.search(patron):
+                    sueltos.append(compilado)
+                else:
+                    alternativas.append(f"(?:{patron})")
+            elif _COMODINES & set(valor):
+                # fnmatch.translate ya ancla el final; el principio se ancla aquí
+                alternativas.append(f"\\A(?:{fnmatch.translate(valor)})")
+            else:
+                exactos.add(valor.casefold())
+        self.exactos = frozenset(exactos)
+        self.regex = re.compile('|'.join(alternativas), re.IGNORECASE) if alternativas else None
+        self.sueltos = tuple(sueltos)
+
+    def __bool__(self):
+        return bool(self.exactos) or self.regex is not None or bool(self.sueltos)
+
+    def coincide(self, valor):
+        if valor.casefold() in self.exactos:
+            return True
+        if self.regex is not None and self.regex.search(valor) is not None:
+            return True
+        return any(regex.search(valor) is not None for regex in self.sueltos)
+
+
+def agrupar_por_campo(reglas):
+    """Reparte una lista de reglas en valores por campo y reglas combinadas.
+
+    Cada regla es un nombre (cadena) o un dict con uno o varios campos de
+    ``CAMPOS``; p.ej. ``"postgres"``, ``"kworker/*"``, ``{"usuario": "backup"}``
+    o ``{"cgroup": "re:docker"}``. Las reglas de un solo campo se agrupan por
+    campo; un dict con varios campos exige que coincidan todos (Y lógico),
+    p.ej. ``{"usuario": "backup", "cmdline": "re:rsync"}`` excluye solo los
+    rsync del usuario backup, y se devuelve aparte como lista de
+    ``{campo: valor}``. Las claves que no están en ``CAMPOS`` se ignoran.
+    """
+    por_campo = {campo: [] for campo in CAMPOS}
+    combinadas = []
+    for regla in reglas or ():
+        if isinstance(regla, dict):
+            campos = {campo: valor for campo, valor in regla.items() if campo in por_campo}
+            if len(campos) == 1:
+                (campo, valor), = campos.items()
+                por_campo[campo].append(valor)
+            elif campos:
+                combinadas.append(campos)
+        else:
+            por_campo['nombre'].append(regla)
+    return por_campo, combinadas
+
+
+class ReglasExclusion:
+    """Reglas de ``monitoreo.procesos_excluidos`` compiladas una sola vez.
+
+    Un proceso queda excluido si su nombre o alguno de los atributos usados
+    por las reglas de un campo (usuario, cmdline, cgroup) coincide, o si
+    coinciden todos los campos de alguna regla combinada. El resultado se
+    guarda por nombre y, para los atributos, por (pid, nombre): se leen del
+    sistema una vez por proceso. ``podar()`` conserva solo los procesos
+    consultados desde la poda anterior. Los patrones no válidos se descartan
+    (las reglas combinadas que los contienen, enteras) y quedan en
+    ``invalidos``.
+    """
+
+    def __init__(self, reglas):
+        por_campo, combinadas = agrupar_por_campo(reglas)
+        self.nombre = Patrones(por_campo['nombre'])
+        self.atributos = [(campo, Patrones(valores)) for campo, valores in por_campo.items()
+                          if campo != 'nombre' and valores]
+        self.invalidos = self.nombre.invalidos + [invalido for _, patrones in self.atributos
+                                                  for invalido in patrones.invalidos]
+        self.combinadas = []
+        for regla in combinadas:
+            condiciones = [(campo, Patrones([valor])) for campo, valor in regla.items()]
+            invalidos = [invalido for _, patrones in condiciones for invalido in patrones.invalidos]
+            if invalidos:
+                self.invalidos.extend(invalidos)
+            else:
+                # El nombre primero: no hace falta leer nada del sistema
+                condiciones.sort(key=lambda condicion: condicion[0] != 'nombre')
+                self.combinadas.append(condiciones)
+        self._por_nombre = {}
+        self._por_proceso = {}
+        self._consultados = set()
+
+    def excluido(self, pid, nombre):
+        """Indica si el proceso está excluido por alguna regla"""
+        resultado = self._por_nombre.get(nombre)
+        if resultado is None:
+            resultado = self._por_nombre[nombre] = self.nombre.coincide(nombre)
+        if resultado or not (self.atributos or self.combinadas):
+            return resultado
+
+        clave = (pid, nombre)
+        self._consultados.add(clave)
+        resultado = self._por_proceso.get(clave)
+        if resultado is None:
+            resultado = self._por_proceso[clave] = self._coinciden_atributos(pid, nombre)
+        return resultado
+
+    def _coinciden_atributos(self, pid, nombre):
+        valores = {'nombre': nombre}
+
+        def valor(campo):
+            if campo not in valores:
+                valores[campo] = leer_atributo(pid, campo)
+            return valores[campo]
+
+        if any(patrones.coincide(valor(campo)) for campo, patrones in self.atributos):
+            return True
+        return any(all(patrones.coincide(valor(campo)) for campo, patrones in condiciones)
+                   for condiciones in self.combinadas)
+
+    def podar(self):
+        """Olvida los procesos no consultados desde la última poda (terminados o ya sin alerta)"""
+        if len(self._por_proceso) > len(self._consultados):
+            self._por_proceso = {clave: self._por_proceso[clave] for clave in self._consultados
+                                 if clave in self._por_proceso}
+        self._consultados = set()
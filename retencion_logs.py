@@ -0,0 +1,139 @@
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+from parser_logs import marca, marca_de_fecha
+
+# monitor.log.2024-05-01 o monitor.log.2024-05-01.3 (varios segmentos el mismo día)
+_PATRON_SEGMENTO = r'\.(\d{4}-\d{2}-\d{2})(?:\.(\d+))?$'
+
+
+def nombre_segmento(archivo_log, fecha):
+    """Primer nombre libre para un segmento rotado con la fecha indicada"""
+    base = f"{archivo_log}.{fecha.strftime('%Y-%m-%d')}"
+    if not os.path.exists(base):
+        return base
+    n = 1
+    while os.path.exists(f"{base}.{n}"):
+        n += 1
+    return f"{base}.{n}"
+
+
+def listar_segmentos(archivo_log, incluir_activo=True):
+    """Segmentos rotados de un log en orden cronológico, con el archivo activo al final"""
+    archivo_log = Path(archivo_log)
+    patron = re.compile(re.escape(archivo_log.name) + _PATRON_SEGMENTO)
+    segmentos = []
+    if archivo_log.parent.is_dir():
+        for ruta in archivo_log.parent.iterdir():
+            coincidencia = patron.match(ruta.name)
+            if coincidencia:
+                segmentos.append((coincidencia.group(1), int(coincidencia.group(2) or 0), ruta))
+    resultado = [ruta for _, _, ruta in sorted(segmentos)]
+    if incluir_activo and archivo_log.exists():
+        resultado.append(archivo_log)
+    return resultado
+
+
+def podar_segmentos(archivo_log, fecha_limite):
+    """Borra los segmentos rotados cuyo último registro es anterior a fecha_limite.
+
+    No lee ningún archivo: la fecha de modificación de un segmento es la de su
+    último registro, porque tras rotar no se vuelve a escribir en él.
+    Devuelve el número de segmentos eliminados.
+    """
+    limite = fecha_limite.timestamp()
+    eliminados = 0
+    for ruta in listar_segmentos(archivo_log, incluir_activo=False):
+        try:
+            if ruta.stat().st_mtime < limite:
+                ruta.unlink()
+                eliminados += 1
+                if os.path.exists(f"{ruta}.idx"):
+                    os.unlink(f"{ruta}.idx")
+        except OSError:
+            continue
+    return eliminados
+
+
+def _primera_marca(archivo_log):
+    """Marca de tiempo de la primera línea con fecha del archivo, o None"""
+    try:
+        with open(archivo_log, 'rb') as f:
+            for linea in f:
+                marca_linea = marca(linea)
+                if marca_linea is not None:
+                    return marca_linea
+    except OSError:
+        pass
+    return None
+
+
+def recortar_archivo(archivo_log, fecha_limite, manejador=None):
+    """Elimina de un log de un solo archivo las líneas anteriores a fecha_limite.
+
+    Recorre el archivo en streaming: las líneas antiguas del principio se
+    descartan y, a partir de la primera dentro del plazo, el resto se copia
+    en bloque a un temporal del mismo directorio que sustituye al original
+    con un rename atómico. Si se pasa el manejador que escribe en el archivo,
+    se mantiene su lock durante la copia (los registros que lleguen esperan,
+    no se pierden) y se reabre su stream sobre el nuevo archivo.
+    Si la primera línea ya está dentro del plazo no se copia nada (ni se
+    toma el lock). Devuelve el número de líneas descartadas.
+    """
+    limite = marca_de_fecha(fecha_limite)
+    primera = _primera_marca(archivo_log)
+    if primera is None or primera >= limite:
+        return 0
+
+    lock = manejador.lock if manejador is not None else None
+    if lock:
+        lock.acquire()
+    try:
+        if manejador is not None and manejador.stream is not None:
+            manejador.stream.flush()
+
+        descartadas = 0
+        directorio = os.path.dirname(os.path.abspath(archivo_log))
+        with open(archivo_log, 'rb') as origen:
+            fd, temporal = tempfile.mkstemp(prefix='.recorte-', suffix='.tmp', dir=directorio)
+            try:
+                with os.fdopen(fd, 'wb') as destino:
+                    for linea in origen:
+                        marca_linea = marca(linea)
+                        if marca_linea is None:
+                            # Si no se puede parsear, mantener la línea
+                            destino.write(linea)
+                            continue
+                        if marca_linea < limite:
+                            descartadas += 1
+                            continue
+                        # El log es cronológico: el resto se copia sin examinarlo
+                        destino.write(linea)
+                        shutil.copyfileobj(origen, destino, 1024 * 1024)
+                        break
+                    destino.flush()
+                    os.fsync(destino.fileno())
+                if descartadas:
+                    shutil.copymode(archivo_log, temporal)
+                    os.replace(temporal, archivo_log)
+                    # Los offsets del índice ya no son válidos: se reconstruye al leerlo
+                    if os.path.exists(f"{archivo_log}.idx"):
+                        os.unlink(f"{archivo_log}.idx")
+                else:
+                    os.unlink(temporal)
+            except BaseException:
+                if os.path.exists(temporal):
+                    os.unlink(temporal)
+                raise
+
+        if descartadas and manejador is not None and manejador.stream is not None:
+            # El stream abierto apunta al archivo sustituido: reabrir en el siguiente registro
+            manejador.stream.close()
+            manejador.stream = None
+        return descartadas
+    finally:
+        if lock:
+            lock.release()
@@ -51,10 +51,10 @@ def get_pip_executable():
         return os.path.join('.venv', 'Scripts', 'pip.exe')
     return os.path.join('.venv', 'bin', 'pip')
 
-def install_requirements():
-    """Instala las dependencias desde requirements.txt"""
+def install_requirements(headless=False):
+    """Instala las dependencias desde requirements.txt (o requirements-daemon.txt sin interfaz)"""
     pip_exe = get_pip_executable()
-    requirements_file = 'requirements.txt'
+    requirements_file = 'requirements-daemon.txt' if headless else 'requirements.txt'
     
     print("🔧 Actualizando setuptools...")
     subprocess.run([pip_exe, 'install', '--upgrade', 'setuptools'], check=True)
@@ -63,10 +63,16 @@ def install_requirements():
         print(f"❌ Error: {requirements_file} no encontrado")
         sys.exit(1)
     
-    print("📋 Instalando dependencias desde requirements.txt...")
+    print(f"📋 Instalando dependencias desde {requirements_file}...")
     subprocess.run([pip_exe, 'install', '-r', requirements_file], check=True)
     print("✅ Dependencias instaladas correctamente")
 
+def has_graphical_environment():
+    """Indica si hay entorno gráfico disponible"""
+    if platform.system() != "Linux":
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
 def check_system_requirements():
     """Verifica los requisitos del sistema"""
     print("🖥️  Verificando requisitos del sistema...")
@@ -77,26 +83,27 @@ def check_system_requirements():
     
     # Verificar si hay entorno gráfico disponible
     if os_name == "Linux":
-        display = os.environ.get('DISPLAY')
-        wayland = os.environ.get('WAYLAND_DISPLAY')
-        if not display and not wayland:
+        if not has_graphical_environment():
             print("⚠️  No se detectó entorno gráfico (DISPLAY/WAYLAND_DISPLAY)")
-            print("   La aplicación podría no funcionar correctamente")
+            print("   Se usará el modo daemon sin interfaz gráfica")
         else:
             print(f"✅ Entorno gráfico detectado")
     
     return True
 
-def run_main_app():
-    """Ejecuta la aplicación principal"""
+def run_main_app(headless=False):
+    """Ejecuta la aplicación principal (o el daemon sin interfaz gráfica)"""
     python_exe = get_python_executable()
-    main_file = 'monitor_gui.py'
+    main_file = 'monitor_daemon.py' if headless else 'monitor_gui.py'
     
     if not os.path.exists(main_file):
         print(f"❌ Error: {main_file} no encontrado")
         sys.exit(1)
     
-    print("🚀 Iniciando Monitor de Recursos...")
+    if headless:
+        print("🚀 Iniciando Monitor de Recursos en modo daemon...")
+    else:
+        print("🚀 Iniciando Monitor de Recursos...")
     subprocess.run([python_exe, main_file], check=True)
 
 def show_app_info():
@@ -129,6 +136,9 @@ def main():
     if not check_system_requirements():
         sys.exit(1)
     
+    # Modo daemon si se pide explícitamente o no hay entorno gráfico
+    headless = '--headless' in sys.argv or not has_graphical_environment()
+    
     # Gestión del entorno virtual
     if not is_venv_exists():
         create_venv()
@@ -137,10 +147,10 @@ def main():
     
     try:
         # Instalar dependencias en el entorno virtual
-        install_requirements()
+        install_requirements(headless)
         
         # Ejecutar la aplicación
-        run_main_app()
+        run_main_app(headless)
         
     except subprocess.CalledProcessError as e:
         print(f"❌ Error durante la ejecución: {e}")
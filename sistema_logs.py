@@ -1,12 +1,24 @@
+import atexit
+import bisect
 import logging
 import os
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
 import threading
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
-from tkinter import filedialog
+from escritor_logs import ManejadorCola, ManejadorArchivoLotes, EscritorLogsLotes
+from cache_logs import CacheLogs
+from retencion_logs import listar_segmentos, podar_segmentos, recortar_archivo
+import indice_logs
+from parser_logs import fecha_de_marca, marca_de_fecha, marca_y_nivel
+from lector_logs import LectorLogMapeado, LINEAS_PAGINA, MAX_LINEAS_VISOR
+import eventos
+
+# Origen del visor para los registros recientes del cache en memoria
+ORIGEN_MEMORIA = "Recientes (memoria)"
+
+# Tkinter se importa solo en los métodos de interfaz para que el modo daemon
+# (sin entorno gráfico) pueda usar SistemaLogs sin cargarlo
 
 class SistemaLogs:
     def __init__(self, configuracion=None):
@@ -19,6 +31,7 @@ class SistemaLogs:
         self.nivel_log = self.log_config.get('nivel_log', 'INFO')
         self.dias_retencion = self.log_config.get('dias_retencion', 30)
         self.habilitar_logs = self.log_config.get('habilitar_logs', True)
+        self.escritura_asincrona = self.log_config.get('escritura_asincrona', True)
         
         # Crear directorio de logs si no existe
         Path(self.archivo_log).parent.mkdir(parents=True, exist_ok=True)
@@ -26,13 +39,36 @@ class SistemaLogs:
         # Lock para thread safety (debe ir antes de configurar_logger)
         self.lock = threading.Lock()
         
-        # Cache de logs recientes para mostrar en la GUI
-        self.logs_recientes = []
+        # Cache de logs recientes para mostrar en la GUI (buffer circular con vistas por nivel)
         self.max_logs_cache = 1000
+        self.logs_recientes = CacheLogs(self.max_logs_cache)
+        
+        # Escritor en segundo plano (modo asíncrono) y manejador del archivo
+        self.escritor = None
+        self.manejador_archivo = None
+        
+        # Eventos estructurados (alertas, acciones, cambios de configuración) en JSON Lines
+        self.eventos = None
+        if self.habilitar_logs and self.log_config.get('eventos_estructurados', True):
+            try:
+                self.eventos = eventos.RegistroEventos(Path(self.archivo_log).parent / 'eventos', self.dias_retencion)
+            except OSError as e:
+                print(f"Error configurando el registro de eventos: {e}")
         
         # Configurar logger (al final porque usa self.lock)
         self.logger = logging.getLogger('MonitorRecursos')
         self.configurar_logger()
+        atexit.register(self.cerrar)
+    
+    def aplicar_configuracion(self, configuracion):
+        """Aplica una configuración nueva (sección logs) y reconfigura el logger"""
+        self.configuracion = configuracion
+        self.log_config = configuracion.get('logs', {})
+        self.nivel_log = self.log_config.get('nivel_log', 'INFO')
+        self.dias_retencion = self.log_config.get('dias_retencion', 30)
+        self.habilitar_logs = self.log_config.get('habilitar_logs', True)
+        self.escritura_asincrona = self.log_config.get('escritura_asincrona', True)
+        self.configurar_logger()
     
     def configurar_logger(self):
         """Configura el sistema de logging"""
@@ -41,6 +77,7 @@ class SistemaLogs:
             return
         
         # Limpiar handlers existentes
+        self._detener_escritor()
         self.logger.handlers.clear()
         
         # Configurar nivel
@@ -59,11 +96,21 @@ class SistemaLogs:
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         
-        # Handler para archivo
+        handlers = []
+        
+        # Handler para archivo, rotado en segmentos por día (y opcionalmente por tamaño)
+        rotacion = self.log_config.get('rotacion', 'diaria')
         try:
-            file_handler = logging.FileHandler(self.archivo_log, encoding='utf-8')
+            file_handler = ManejadorArchivoLotes(
+                self.archivo_log,
+                rotacion=rotacion if rotacion != 'ninguna' else None,
+                tamano_maximo=int(self.log_config.get('tamano_maximo_mb', 0) * 1024 * 1024),
+                al_rotar=self._podar_segmentos,
+                encoding='utf-8'
+            )
             file_handler.setFormatter(formatter)
-            self.logger.addHandler(file_handler)
+            handlers.append(file_handler)
+            self.manejador_archivo = file_handler
         except Exception as e:
             print(f"Error configurando archivo de log: {e}")
         
@@ -71,11 +118,38 @@ class SistemaLogs:
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
         console_handler.setLevel(logging.ERROR)  # Solo errores en consola
-        self.logger.addHandler(console_handler)
+        handlers.append(console_handler)
+        
+        if self.escritura_asincrona:
+            # Cada log_* solo encola el registro; un hilo lo formatea y escribe por lotes
+            manejador_cola = ManejadorCola(
+                self.log_config.get('tamano_cola', 10000),
+                self.log_config.get('politica_descarte', 'descartar_nuevos'),
+                self.log_config.get('tamano_lote', 500)
+            )
+            self.escritor = EscritorLogsLotes(
+                manejador_cola, handlers, self.log_config.get('intervalo_vaciado', 1.0)
+            )
+            self.escritor.iniciar()
+            self.logger.addHandler(manejador_cola)
+        else:
+            for handler in handlers:
+                self.logger.addHandler(handler)
         
         # Log inicial
         self.log_info("Sistema de logs iniciado")
     
+    def cerrar(self):
+        """Escribe los registros y eventos pendientes y detiene los hilos de escritura"""
+        self._detener_escritor()
+        if self.eventos:
+            self.eventos.cerrar()
+    
+    def _detener_escritor(self):
+        escritor, self.escritor = self.escritor, None
+        if escritor:
+            escritor.detener()
+    
     def log_debug(self, mensaje):
         """Log nivel DEBUG"""
         self._log_con_cache('DEBUG', mensaje)
@@ -107,20 +181,8 @@ class SistemaLogs:
             self.logger.critical(mensaje)
     
     def _log_con_cache(self, nivel, mensaje):
-        """Añade el log al cache para la GUI"""
-        with self.lock:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            entrada_log = {
-                'timestamp': timestamp,
-                'nivel': nivel,
-                'mensaje': mensaje
-            }
-            
-            self.logs_recientes.append(entrada_log)
-            
-            # Limitar tamaño del cache
-            if len(self.logs_recientes) > self.max_logs_cache:
-                self.logs_recientes = self.logs_recientes[-self.max_logs_cache:]
+        """Añade el log al cache para la GUI (O(1), la fecha se formatea al mostrarla)"""
+        self.logs_recientes.agregar(nivel, mensaje)
     
     def log_evento_proceso(self, accion, proceso_nombre, proceso_pid, detalle=""):
         """Log específico para eventos de procesos"""
@@ -128,91 +190,94 @@ class SistemaLogs:
         if detalle:
             mensaje += f" | {detalle}"
         self.log_info(mensaje)
+        if self.eventos:
+            self.eventos.registrar(eventos.ACCION_PROCESO, accion=accion, nombre=proceso_nombre,
+                                   pid=proceso_pid, detalle=detalle)
     
     def log_alerta_proceso(self, proceso_nombre, proceso_pid, cpu_uso, memoria_uso):
         """Log específico para alertas de procesos"""
         mensaje = f"ALERTA: {proceso_nombre} (PID: {proceso_pid}) - CPU: {cpu_uso}%, Memoria: {memoria_uso}MB"
         self.log_warning(mensaje)
+        if self.eventos:
+            self.eventos.registrar(eventos.ALERTA_INICIO, nombre=proceso_nombre, pid=proceso_pid,
+                                   cpu=round(cpu_uso, 1), memoria_mb=memoria_uso)
+    
+    def log_fin_alerta_proceso(self, proceso_nombre, proceso_pid, duracion, cpu_max, memoria_max):
+        """Log para el fin de una alerta (el proceso vuelve a estar dentro de los límites o termina)"""
+        mensaje = (f"Fin de alerta: {proceso_nombre} (PID: {proceso_pid}) tras {duracion:.0f}s - "
+                   f"CPU máx: {cpu_max}%, Memoria máx: {memoria_max}MB")
+        self.log_info(mensaje)
+        if self.eventos:
+            self.eventos.registrar(eventos.ALERTA_FIN, nombre=proceso_nombre, pid=proceso_pid,
+                                   duracion=round(duracion, 1), cpu_max=round(cpu_max, 1), memoria_max_mb=memoria_max)
+    
+    def log_tendencia_memoria(self, proceso_nombre, proceso_pid, memoria_uso, crecimiento_mb_min,
+                              minutos_hasta_limite, limite_mb):
+        """Log para los procesos cuya memoria crece hacia el umbral (posible fuga)"""
+        mensaje = (f"TENDENCIA: {proceso_nombre} (PID: {proceso_pid}) crece {crecimiento_mb_min:.1f}MB/min - "
+                   f"Memoria: {memoria_uso}MB, alcanzará {limite_mb}MB en ~{minutos_hasta_limite:.0f} min")
+        self.log_warning(mensaje)
+        if self.eventos:
+            self.eventos.registrar(eventos.TENDENCIA_MEMORIA, nombre=proceso_nombre, pid=proceso_pid,
+                                   memoria_mb=memoria_uso, crecimiento_mb_min=round(crecimiento_mb_min, 2),
+                                   minutos_hasta_limite=round(minutos_hasta_limite, 1), limite_mb=limite_mb)
     
     def log_cambio_configuracion(self, seccion, clave, valor_anterior, valor_nuevo):
         """Log para cambios de configuración"""
         mensaje = f"Config: {seccion}.{clave} cambiado de '{valor_anterior}' a '{valor_nuevo}'"
         self.log_info(mensaje)
+        if self.eventos:
+            self.eventos.registrar(eventos.CAMBIO_CONFIGURACION, seccion=seccion, clave=clave,
+                                   anterior=valor_anterior, nuevo=valor_nuevo)
+    
+    def _podar_segmentos(self):
+        """Tras cada rotación: borra los segmentos que exceden dias_retencion"""
+        podar_segmentos(self.archivo_log, datetime.now() - timedelta(days=self.dias_retencion))
     
     def limpiar_logs_antiguos(self):
-        """Limpia logs más antiguos que dias_retencion"""
+        """Limpia logs más antiguos que dias_retencion.
+        
+        Los segmentos rotados antiguos se borran enteros; en el archivo activo
+        (o en un log antiguo de un solo archivo) las líneas fuera de plazo se
+        eliminan copiando en streaming a un temporal y renombrándolo.
+        """
         try:
-            if not os.path.exists(self.archivo_log):
-                return
-            
             fecha_limite = datetime.now() - timedelta(days=self.dias_retencion)
-            lineas_validas = []
+            segmentos = podar_segmentos(self.archivo_log, fecha_limite)
             
-            with open(self.archivo_log, 'r', encoding='utf-8') as f:
-                for linea in f:
-                    try:
-                        # Extraer timestamp de la línea
-                        if ' | ' in linea:
-                            timestamp_str = linea.split(' | ')[0]
-                            timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                            
-                            if timestamp >= fecha_limite:
-                                lineas_validas.append(linea)
-                    except:
-                        # Si no se puede parsear, mantener la línea
-                        lineas_validas.append(linea)
+            # Solo se reescribe lo que empieza antes del límite (un log antiguo de un
+            # solo archivo); en el resto basta con leer la primera línea. La fecha del
+            # nombre de un segmento es la de su última escritura, no la de su primer
+            # registro, así que no sirve para saltárselo
+            lineas = 0
+            for ruta in listar_segmentos(self.archivo_log, incluir_activo=False):
+                lineas += recortar_archivo(ruta, fecha_limite)
+            lineas += recortar_archivo(self.archivo_log, fecha_limite, self.manejador_archivo)
             
-            # Reescribir archivo con solo las líneas válidas
-            with open(self.archivo_log, 'w', encoding='utf-8') as f:
-                f.writelines(lineas_validas)
-            
-            self.log_info(f"Limpieza de logs completada. Retenidos {len(lineas_validas)} registros")
+            self.log_info(f"Limpieza de logs completada. Eliminados {segmentos} segmentos y {lineas} registros")
             
         except Exception as e:
             self.log_error(f"Error limpiando logs antiguos: {e}")
     
     def exportar_logs(self, archivo_destino, fecha_inicio=None, fecha_fin=None, nivel_minimo=None):
-        """Exporta logs a un archivo con filtros opcionales"""
+        """Exporta logs a un archivo con filtros opcionales.
+        
+        Recorre los segmentos en orden usando su índice por bloques: los
+        bloques fuera del rango de fechas no se leen y los que caen enteros
+        dentro se copian sin analizar sus líneas.
+        """
         try:
-            logs_filtrados = []
+            desde = marca_de_fecha(fecha_inicio)
+            hasta = marca_de_fecha(fecha_fin)
             
-            with open(self.archivo_log, 'r', encoding='utf-8') as f:
-                for linea in f:
-                    try:
-                        incluir_linea = True
-                        
-                        if ' | ' in linea:
-                            partes = linea.split(' | ')
-                            if len(partes) >= 3:
-                                timestamp_str = partes[0]
-                                nivel = partes[1].strip()
-                                
-                                timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                                
-                                # Filtrar por fecha
-                                if fecha_inicio and timestamp < fecha_inicio:
-                                    incluir_linea = False
-                                if fecha_fin and timestamp > fecha_fin:
-                                    incluir_linea = False
-                                
-                                # Filtrar por nivel
-                                if nivel_minimo:
-                                    niveles_orden = {'DEBUG': 0, 'INFO': 1, 'WARNING': 2, 'ERROR': 3, 'CRITICAL': 4}
-                                    if niveles_orden.get(nivel, 0) < niveles_orden.get(nivel_minimo, 0):
-                                        incluir_linea = False
-                        
-                        if incluir_linea:
-                            logs_filtrados.append(linea)
-                            
-                    except:
-                        # Si no se puede parsear, incluir la línea
-                        logs_filtrados.append(linea)
+            # Escribir lo pendiente para que la exportación incluya los últimos registros
+            self._vaciar_archivo()
+            exportados = indice_logs.exportar(
+                listar_segmentos(self.archivo_log), archivo_destino,
+                desde, hasta, nivel_minimo, ruta_activa=self.archivo_log
+            )
             
-            # Escribir logs filtrados
-            with open(archivo_destino, 'w', encoding='utf-8') as f:
-                f.writelines(logs_filtrados)
-            
-            self.log_info(f"Logs exportados a: {archivo_destino} ({len(logs_filtrados)} registros)")
+            self.log_info(f"Logs exportados a: {archivo_destino} ({exportados} registros)")
             return True
             
         except Exception as e:
@@ -220,52 +285,35 @@ class SistemaLogs:
             return False
     
     def obtener_estadisticas_logs(self):
-        """Obtiene estadísticas de los logs"""
+        """Obtiene estadísticas de los logs a partir del índice, sin leer el log completo"""
         try:
-            stats = {
-                'total_registros': 0,
-                'por_nivel': {'DEBUG': 0, 'INFO': 0, 'WARNING': 0, 'ERROR': 0, 'CRITICAL': 0},
-                'fecha_primer_log': None,
-                'fecha_ultimo_log': None,
-                'tamaño_archivo': 0
-            }
+            self._vaciar_archivo()
+            indice = indice_logs.estadisticas(listar_segmentos(self.archivo_log), ruta_activa=self.archivo_log)
             
-            if not os.path.exists(self.archivo_log):
-                return stats
-            
-            stats['tamaño_archivo'] = os.path.getsize(self.archivo_log)
-            
-            with open(self.archivo_log, 'r', encoding='utf-8') as f:
-                for linea in f:
-                    stats['total_registros'] += 1
-                    
-                    try:
-                        if ' | ' in linea:
-                            partes = linea.split(' | ')
-                            if len(partes) >= 3:
-                                timestamp_str = partes[0]
-                                nivel = partes[1].strip()
-                                
-                                timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                                
-                                if stats['fecha_primer_log'] is None or timestamp < stats['fecha_primer_log']:
-                                    stats['fecha_primer_log'] = timestamp
-                                if stats['fecha_ultimo_log'] is None or timestamp > stats['fecha_ultimo_log']:
-                                    stats['fecha_ultimo_log'] = timestamp
-                                
-                                if nivel in stats['por_nivel']:
-                                    stats['por_nivel'][nivel] += 1
-                    except:
-                        continue
-            
-            return stats
+            return {
+                'total_registros': indice['total_registros'],
+                'por_nivel': indice['por_nivel'],
+                'fecha_primer_log': fecha_de_marca(indice['primero']),
+                'fecha_ultimo_log': fecha_de_marca(indice['ultimo']),
+                'tamaño_archivo': indice['tamaño_archivo']
+            }
             
         except Exception as e:
             self.log_error(f"Error obteniendo estadísticas: {e}")
             return {}
     
+    def _vaciar_archivo(self):
+        """Escribe los registros aún en la cola asíncrona y vuelca el stream del archivo de log"""
+        if self.escritor is not None:
+            self.escritor.vaciar()
+        if self.manejador_archivo is not None:
+            self.manejador_archivo.flush()
+    
     def crear_ventana_logs(self, parent):
         """Crea ventana para visualizar logs"""
+        import tkinter as tk
+        from tkinter import ttk, scrolledtext
+        
         ventana_logs = tk.Toplevel(parent)
         ventana_logs.title("Visor de Logs - Monitor de Recursos")
         ventana_logs.geometry("900x600")
@@ -279,6 +327,20 @@ class SistemaLogs:
         frame_controles = ttk.Frame(frame_principal)
         frame_controles.pack(fill=tk.X, pady=(0, 10))
         
+        # Origen: cache en memoria o un segmento del log en disco
+        ttk.Label(frame_controles, text="Origen:").pack(side=tk.LEFT, padx=(0, 5))
+        origenes = self._origenes_log()
+        origen_var = tk.StringVar(value=ORIGEN_MEMORIA)
+        
+        def refrescar_origenes():
+            origenes.clear()
+            origenes.update(self._origenes_log())
+            combo_origen['values'] = list(origenes)
+        
+        combo_origen = ttk.Combobox(frame_controles, textvariable=origen_var, values=list(origenes),
+                                    postcommand=refrescar_origenes, state="readonly", width=22)
+        combo_origen.pack(side=tk.LEFT, padx=(0, 10))
+        
         # Filtros
         ttk.Label(frame_controles, text="Filtrar por nivel:").pack(side=tk.LEFT, padx=(0, 5))
         
@@ -288,12 +350,24 @@ class SistemaLogs:
                                   state="readonly", width=10)
         combo_nivel.pack(side=tk.LEFT, padx=(0, 10))
         
+        # Estado del visor: último registro mostrado y filtro con el que se pintó;
+        # en modo archivo, el lector y los offsets de las líneas mostradas
+        vista = {'ultimo_seq': 0, 'filtro': None, 'lineas': 0, 'lector': None}
+        
+        combo_origen.bind("<<ComboboxSelected>>",
+                          lambda e: self._cambiar_origen_logs(text_logs, origenes.get(origen_var.get()),
+                                                              nivel_var.get(), vista))
+        
+        # Al cambiar el filtro se repinta solo el subconjunto del nivel elegido
+        combo_nivel.bind("<<ComboboxSelected>>",
+                         lambda e: self._actualizar_vista_logs(text_logs, nivel_var.get(), vista))
+        
         # Botones
         ttk.Button(frame_controles, text="Actualizar", 
-                  command=lambda: self._actualizar_vista_logs(text_logs, nivel_var.get())).pack(side=tk.LEFT, padx=(0, 5))
+                  command=lambda: self._actualizar_vista_logs(text_logs, nivel_var.get(), vista)).pack(side=tk.LEFT, padx=(0, 5))
         
         ttk.Button(frame_controles, text="Limpiar Cache", 
-                  command=lambda: self._limpiar_cache_logs(text_logs)).pack(side=tk.LEFT, padx=(0, 5))
+                  command=lambda: self._limpiar_cache_logs(text_logs, vista)).pack(side=tk.LEFT, padx=(0, 5))
         
         ttk.Button(frame_controles, text="Exportar...", 
                   command=lambda: self._exportar_logs_gui(parent)).pack(side=tk.LEFT, padx=(0, 5))
@@ -309,63 +383,271 @@ class SistemaLogs:
                                             font=("Consolas", 9))
         text_logs.pack(fill=tk.BOTH, expand=True)
         
+        # Búsqueda: en el widget con el cache, directamente en el archivo mapeado en modo archivo
+        frame_buscar = ttk.Frame(frame_principal)
+        frame_buscar.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(frame_buscar, text="Buscar:").pack(side=tk.LEFT, padx=(0, 5))
+        buscar_var = tk.StringVar()
+        entrada_buscar = ttk.Entry(frame_buscar, textvariable=buscar_var, width=40)
+        entrada_buscar.pack(side=tk.LEFT, padx=(0, 5))
+        entrada_buscar.bind("<Return>", lambda e: self._buscar_logs(text_logs, buscar_var.get(), True, vista))
+        ttk.Button(frame_buscar, text="◀ Anterior",
+                  command=lambda: self._buscar_logs(text_logs, buscar_var.get(), True, vista)).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(frame_buscar, text="Siguiente ▶",
+                  command=lambda: self._buscar_logs(text_logs, buscar_var.get(), False, vista)).pack(side=tk.LEFT)
+        
+        # En modo archivo, llegar arriba o abajo con el scroll carga la página contigua
+        def cargar_contigua(anterior):
+            try:
+                if anterior:
+                    self._pagina_anterior_archivo(text_logs, vista)
+                else:
+                    self._pagina_siguiente_archivo(text_logs, vista)
+            finally:
+                vista['cargando'] = False
+        
+        def al_desplazar(primero, ultimo):
+            text_logs.vbar.set(primero, ultimo)
+            lector = vista['lector']
+            if lector is None or vista.get('cargando'):
+                return
+            if float(primero) <= 0.0 and vista['inicio'] > 0:
+                vista['cargando'] = True
+                ventana_logs.after_idle(cargar_contigua, True)
+            elif float(ultimo) >= 1.0 and vista['fin'] < lector.tamano():
+                vista['cargando'] = True
+                ventana_logs.after_idle(cargar_contigua, False)
+        
+        text_logs.configure(yscrollcommand=al_desplazar)
+        
+        # Tags de color por nivel (se configuran una sola vez)
+        text_logs.tag_config("ERROR", foreground="red")
+        text_logs.tag_config("CRITICAL", foreground="darkred", background="lightyellow")
+        text_logs.tag_config("WARNING", foreground="orange")
+        text_logs.tag_config("DEBUG", foreground="gray")
+        text_logs.tag_config("coincidencia", background="#fff59d")
+        
         # Cargar logs iniciales
-        self._actualizar_vista_logs(text_logs, "TODOS")
+        self._actualizar_vista_logs(text_logs, "TODOS", vista)
         
-        # Auto-actualización cada 5 segundos
+        # Auto-actualización cada 5 segundos: solo añade los registros nuevos
         def auto_actualizar():
-            self._actualizar_vista_logs(text_logs, nivel_var.get())
+            if not ventana_logs.winfo_exists():
+                return
+            self._actualizar_vista_logs(text_logs, nivel_var.get(), vista)
             ventana_logs.after(5000, auto_actualizar)
         
         ventana_logs.after(5000, auto_actualizar)
     
-    def _actualizar_vista_logs(self, text_widget, filtro_nivel):
-        """Actualiza la vista de logs en el widget de texto"""
-        with self.lock:
-            logs_a_mostrar = self.logs_recientes.copy()
+    def _actualizar_vista_logs(self, text_widget, filtro_nivel, vista):
+        """Añade al widget los registros posteriores al último mostrado.
         
-        # Filtrar por nivel si no es "TODOS"
-        if filtro_nivel != "TODOS":
-            logs_a_mostrar = [log for log in logs_a_mostrar if log['nivel'] == filtro_nivel]
+        Si el filtro cambió desde el último refresco se repinta el subconjunto
+        del nuevo nivel; si no, solo se insertan los registros nuevos.
+        """
+        import tkinter as tk
         
-        # Limpiar y actualizar
-        text_widget.delete(1.0, tk.END)
+        if vista['lector'] is not None:
+            self._actualizar_vista_archivo(text_widget, filtro_nivel, vista)
+            return
         
-        for log in logs_a_mostrar:
-            linea = f"{log['timestamp']} | {log['nivel']:8s} | {log['mensaje']}\n"
-            
-            # Colorear según nivel
-            text_widget.insert(tk.END, linea)
-            
-            # Configurar tags de color por nivel
-            start_line = text_widget.index("end-2c linestart")
-            end_line = text_widget.index("end-1c")
-            
-            if log['nivel'] == 'ERROR':
-                text_widget.tag_add("error", start_line, end_line)
-                text_widget.tag_config("error", foreground="red")
-            elif log['nivel'] == 'CRITICAL':
-                text_widget.tag_add("critical", start_line, end_line)
-                text_widget.tag_config("critical", foreground="darkred", background="lightyellow")
-            elif log['nivel'] == 'WARNING':
-                text_widget.tag_add("warning", start_line, end_line)
-                text_widget.tag_config("warning", foreground="orange")
-            elif log['nivel'] == 'DEBUG':
-                text_widget.tag_add("debug", start_line, end_line)
-                text_widget.tag_config("debug", foreground="gray")
-        
-        # Scroll al final
-        text_widget.see(tk.END)
-    
-    def _limpiar_cache_logs(self, text_widget):
+        if vista['filtro'] != filtro_nivel:
+            text_widget.delete(1.0, tk.END)
+            vista.update(ultimo_seq=0, filtro=filtro_nivel, lineas=0)
+        
+        # Vista del nivel (o de todos) limitada a lo nuevo desde el último refresco
+        nuevos = self.logs_recientes.entradas(None if filtro_nivel == "TODOS" else filtro_nivel,
+                                              vista['ultimo_seq'])
+        if not nuevos:
+            return
+        vista['ultimo_seq'] = nuevos[-1].seq
+        
+        # Seguir el final solo si el usuario no se ha desplazado hacia arriba
+        al_final = text_widget.yview()[1] >= 1.0
+        
+        # Una sola inserción con pares texto/tag
+        argumentos = []
+        for log in nuevos:
+            argumentos.append(f"{log.timestamp} | {log.nivel:8s} | {log.mensaje}\n")
+            argumentos.append(log.nivel)
+        text_widget.insert(tk.END, *argumentos)
+        
+        # Mantener en el widget como mucho tantas líneas como el cache
+        vista['lineas'] += len(nuevos)
+        exceso = vista['lineas'] - self.max_logs_cache
+        if exceso > 0:
+            text_widget.delete(1.0, f"{exceso + 1}.0")
+            vista['lineas'] -= exceso
+        
+        if al_final:
+            text_widget.see(tk.END)
+    
+    def _limpiar_cache_logs(self, text_widget, vista):
         """Limpia el cache de logs en memoria"""
-        with self.lock:
-            self.logs_recientes.clear()
-        text_widget.delete(1.0, tk.END)
+        import tkinter as tk
+        
+        self.logs_recientes.clear()
+        if vista['lector'] is None:
+            text_widget.delete(1.0, tk.END)
+            vista.update(ultimo_seq=self.logs_recientes.ultimo_seq, lineas=0)
         self.log_info("Cache de logs limpiado")
     
+    def _origenes_log(self):
+        """Orígenes del visor: el cache en memoria y cada segmento en disco, del más reciente al más antiguo"""
+        origenes = {ORIGEN_MEMORIA: None}
+        for ruta in reversed(listar_segmentos(self.archivo_log)):
+            origenes[ruta.name] = ruta
+        return origenes
+    
+    def _cambiar_origen_logs(self, text_widget, ruta, filtro_nivel, vista):
+        """Pasa el visor al cache en memoria (ruta None) o a un archivo de log en disco"""
+        vista.update(lector=LectorLogMapeado(ruta) if ruta else None, filtro=None)
+        self._actualizar_vista_logs(text_widget, filtro_nivel, vista)
+    
+    @staticmethod
+    def _filtro_lineas(filtro_nivel):
+        if filtro_nivel == "TODOS":
+            return None
+        return lambda linea: marca_y_nivel(linea)[1] == filtro_nivel
+    
+    @staticmethod
+    def _argumentos_lineas(lineas):
+        """Pares texto/tag para insertar de una vez líneas leídas del archivo"""
+        argumentos = []
+        for _, linea in lineas:
+            argumentos.append(linea.decode('utf-8', 'replace').rstrip('\r\n') + "\n")
+            argumentos.append(marca_y_nivel(linea)[1] or "")
+        return argumentos
+    
+    def _actualizar_vista_archivo(self, text_widget, filtro_nivel, vista):
+        """Modo archivo: carga el final del log al abrirlo y, después, solo lo nuevo.
+        
+        Al cambiar el filtro o si el archivo se ha recortado o rotado se vuelve
+        al final; en los refrescos se añaden las líneas escritas desde el último
+        solo si el usuario está abajo del todo.
+        """
+        import tkinter as tk
+        
+        lector = vista['lector']
+        if lector.ruta == str(self.archivo_log):
+            self._vaciar_archivo()
+        
+        if vista['filtro'] != filtro_nivel or vista['fin'] > lector.tamano():
+            inicio, fin, lineas = lector.anteriores(None, LINEAS_PAGINA, self._filtro_lineas(filtro_nivel))
+            text_widget.delete(1.0, tk.END)
+            if lineas:
+                text_widget.insert(tk.END, *self._argumentos_lineas(lineas))
+            vista.update(filtro=filtro_nivel, inicio=inicio, fin=fin,
+                         offsets=[offset for offset, _ in lineas], coincidencia=None)
+            text_widget.see(tk.END)
+        elif text_widget.yview()[1] >= 1.0:
+            self._pagina_siguiente_archivo(text_widget, vista)
+    
+    def _pagina_anterior_archivo(self, text_widget, vista):
+        """Añade arriba la página anterior del archivo, manteniendo a la vista la línea actual"""
+        import tkinter as tk
+        
+        if vista['lector'] is None or vista['inicio'] <= 0:
+            return
+        inicio, _, lineas = vista['lector'].anteriores(vista['inicio'], LINEAS_PAGINA,
+                                                      self._filtro_lineas(vista['filtro']))
+        vista['inicio'] = inicio
+        if not lineas:
+            return
+        text_widget.insert(1.0, *self._argumentos_lineas(lineas))
+        offsets = vista['offsets']
+        offsets[:0] = [offset for offset, _ in lineas]
+        
+        # Quitar del final lo que exceda del máximo del widget
+        exceso = len(offsets) - MAX_LINEAS_VISOR
+        if exceso > 0:
+            text_widget.delete(f"{len(offsets) - exceso + 1}.0", tk.END)
+            vista['fin'] = offsets[-exceso]
+            del offsets[-exceso:]
+        text_widget.yview(f"{len(lineas) + 1}.0")
+    
+    def _pagina_siguiente_archivo(self, text_widget, vista):
+        """Añade abajo las líneas siguientes del archivo (las nuevas si se está en el final)"""
+        import tkinter as tk
+        
+        if vista['lector'] is None:
+            return
+        fin, lineas = vista['lector'].siguientes(vista['fin'], LINEAS_PAGINA,
+                                                 self._filtro_lineas(vista['filtro']))
+        vista['fin'] = fin
+        if not lineas:
+            return
+        al_final = text_widget.yview()[1] >= 1.0
+        text_widget.insert(tk.END, *self._argumentos_lineas(lineas))
+        offsets = vista['offsets']
+        offsets.extend(offset for offset, _ in lineas)
+        
+        # Quitar del principio lo que exceda del máximo del widget
+        exceso = len(offsets) - MAX_LINEAS_VISOR
+        if exceso > 0:
+            text_widget.delete(1.0, f"{exceso + 1}.0")
+            vista['inicio'] = offsets[exceso]
+            del offsets[:exceso]
+        if al_final:
+            text_widget.see(tk.END)
+    
+    def _buscar_logs(self, text_widget, texto, hacia_atras, vista):
+        """Busca texto hacia atrás o hacia delante y resalta la línea encontrada.
+        
+        Con el cache se busca en el widget. En modo archivo la búsqueda se hace
+        sobre el archivo mapeado a partir de la última coincidencia y, si cae
+        fuera de lo cargado, se carga una página alrededor de ella.
+        """
+        import tkinter as tk
+        from tkinter import messagebox
+        
+        text_widget.tag_remove("coincidencia", 1.0, tk.END)
+        if not texto:
+            return
+        
+        lector = vista['lector']
+        if lector is None:
+            posicion = text_widget.search(texto, tk.INSERT, backwards=hacia_atras)
+            if not posicion:
+                messagebox.showinfo("Buscar", f"No se encontró '{texto}'", parent=text_widget)
+                return
+            text_widget.tag_add("coincidencia", f"{posicion} linestart", f"{posicion} lineend")
+            text_widget.mark_set(tk.INSERT, posicion if hacia_atras else f"{posicion} + {len(texto)} chars")
+            text_widget.see(posicion)
+            return
+        
+        ultima = vista.get('coincidencia')
+        if hacia_atras:
+            desde = ultima[0] if ultima else vista['fin']
+        else:
+            desde = ultima[1] if ultima else vista['inicio']
+        offset = lector.buscar(texto, desde, hacia_atras)
+        if offset is None:
+            messagebox.showinfo("Buscar", f"No se encontró '{texto}'", parent=text_widget)
+            return
+        linea = lector.linea(offset)
+        vista['coincidencia'] = (offset, offset + len(linea))
+        
+        offsets = vista['offsets']
+        indice = bisect.bisect_left(offsets, offset)
+        if indice == len(offsets) or offsets[indice] != offset:
+            # Fuera de lo cargado (o filtrada por nivel): página alrededor de la coincidencia
+            aceptar = self._filtro_lineas(vista['filtro'])
+            inicio, _, antes = lector.anteriores(offset, LINEAS_PAGINA // 2, aceptar)
+            fin, despues = lector.siguientes(offset + len(linea), LINEAS_PAGINA // 2, aceptar)
+            lineas = antes + [(offset, linea)] + despues
+            text_widget.delete(1.0, tk.END)
+            text_widget.insert(tk.END, *self._argumentos_lineas(lineas))
+            vista.update(inicio=inicio, fin=fin, offsets=[o for o, _ in lineas])
+            indice = len(antes)
+        
+        text_widget.tag_add("coincidencia", f"{indice + 1}.0", f"{indice + 1}.end")
+        text_widget.see(f"{indice + 1}.0")
+    
     def _exportar_logs_gui(self, parent):
         """Interfaz gráfica para exportar logs"""
+        from tkinter import filedialog, messagebox
+        
         archivo = filedialog.asksaveasfilename(
             parent=parent,
             title="Exportar Logs",
@@ -381,6 +663,9 @@ class SistemaLogs:
     
     def _mostrar_estadisticas(self, parent):
         """Muestra ventana con estadísticas de logs"""
+        import tkinter as tk
+        from tkinter import ttk
+        
         stats = self.obtener_estadisticas_logs()
         
         ventana_stats = tk.Toplevel(parent)
@@ -0,0 +1,201 @@
+# numpy es opcional (sin él no hay alertas de tendencia) y se importa la primera vez que
+# se usa, para que el daemon no lo cargue si estas alertas están desactivadas
+np = None
+
+MB = 1024 * 1024
+
+
+def disponible():
+    """Importa numpy si aún no se ha hecho; False si no está instalado"""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+
+class TendenciasMemoria:
+    """Ritmo de crecimiento del RSS de cada proceso por regresión lineal.
+
+    Para cada proceso se mantienen las sumas de la regresión por mínimos
+    cuadrados (n, Σt, Σm, Σt², Σtm) sobre las últimas ``ventana`` muestras;
+    cada ciclo añade la muestra nueva y resta la que sale de la ventana, así
+    que la pendiente se actualiza en O(1) por muestra. Las sumas de todos los
+    procesos son arrays de numpy indexados por *slot* (con reciclado de slots
+    como en ``BufferMetricas``) y cada ciclo se actualiza con operaciones
+    vectorizadas, sin bucles por proceso salvo para traducir PIDs a slots.
+
+    Los tiempos se miden respecto al ciclo actual (el origen se desplaza en
+    cada ciclo) para que Σt² no pierda precisión, y cada vuelta completa de la
+    ventana las sumas se recalculan desde las muestras guardadas para que los
+    errores de redondeo de restar no se acumulen. Un PID reutilizado (otro
+    instante de creación) empieza de cero.
+    """
+
+    def __init__(self, ventana=100, slots_iniciales=256):
+        if not disponible():
+            raise ImportError("TendenciasMemoria requiere numpy")
+        self.ventana = ventana
+        self.slots = 0
+        self.memoria = np.empty((0, ventana), np.float32)  # MB de cada slot por columna
+        self.tiempos = np.full(ventana, np.nan)  # Marca de tiempo de cada columna
+        self.n = np.zeros(0, np.int64)
+        self.st = np.zeros(0)
+        self.sm = np.zeros(0)
+        self.stt = np.zeros(0)
+        self.stm = np.zeros(0)
+        self.creacion = np.zeros(0)
+        self.pid_slot = np.zeros(0, np.int64)  # PID que ocupa cada slot (-1 si está libre)
+        self.slot_de = {}  # pid -> slot
+        self.libres = []
+        self.ciclo = -1
+        self.origen = None  # Marca de tiempo del último ciclo (t = 0 en las sumas)
+        self._activos = np.zeros(0, np.intp)  # Slots presentes en el último ciclo
+        self._crecer(slots_iniciales)
+
+    def __len__(self):
+        return len(self.slot_de)
+
+    def registrar(self, instantanea):
+        """Añade la muestra de memoria de cada proceso de la instantánea"""
+        procesos = instantanea.procesos
+        ahora = instantanea.timestamp
+        self.ciclo += 1
+        columna = self.ciclo % self.ventana
+
+        # Liberar primero los slots de los procesos que ya no existen, para que los
+        # nuevos de este ciclo los reutilicen
+        for pid in self.slot_de.keys() - {m.pid for m in procesos}:
+            slot = self.slot_de.pop(pid)
+            self.pid_slot[slot] = -1
+            self._vaciar(slot)
+            self.libres.append(slot)
+
+        slots = [self.slot_de.get(m.pid, -1) for m in procesos]
+        for i in [i for i, slot in enumerate(slots) if slot < 0]:
+            slots[i] = self._asignar(procesos[i].pid)
+        idx = np.array(slots, np.intp)
+        memoria = np.fromiter((m.memoria for m in procesos), np.float64, len(procesos)) / MB
+        creacion = np.fromiter((m.creacion for m in procesos), np.float64, len(procesos))
+
+        # Un PID con otro instante de creación es otro proceso
+        self._vaciar(idx[self.creacion[idx] != creacion])
+        self.creacion[idx] = creacion
+
+        # Llevar el origen de tiempos al ciclo actual: t' = t - d
+        if self.origen is not None:
+            d = ahora - self.origen
+            self.stt -= 2 * d * self.st - self.n * d * d
+            self.stm -= d * self.sm
+            self.st -= self.n * d
+        self.origen = ahora
+
+        # Quitar la muestra que sale de la ventana (la de esta columna)
+        llenos = idx[self.n[idx] >= self.ventana]
+        if len(llenos):
+            t_viejo = self.tiempos[columna] - ahora
+            m_viejo = self.memoria[llenos, columna].astype(np.float64)
+            self.n[llenos] -= 1
+            self.st[llenos] -= t_viejo
+            self.sm[llenos] -= m_viejo
+            self.stt[llenos] -= t_viejo * t_viejo
+            self.stm[llenos] -= t_viejo * m_viejo
+
+        # Añadir la muestra nueva (t = 0, así que Σt, Σt² y Σtm no cambian)
+        self.memoria[idx, columna] = memoria
+        self.tiempos[columna] = ahora
+        self.n[idx] += 1
+        self.sm[idx] += memoria
+        self._activos = idx
+
+        if columna == self.ventana - 1:
+            self._recalcular(idx, columna)
+
+    def proyecciones(self, limite_minimo_mb, limite_maximo_mb, horizonte, muestras_minimas):
+        """Procesos que crecen y podrían alcanzar su límite antes de horizonte segundos.
+
+        Como cada proceso puede tener su propio límite, se filtra con el rango
+        de límites posibles: la memoria estimada ahora está por debajo de
+        ``limite_maximo_mb`` y la proyectada llega al menos a ``limite_minimo_mb``.
+        Solo considera los procesos con al menos ``muestras_minimas`` muestras.
+        Devuelve ``[(pid, memoria_mb, pendiente_mb_s), ...]`` con la memoria
+        estimada ahora por la recta de regresión; el límite exacto de cada
+        proceso lo comprueba quien llama.
+        """
+        idx = self._activos
+        if not len(idx):
+            return []
+        n = self.n[idx]
+        st = self.st[idx]
+        sm = self.sm[idx]
+        denominador = n * self.stt[idx] - st * st
+        validos = (n >= max(2, muestras_minimas)) & (denominador > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pendiente = np.where(validos, (n * self.stm[idx] - st * sm) / denominador, 0.0)
+            actual = np.where(validos, (sm - pendiente * st) / n, 0.0)
+        candidatos = np.flatnonzero((pendiente > 0) & (actual < limite_maximo_mb)
+                                    & (actual + pendiente * horizonte >= limite_minimo_mb))
+        return [(int(self.pid_slot[idx[i]]), float(actual[i]), float(pendiente[i]))
+                for i in candidatos.tolist()]
+
+    def pendiente(self, pid):
+        """Crecimiento estimado (MB/s) de un proceso, o None si no hay muestras suficientes"""
+        slot = self.slot_de.get(pid)
+        if slot is None:
+            return None
+        n = self.n[slot]
+        denominador = n * self.stt[slot] - self.st[slot] ** 2
+        if n < 2 or denominador <= 0:
+            return None
+        return float((n * self.stm[slot] - self.st[slot] * self.sm[slot]) / denominador)
+
+    def memoria_utilizada(self):
+        """Bytes ocupados por los arrays"""
+        arrays = (self.memoria, self.tiempos, self.n, self.st, self.sm, self.stt, self.stm,
+                  self.creacion, self.pid_slot)
+        return sum(a.nbytes for a in arrays)
+
+    def _recalcular(self, idx, columna):
+        """Rehace las sumas desde las muestras guardadas para descartar el error acumulado"""
+        edad = (columna - np.arange(self.ventana)) % self.ventana  # 0 = columna actual
+        t = self.tiempos - self.origen
+        validas = edad[None, :] < self.n[idx, None]
+        m = np.where(validas, self.memoria[idx].astype(np.float64), 0.0)
+        t = np.where(validas, t[None, :], 0.0)
+        self.st[idx] = t.sum(axis=1)
+        self.sm[idx] = m.sum(axis=1)
+        self.stt[idx] = (t * t).sum(axis=1)
+        self.stm[idx] = (t * m).sum(axis=1)
+
+    def _vaciar(self, slots):
+        self.n[slots] = 0
+        self.st[slots] = 0.0
+        self.sm[slots] = 0.0
+        self.stt[slots] = 0.0
+        self.stm[slots] = 0.0
+
+    def _asignar(self, pid):
+        if not self.libres:
+            self._crecer(max(1, self.slots))
+        slot = self.libres.pop()
+        self.slot_de[pid] = slot
+        self.pid_slot[slot] = pid
+        self._vaciar(slot)
+        return slot
+
+    def _crecer(self, nuevos):
+        """Añade slots libres duplicando (o ampliando) los arrays"""
+        self.memoria = np.vstack([self.memoria, np.zeros((nuevos, self.ventana), np.float32)])
+        self.n = np.concatenate([self.n, np.zeros(nuevos, np.int64)])
+        self.st = np.concatenate([self.st, np.zeros(nuevos)])
+        self.sm = np.concatenate([self.sm, np.zeros(nuevos)])
+        self.stt = np.concatenate([self.stt, np.zeros(nuevos)])
+        self.stm = np.concatenate([self.stm, np.zeros(nuevos)])
+        self.creacion = np.concatenate([self.creacion, np.zeros(nuevos)])
+        self.pid_slot = np.concatenate([self.pid_slot, np.full(nuevos, -1, np.int64)])
+        # Los nuevos se añaden al final de la pila para asignar primero los más bajos
+        self.libres.extend(range(self.slots + nuevos - 1, self.slots - 1, -1))
+        self.slots += nuevos
@@ -0,0 +1,45 @@
+from buffer_metricas import BufferMetricas
+from muestreo_procesos import InstantaneaProcesos, MuestraProceso
+
+MB = 1024 * 1024
+
+
+def instantanea(ciclo, pids):
+    procesos = tuple(MuestraProceso(pid, f"p{pid}", 1.0, pid * MB) for pid in pids)
+    return InstantaneaProcesos(ciclo, 1000.0 + ciclo, procesos, 0.0)
+
+
+def test_memoria_utilizada_por_procesos_y_muestras():
+    procesos, capacidad = 100, 60
+    buffer = BufferMetricas(capacidad, slots_iniciales=procesos)
+    for ciclo in range(capacidad * 2):
+        buffer.registrar(instantanea(ciclo, range(1, procesos + 1)))
+
+    # 8 bytes por muestra y slot, 16 por slot de índices y 8 por columna de marcas de tiempo
+    assert buffer.memoria_utilizada() == procesos * capacidad * 8 + procesos * 16 + capacidad * 8
+    assert len(buffer) == procesos
+    assert len(buffer.serie(1)) == capacidad
+
+
+def test_slots_de_procesos_terminados_se_reutilizan():
+    buffer = BufferMetricas(10, slots_iniciales=4)
+    for ciclo in range(3):
+        buffer.registrar(instantanea(ciclo, [1, 2, 3, 4]))
+    memoria = buffer.memoria_utilizada()
+
+    # Terminan todos y aparecen otros tantos: no se crece, se reciclan los slots
+    for ciclo in range(3, 6):
+        buffer.registrar(instantanea(ciclo, [5, 6, 7, 8]))
+    assert buffer.slots == 4
+    assert buffer.memoria_utilizada() == memoria
+    assert set(buffer.slot_de) == {5, 6, 7, 8}
+
+    # El nuevo ocupante no hereda las muestras del anterior
+    serie = buffer.serie(5)
+    assert len(serie) == 3
+    assert all(memoria_mb == 5 for _, _, memoria_mb in serie)
+
+    # Si hay más procesos que slots, los arrays se duplican
+    buffer.registrar(instantanea(6, range(5, 14)))
+    assert buffer.slots == 16
+    assert len(buffer) == 9
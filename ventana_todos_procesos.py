@@ -2,25 +2,60 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import psutil
 import platform
+import queue
+import threading
+import time
+from metricas_ui import MedidorBloqueosUI
+from reconciliador_arbol import ReconciliadorArbol
+from lista_virtual import ListaVirtual
+from indice_ordenado import IndiceOrdenado
+
+# Cada cuánto el hilo de Tk comprueba si hay una instantánea lista para aplicar
+INTERVALO_SONDEO_MS = 250
 
 class VentanaTodosProcesos:
-    def __init__(self, parent):
+    def __init__(self, parent, muestreador, umbral_modo_virtual=2000, logs=None):
         self.parent = parent
         self.frame = ttk.Frame(parent)
+        self.muestreador = muestreador
+        self.logs = logs  # SistemaLogs para registrar las acciones sobre procesos
         self.running = True  # Flag para controlar la actualización
         self.update_job = None  # Referencia al trabajo programado
+        # Las filas se preparan en el hilo del muestreador y se entregan ya terminadas;
+        # la cola solo guarda la más reciente (si Tk va atrasado se descarta la anterior)
+        self.cola_filas = queue.Queue(maxsize=1)
+        self.generacion_mostrada = 0
+        # A partir de este número de procesos solo se crean items para la ventana visible
+        self.umbral_modo_virtual = umbral_modo_virtual
         self.is_windows = platform.system().lower() == 'windows'
         
-        # Variables para el ordenamiento
+        # Variables para el ordenamiento: forman parte del modelo de la vista y el
+        # índice ordenado conserva el orden entre instantáneas
         self.sort_column = None
         self.sort_reverse = False
+        self.indice = IndiceOrdenado()
+        self.version_orden = 0  # Cambia con cada clic de ordenación
+        self.lock_indice = threading.Lock()
         
-        self.tree = ttk.Treeview(self.frame, columns=("pid", "nombre", "cpu", "mem"), show="headings")
+        contenedor = ttk.Frame(self.frame)
+        contenedor.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(contenedor, columns=("pid", "nombre", "cpu", "mem"), show="headings")
         self.tree.heading("pid", text="PID", command=lambda: self.sort_by_column("pid"))
         self.tree.heading("nombre", text="Nombre", command=lambda: self.sort_by_column("nombre"))
         self.tree.heading("cpu", text="CPU (%)", command=lambda: self.sort_by_column("cpu"))
         self.tree.heading("mem", text="Memoria (MB)", command=lambda: self.sort_by_column("mem"))
-        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.scrollbar = ttk.Scrollbar(contenedor, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.reconciliador = ReconciliadorArbol(self.tree)
+        self.lista_virtual = ListaVirtual(self.tree, self.scrollbar)
+        
+        # Barra de estado con el número de procesos y el bloqueo máximo de la interfaz
+        self.estado_var = tk.StringVar(value="Esperando datos...")
+        ttk.Label(self.frame, textvariable=self.estado_var, anchor=tk.W).pack(fill=tk.X)
+        self.medidor_bloqueos = MedidorBloqueosUI(self.frame)
+        self.medidor_bloqueos.iniciar()
         
         self.menu = tk.Menu(self.frame, tearoff=0)
         self.menu.add_command(label="Cerrar", command=lambda: self.menu_accion_proceso('cerrar'))
@@ -36,7 +71,8 @@ class VentanaTodosProcesos:
             self.tree.bind("<Button-3>", self.mostrar_menu)
             self.tree.bind("<Control-Button-1>", self.mostrar_menu)
         
-        # Iniciar actualización
+        # Recibir las instantáneas del muestreador compartido e iniciar actualización
+        self.muestreador.suscribir(self.recibir_instantanea)
         self.update_all_processes()
 
     def mostrar_menu(self, event):
@@ -54,30 +90,70 @@ class VentanaTodosProcesos:
                 # Asegurar que el menú se cierre correctamente
                 self.menu.grab_release()
 
+    def recibir_instantanea(self, instantanea):
+        """Callback del muestreador: prepara las filas fuera del hilo de Tk y las encola"""
+        filas = [(m.pid, m.nombre, m.cpu, m.memoria // (1024*1024)) for m in instantanea.procesos]
+        # Fusionar en el índice ordenado también fuera del hilo de Tk
+        with self.lock_indice:
+            self.indice.actualizar(filas)
+            resultado = (instantanea.generacion, self.version_orden, self.indice.filas())
+        try:
+            self.cola_filas.put_nowait(resultado)
+        except queue.Full:
+            # Sustituir la instantánea que Tk aún no ha aplicado por la nueva
+            try:
+                self.cola_filas.get_nowait()
+            except queue.Empty:
+                pass
+            self.cola_filas.put_nowait(resultado)
+
     def update_all_processes(self):
+        """Aplica en el hilo de Tk la última instantánea preparada, si la hay"""
         if not self.running:
             return
-            
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        procesos = []
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_info']):
-            try:
-                cpu = proc.info['cpu_percent']
-                mem = proc.info['memory_info'].rss // (1024*1024)
-                procesos.append((proc.info['pid'], proc.info['name'], cpu, mem))
-            except (psutil.NoSuchProcess, psutil.AccessDenied, KeyError):
-                continue
-        for pid, nombre, cpu, mem in procesos:
-            self.tree.insert('', tk.END, values=(pid, nombre, cpu, mem))
+        
+        filas = None
+        try:
+            generacion, version_orden, filas = self.cola_filas.get_nowait()
+        except queue.Empty:
+            pass
+        else:
+            if version_orden != self.version_orden:
+                # Preparada con el orden anterior a un clic: la siguiente ya vendrá bien
+                filas = None
+        if filas is not None:
+            inicio = time.perf_counter()
+            self.aplicar_filas(filas)
+            self.generacion_mostrada = generacion
+            self.medidor_bloqueos.registrar(time.perf_counter() - inicio)
+            self.estado_var.set(
+                f"Procesos: {len(filas)} | Bloqueo máx. de la interfaz: "
+                f"{self.medidor_bloqueos.bloqueo_maximo * 1000:.0f} ms"
+            )
         
         # Solo programar la siguiente actualización si seguimos ejecutándose
         if self.running:
-            self.update_job = self.frame.after(5000, self.update_all_processes)
+            self.update_job = self.frame.after(INTERVALO_SONDEO_MS, self.update_all_processes)
+
+    def aplicar_filas(self, filas):
+        """Vuelca las filas en el Treeview según el modo (diferencial o virtual)"""
+        if not self.lista_virtual.activa and len(filas) >= self.umbral_modo_virtual:
+            self.reconciliador.limpiar()
+            self.lista_virtual.activar()
+        elif self.lista_virtual.activa and len(filas) < self.umbral_modo_virtual * 0.9:
+            # Margen para no alternar de modo cuando el número de procesos ronda el umbral
+            self.lista_virtual.desactivar()
+        
+        if self.lista_virtual.activa:
+            self.lista_virtual.establecer_filas(filas)
+        else:
+            self.reconciliador.aplicar(filas, ordenar=True)
     
     def stop_updates(self):
         """Detiene las actualizaciones programadas - Multiplataforma"""
         self.running = False
+        self.muestreador.desuscribir(self.recibir_instantanea)
+        self.medidor_bloqueos.detener()
         if self.update_job:
             try:
                 self.frame.after_cancel(self.update_job)
@@ -86,6 +162,10 @@ class VentanaTodosProcesos:
                 # En caso de que tkinter ya esté destruido (común en Windows)
                 pass
 
+    def _registrar_accion(self, accion, nombre, pid, detalle=""):
+        if self.logs:
+            self.logs.log_evento_proceso(accion, nombre, pid, detalle)
+
     def menu_accion_proceso(self, accion):
         sel = self.tree.selection()
         if not sel:
@@ -94,12 +174,14 @@ class VentanaTodosProcesos:
         pid = self.tree.item(sel[0])['values'][0]
         try:
             p = psutil.Process(pid)
+            nombre = p.name()
             if accion == 'cerrar':
                 # Compatibilidad multiplataforma para terminar procesos
                 if self.is_windows:
                     p.terminate()  # En Windows, terminate es más confiable
                 else:
                     p.terminate()  # En Linux también funciona bien
+                self._registrar_accion("terminado", nombre, pid)
                 messagebox.showinfo("Éxito", f"Proceso {pid} terminado.")
             elif accion == 'reiniciar':
                 exe = p.exe()
@@ -109,16 +191,19 @@ class VentanaTodosProcesos:
                 # Compatibilidad multiplataforma para reiniciar
                 if self.is_windows:
                     import subprocess
-                    subprocess.Popen([exe] + args[1:], shell=False)
+                    nuevo = subprocess.Popen([exe] + args[1:], shell=False)
                 else:
-                    psutil.Popen([exe] + args[1:])
+                    nuevo = psutil.Popen([exe] + args[1:])
+                self._registrar_accion("reiniciado", nombre, pid, f"nuevo PID: {nuevo.pid}")
                 messagebox.showinfo("Éxito", f"Proceso {pid} reiniciado.")
             elif accion == 'pausar':
                 if p.status() == psutil.STATUS_STOPPED:
                     p.resume()
+                    self._registrar_accion("reanudado", nombre, pid)
                     messagebox.showinfo("Proceso", f"Proceso {pid} reanudado.")
                 else:
                     p.suspend()
+                    self._registrar_accion("pausado", nombre, pid)
                     messagebox.showinfo("Proceso", f"Proceso {pid} pausado.")
         except psutil.NoSuchProcess:
             messagebox.showerror("Error", "El proceso ya no existe.")
@@ -140,16 +225,19 @@ class VentanaTodosProcesos:
         # Actualizar indicadores visuales en los encabezados
         self.update_column_headers()
 
-        # Obtener los datos actuales en la Treeview
-        data = []
-        for child in self.tree.get_children():
-            values = self.tree.item(child)['values']
-            data.append((values, child))
+        # Reordenar el índice una sola vez y aplicar: las siguientes instantáneas
+        # se fusionan en él manteniendo el orden
+        with self.lock_indice:
+            self.indice.establecer_orden(self.clave_orden(col), self.sort_reverse)
+            self.version_orden += 1
+            filas = self.indice.filas()
+        self.aplicar_filas(filas)
+
+    def clave_orden(self, col):
+        """Devuelve la función de ordenación para una columna según su tipo de datos."""
+        col_index = self.get_column_index(col)
         
-        # Función de ordenación personalizada según el tipo de columna
-        def sort_key(item):
-            values = item[0]
-            col_index = self.get_column_index(col)
+        def sort_key(values):
             if col_index is None:
                 return ""
             
@@ -169,12 +257,7 @@ class VentanaTodosProcesos:
             else:  # columna "nombre"
                 return str(value).lower()
         
-        # Ordenar los datos
-        data.sort(key=sort_key, reverse=self.sort_reverse)
-        
-        # Reorganizar los elementos en el Treeview
-        for index, (values, child) in enumerate(data):
-            self.tree.move(child, '', index)
+        return sort_key
 
     def update_column_headers(self):
         """Actualiza los encabezados de las columnas para mostrar indicadores de ordenación."""
@@ -203,17 +286,21 @@ class VentanaTodosProcesos:
 
     def seleccionar_proceso_por_pid(self, pid):
         """Selecciona un proceso específico por su PID en la lista"""
-        # Buscar el elemento con el PID especificado
-        for child in self.tree.get_children():
-            values = self.tree.item(child)['values']
-            if str(values[0]) == str(pid):  # Comparar PIDs como strings                # Limpiar selección actual
-                self.tree.selection_remove(self.tree.selection())
-                # Seleccionar el proceso encontrado
-                self.tree.selection_set(child)
-                # Hacer scroll para que sea visible
-                self.tree.see(child)
-                # Resaltar visualmente (opcional)
-                self.tree.focus(child)
-                return True
-        return False
-        return False
+        try:
+            pid = int(pid)
+        except (ValueError, TypeError):
+            return False
+        if self.lista_virtual.activa:
+            return self.lista_virtual.mostrar_pid(pid)
+        child = self.reconciliador.item_de(pid)
+        if child is None:
+            return False
+        # Limpiar selección actual
+        self.tree.selection_remove(self.tree.selection())
+        # Seleccionar el proceso encontrado
+        self.tree.selection_set(child)
+        # Hacer scroll para que sea visible
+        self.tree.see(child)
+        # Resaltar visualmente (opcional)
+        self.tree.focus(child)
+        return True
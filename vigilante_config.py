@@ -0,0 +1,116 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+
+# Constantes de <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+# struct inotify_event: wd, mask, cookie, len (seguido del nombre)
+_EVENTO = struct.Struct('iIII')
+
+
+def firma_archivo(ruta):
+    """(mtime_ns, tamaño, inodo) del archivo, o None si no existe"""
+    try:
+        st = os.stat(ruta)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _abrir_inotify(directorio):
+    """Descriptor inotify que vigila las escrituras y renombrados en directorio, o None"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(str(directorio)), _IN_CLOSE_WRITE | _IN_MOVED_TO) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+class VigilanteConfig:
+    """Avisa cuando cambia un archivo de configuración.
+
+    En Linux usa inotify sobre el directorio (así se detectan tanto las
+    escrituras en el sitio como los guardados atómicos con rename) y solo
+    despierta cuando hay eventos del archivo vigilado. En otros sistemas, o si
+    inotify no está disponible, comprueba cada ``intervalo`` segundos la
+    firma (mtime, tamaño, inodo) con un ``stat``. En ambos casos el archivo
+    no se lee aquí: ``al_cambiar()`` se llama desde el hilo del vigilante
+    cuando la firma ha cambiado y decide qué hacer.
+    """
+
+    def __init__(self, ruta, al_cambiar, intervalo=2.0, logs=None):
+        self.ruta = Path(ruta)
+        self.al_cambiar = al_cambiar
+        self.intervalo = intervalo
+        self.logs = logs
+        self._fd = _abrir_inotify(self.ruta.parent)
+        self.modo = 'inotify' if self._fd is not None else 'mtime'
+        self._firma = firma_archivo(self.ruta)
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, name='VigilanteConfig', daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo.is_alive():
+            self._hilo.join(timeout=self.intervalo + 1)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            if self._fd is not None:
+                # El timeout solo sirve para atender a detener()
+                listos, _, _ = select.select([self._fd], [], [], self.intervalo)
+                if not listos or not self._leer_eventos():
+                    continue
+            elif self._detener.wait(self.intervalo):
+                break
+            self._comprobar()
+
+    def _leer_eventos(self):
+        """Consume los eventos pendientes; True si alguno es del archivo vigilado"""
+        try:
+            datos = os.read(self._fd, 8192)
+        except (BlockingIOError, OSError):
+            return False
+        nombre = os.fsencode(self.ruta.name)
+        encontrado = False
+        offset = 0
+        while offset + _EVENTO.size <= len(datos):
+            longitud = _EVENTO.unpack_from(datos, offset)[3]
+            inicio = offset + _EVENTO.size
+            if datos[inicio:inicio + longitud].rstrip(b'\0') == nombre:
+                encontrado = True
+            offset = inicio + longitud
+        return encontrado
+
+    def _comprobar(self):
+        firma = firma_archivo(self.ruta)
+        if firma is None or firma == self._firma:
+            return
+        self._firma = firma
+        try:
+            self.al_cambiar()
+        except Exception as e:
+            if self.logs:
+                self.logs.log_error(f"Error aplicando cambios de configuración: {e}")